@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from .forms import ArticleAdminForm
-from .models import Article, ArticleCategory, ArticleComment
+from .models import Article, ArticleCategory, ArticleComment, ArticleViewBucket
 from .services import generate_unique_article_slug
 
 
@@ -63,3 +63,19 @@ class ArticleCommentAdmin(admin.ModelAdmin):
     list_filter = ("created_at", "author", "article")
     search_fields = ("article__title", "author__username")
     save_as = True
+
+
+@admin.register(ArticleViewBucket)
+class ArticleViewBucketAdmin(admin.ModelAdmin):
+    list_display = ("article", "granularity", "period_start", "views")
+    list_filter = ("granularity", "period_start")
+    search_fields = ("article__title",)
+    date_hierarchy = "period_start"
+    list_select_related = ("article",)
+    ordering = ("-period_start",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
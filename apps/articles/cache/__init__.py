@@ -0,0 +1,6 @@
+from .article_lists import *
+from .articles import *
+from .likes import *
+from .trending import *
+from .typeahead import *
+from .view_counts import *
@@ -0,0 +1,114 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional
+
+from django.db.models import QuerySet
+
+from core.cache import (
+    get_object_scope,
+    get_or_set_versioned,
+    get_scope_versions,
+    get_versioned,
+    set_versioned,
+)
+
+from ..models import Article
+from ..settings import (
+    ARTICLE_FILTER_RESULT_CACHE_MAX_IDS,
+    ARTICLE_FILTER_RESULT_CACHE_TIMEOUT,
+    ARTICLE_LIST_ETAG_TIMEOUT,
+)
+from .articles import ARTICLE_CACHE, _get_article_dependencies
+
+
+# Names of the versioned caches (see core.cache), under which their hits and
+# misses are counted
+ARTICLE_FILTER_RESULTS_CACHE = "article_filter_results"
+ARTICLE_LIST_ETAGS_CACHE = "article_list_etags"
+
+
+def get_article_filter_result_scopes(
+    author_id: Optional[int] = None,
+    category_ids: Iterable[Optional[int]] = (),
+    tag_ids: Iterable[int] = (),
+) -> list[str]:
+    """Returns the scopes of cached filter results that depend on the
+    articles of the author, categories and tags."""
+    scopes: list[str] = (
+        [f"articles:author:{author_id}"] if author_id is not None else []
+    )
+    scopes += [
+        f"articles:category:{category_id}"
+        for category_id in sorted({i for i in category_ids if i is not None})
+    ]
+    scopes += [f"articles:tag:{tag_id}" for tag_id in sorted(set(tag_ids))]
+    return scopes
+
+
+def get_cached_article_filter_results(
+    queryset: QuerySet[Article], params: dict[str, Any], scopes: Iterable[str]
+) -> tuple[list[int], int]:
+    """Returns the ordered IDs of the first
+    ARTICLE_FILTER_RESULT_CACHE_MAX_IDS articles of the filtered queryset
+    and the number of all of them. The results are cached under the
+    normalized filter parameters and the current versions of the scopes
+    the filter depends on, so that invalidating any of the scopes makes
+    them unreachable.
+    """
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return get_or_set_versioned(
+        ARTICLE_FILTER_RESULTS_CACHE,
+        hashlib.sha256(payload.encode()).hexdigest(),
+        scopes,
+        lambda: _find_article_filter_results(queryset),
+        timeout=ARTICLE_FILTER_RESULT_CACHE_TIMEOUT,
+    )
+
+
+def _find_article_filter_results(
+    queryset: QuerySet[Article],
+) -> tuple[list[int], int]:
+    article_ids = list(
+        queryset.prefetch_related(None).values_list("id", flat=True)[
+            :ARTICLE_FILTER_RESULT_CACHE_MAX_IDS
+        ]
+    )
+    if len(article_ids) < ARTICLE_FILTER_RESULT_CACHE_MAX_IDS:
+        return article_ids, len(article_ids)
+    return article_ids, queryset.count()
+
+
+def get_article_list_versions(
+    articles: Iterable[Article], list_scopes: Iterable[str]
+) -> dict[str, str]:
+    """Returns the versions of the scopes a page of the article list
+    depends on: the scopes of the list itself and of the articles on the
+    page and the objects they are cached with."""
+    scopes = list(list_scopes)
+    for article in articles:
+        scopes += [
+            get_object_scope(ARTICLE_CACHE, article.id),
+            *_get_article_dependencies(article),
+        ]
+    return get_scope_versions(scopes)
+
+
+def get_cached_article_list_etag(page_key: str) -> Optional[str]:
+    """Returns the ETag of the article list page cached with
+    `cache_article_list_etag`, if nothing on the page has changed."""
+    return get_versioned(ARTICLE_LIST_ETAGS_CACHE, page_key)
+
+
+def cache_article_list_etag(page_key: str, etag: str, versions: dict[str, str]) -> None:
+    """Caches the ETag of the article list page rendered under the
+    versions returned by `get_article_list_versions`. Articles outside
+    the page may move onto it when their counters change, which does not
+    invalidate the ETag, so it is only used for
+    ARTICLE_LIST_ETAG_TIMEOUT seconds."""
+    set_versioned(
+        ARTICLE_LIST_ETAGS_CACHE,
+        page_key,
+        etag,
+        versions,
+        timeout=ARTICLE_LIST_ETAG_TIMEOUT,
+    )
@@ -0,0 +1,181 @@
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from core.cache import (
+    VersionedObjectCache,
+    get_object_scope,
+    get_or_set_versioned,
+    get_scope_version_digests,
+)
+
+from ..models import Article, ArticleCategory, ArticleComment
+from ..selectors import get_all_categories
+from ..settings import (
+    ARTICLE_CACHE_TIMEOUT,
+    ARTICLE_CATEGORIES_CACHE_TIMEOUT,
+    ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT,
+    ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT,
+)
+
+
+ARTICLE_ID_BY_SLUG_KEY = "articles:slug:{slug}:id"
+
+# Names of the versioned caches (see core.cache), under which their hits and
+# misses are counted
+ARTICLE_CACHE = "article"
+CATEGORIES_CACHE = "categories"
+
+# Scope of cached values that depend on every published article, e.g. results
+# of filters not limited to an author, category or tags
+PUBLISHED_ARTICLES_SCOPE = "articles"
+# Scope of cached values that depend on every category
+CATEGORIES_SCOPE = "categories"
+# Name of the scopes of what the page of an article shows besides the article
+# itself: its comments and buffered likes
+ARTICLE_PAGE = "article_page"
+
+
+def get_article_id_by_slug(article_slug: str) -> Optional[int]:
+    """Resolves the slug to the ID of the article, looking it up in the
+    cache first. Slugs of non-existent articles are cached as well, for
+    a shorter time. Returns None if there is no article with the slug.
+    """
+    cached_id = cache.get(ARTICLE_ID_BY_SLUG_KEY.format(slug=article_slug))
+    if cached_id is not None:
+        return cached_id or None
+
+    article_id = (
+        Article.objects.filter(slug=article_slug).values_list("id", flat=True).first()
+    )
+    cache_article_id_by_slug(article_slug, article_id)
+    return article_id
+
+
+def cache_article_id_by_slug(article_slug: str, article_id: Optional[int]) -> None:
+    """Caches the slug -> ID mapping of the article. A None ID marks the
+    slug as unknown.
+    """
+    cache_key = ARTICLE_ID_BY_SLUG_KEY.format(slug=article_slug)
+    if article_id is None:
+        cache.set(cache_key, 0, timeout=ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT)
+    else:
+        cache.set(cache_key, article_id, timeout=ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT)
+
+
+def invalidate_article_id_by_slug(article_slug: str) -> None:
+    cache.delete(ARTICLE_ID_BY_SLUG_KEY.format(slug=article_slug))
+
+
+def get_cached_article_by_slug(article_slug: str) -> Article:
+    """Returns the article with the slug, served from the article cache.
+    Raises Article.DoesNotExist if there is no such article.
+    """
+    article_id = get_article_id_by_slug(article_slug)
+    article = article_cache.get(article_id) if article_id else None
+    if article_id and (article is None or article.slug != article_slug):
+        # The cached slug mapping is outdated
+        article_id = (
+            Article.objects.filter(slug=article_slug)
+            .values_list("id", flat=True)
+            .first()
+        )
+        cache_article_id_by_slug(article_slug, article_id)
+        article = article_cache.get(article_id) if article_id else None
+    if article is None:
+        raise Article.DoesNotExist(f"No article with the slug '{article_slug}'.")
+    return article
+
+
+def get_cached_articles(article_ids: Iterable[int]) -> dict[int, Article]:
+    """Returns the existing articles with the IDs by ID, served from the
+    article cache."""
+    return article_cache.get_many(article_ids)
+
+
+def get_cached_categories() -> list[ArticleCategory]:
+    """Returns all categories annotated with the numbers of their
+    published articles, cached until a category or a published article
+    changes."""
+    return get_or_set_versioned(
+        CATEGORIES_CACHE,
+        "all",
+        [CATEGORIES_SCOPE, PUBLISHED_ARTICLES_SCOPE],
+        lambda: list(get_all_categories()),
+        timeout=ARTICLE_CATEGORIES_CACHE_TIMEOUT,
+    )
+
+
+def _fetch_articles(article_ids: list[int]) -> QuerySet[Article]:
+    return (
+        Article.objects.filter(id__in=article_ids)
+        .select_related("category", "author", "author__profile")
+        .prefetch_related("tags")
+    )
+
+
+def _get_article_dependencies(article: Article) -> list[str]:
+    """Returns the scopes of the objects the article is cached with."""
+    scopes = [get_object_scope("user", article.author_id)]
+    if article.category_id is not None:
+        scopes.append(get_object_scope("category", article.category_id))
+    scopes += [get_object_scope("tag", tag.id) for tag in article.tags.all()]
+    return scopes
+
+
+article_cache = VersionedObjectCache(
+    ARTICLE_CACHE,
+    _fetch_articles,
+    _get_article_dependencies,
+    timeout=ARTICLE_CACHE_TIMEOUT,
+)
+
+
+def attach_article_fragment_versions(articles: Iterable[Article]) -> None:
+    """Sets `fragment_version` of each article to a digest of the
+    versions of the article and of the objects it is cached with, so
+    that cached fragments of the article are not used once any of them
+    changes."""
+    articles = list(articles)
+    digests = get_scope_version_digests(
+        {
+            article.id: [
+                get_object_scope(ARTICLE_CACHE, article.id),
+                *_get_article_dependencies(article),
+            ]
+            for article in articles
+        }
+    )
+    for article in articles:
+        article.fragment_version = digests[article.id]
+
+
+def attach_comment_fragment_versions(comments: Iterable[ArticleComment]) -> None:
+    """Sets `fragment_version` of each comment to a digest of the
+    versions of the comment and its author."""
+    comments = list(comments)
+    digests = get_scope_version_digests(
+        {
+            comment.id: [
+                get_object_scope("comment", comment.id),
+                get_object_scope("user", comment.author_id),
+            ]
+            for comment in comments
+        }
+    )
+    for comment in comments:
+        comment.fragment_version = digests[comment.id]
+
+
+def get_article_page_version(article: Article) -> str:
+    """Returns a digest of the versions of the article, the objects it
+    is cached with and the rest of its page, which changes whenever
+    anything the page shows changes, apart from the number of views
+    not synced to the database yet."""
+    scopes = [
+        get_object_scope(ARTICLE_CACHE, article.id),
+        get_object_scope(ARTICLE_PAGE, article.id),
+        *_get_article_dependencies(article),
+    ]
+    return get_scope_version_digests({article.id: scopes})[article.id]
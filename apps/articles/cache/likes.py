@@ -0,0 +1,298 @@
+import logging
+from typing import Iterable, Optional, Type
+
+from django.db import DatabaseError, OperationalError
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from core.cache import get_object_scope, invalidate_scopes
+
+from ..models import Article, ArticleComment
+from ..services import apply_like_changes, toggle_like
+from ..settings import (
+    ARTICLE_LIKE_SYNC_MAX_BATCH_SIZE,
+    ARTICLE_LIKE_SYNC_MAX_ITERATIONS,
+    ARTICLE_LIKES_BUFFER_ENABLED,
+    ARTICLE_LIKES_BUFFER_TIMEOUT,
+)
+from .articles import ARTICLE_PAGE
+
+
+logger = logging.getLogger(__name__)
+
+
+LIKED_BY_KEY = "articles:likes:{kind}:{id}:users"
+LIKES_LOADED_KEY = "articles:likes:{kind}:{id}:loaded"
+PENDING_LIKES_KEY = "articles:likes:{kind}:{id}:pending"
+
+LIKED_OBJECTS_SET_KEY = "articles:liked_to_sync"
+LIKED_OBJECTS_RETRY_SET_KEY = "articles:liked_to_sync-retry"
+
+LIKEABLE_MODELS = {"article": Article, "comment": ArticleComment}
+
+# Toggles the user (ARGV[1]) in the set of users that liked the object and
+# records the new state in the pending likes hash. If the set is not loaded
+# yet, it is seeded with the likes stored in the database (ARGV[5:]) and the
+# pending changes not synced to the database yet when ARGV[3] is "1";
+# otherwise -1 is returned so that the caller can load them. The loaded state
+# expires ARGV[4] seconds after the last toggle.
+TOGGLE_BUFFERED_LIKE_SCRIPT = """
+local users_key, loaded_key, pending_key, to_sync_key = unpack(KEYS)
+local user_id, member, seeded, timeout = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+if redis.call("EXISTS", loaded_key) == 0 then
+    if seeded ~= "1" then
+        return -1
+    end
+    redis.call("DEL", users_key)
+    for i = 5, #ARGV do
+        redis.call("SADD", users_key, ARGV[i])
+    end
+    local pending = redis.call("HGETALL", pending_key)
+    for i = 1, #pending, 2 do
+        if pending[i + 1] == "1" then
+            redis.call("SADD", users_key, pending[i])
+        else
+            redis.call("SREM", users_key, pending[i])
+        end
+    end
+    redis.call("SET", loaded_key, 1)
+end
+if redis.call("SREM", users_key, user_id) == 1 then
+    redis.call("HSET", pending_key, user_id, 0)
+else
+    redis.call("SADD", users_key, user_id)
+    redis.call("HSET", pending_key, user_id, 1)
+end
+redis.call("EXPIRE", users_key, timeout)
+redis.call("EXPIRE", loaded_key, timeout)
+redis.call("SADD", to_sync_key, member)
+return redis.call("SCARD", users_key)
+"""
+
+
+def toggle_buffered_like(obj: Article | ArticleComment, user_id: int) -> int:
+    """Likes the object on behalf of the user or removes the existing
+    like in Redis. The change is written to the database later by
+    `sync_buffered_likes`. Falls back to the database if Redis is
+    unavailable.
+
+    Returns the updated number of likes.
+    """
+    redis_conn = get_redis_connection("default")
+    kind = _get_like_kind(obj)
+    keys = [
+        LIKED_BY_KEY.format(kind=kind, id=obj.pk),
+        LIKES_LOADED_KEY.format(kind=kind, id=obj.pk),
+        PENDING_LIKES_KEY.format(kind=kind, id=obj.pk),
+        LIKED_OBJECTS_SET_KEY,
+    ]
+    member = f"{kind}:{obj.pk}"
+    args = [user_id, member, 0, ARTICLE_LIKES_BUFFER_TIMEOUT]
+    toggle_script = redis_conn.register_script(TOGGLE_BUFFERED_LIKE_SCRIPT)
+    try:
+        likes_count = toggle_script(keys=keys, args=args)
+        if likes_count == -1:
+            args[2] = 1
+            liked_by = obj.users_that_liked.values_list("id", flat=True)
+            likes_count = toggle_script(keys=keys, args=[*args, *liked_by])
+    except RedisError as e:
+        logger.error(
+            "Redis error when toggling like of %s %s: %s. Writing to the database.",
+            kind,
+            obj.pk,
+            e,
+        )
+        return toggle_like(obj, user_id)
+
+    article_id = obj.pk if isinstance(obj, Article) else obj.article_id
+    invalidate_scopes([get_object_scope(ARTICLE_PAGE, article_id)])
+    obj.likes_count = likes_count
+    return likes_count
+
+
+def apply_buffered_likes(
+    objects: Iterable[Article | ArticleComment], user_id: Optional[int] = None
+) -> dict[int, bool]:
+    """Replaces `likes_count` of the objects whose likes are buffered in
+    Redis with the buffered number of likes. Returns whether the user
+    liked each of these objects, keyed by object ID. Objects whose likes
+    are not buffered are left as is.
+    """
+    objects = list(objects)
+    if not objects:
+        return {}
+
+    redis_conn = get_redis_connection("default")
+    try:
+        with redis_conn.pipeline(transaction=False) as pipe:
+            for obj in objects:
+                kind = _get_like_kind(obj)
+                users_key = LIKED_BY_KEY.format(kind=kind, id=obj.pk)
+                pipe.exists(LIKES_LOADED_KEY.format(kind=kind, id=obj.pk))
+                pipe.scard(users_key)
+                pipe.sismember(users_key, user_id or 0)
+            results = pipe.execute()
+    except RedisError as e:
+        logger.warning("Could not get buffered likes: %s", e)
+        return {}
+
+    liked_by_user = {}
+    for obj, loaded, likes_count, liked in zip(
+        objects, results[0::3], results[1::3], results[2::3]
+    ):
+        if loaded:
+            obj.likes_count = likes_count
+            liked_by_user[obj.pk] = bool(liked)
+    return liked_by_user
+
+
+def invalidate_buffered_likes(
+    model: Type[Article | ArticleComment], ids: Iterable[int]
+) -> None:
+    """Drops buffered like state of the objects after their likes were
+    changed in the database bypassing the buffer. It is reloaded from
+    the database on the next toggle; pending changes are kept."""
+    if not ARTICLE_LIKES_BUFFER_ENABLED:
+        return
+    kind = "article" if model is Article else "comment"
+    keys = [
+        key.format(kind=kind, id=object_id)
+        for object_id in ids
+        for key in (LIKED_BY_KEY, LIKES_LOADED_KEY)
+    ]
+    if not keys:
+        return
+    try:
+        get_redis_connection("default").delete(*keys)
+    except RedisError as e:
+        logger.warning("Could not invalidate buffered likes of %ss: %s", kind, e)
+
+
+def sync_buffered_likes() -> None:
+    redis_conn = get_redis_connection("default")
+
+    _requeue_failed_like_syncs(redis_conn)
+
+    for batch_index in range(ARTICLE_LIKE_SYNC_MAX_ITERATIONS):
+        encoded_members = redis_conn.spop(
+            LIKED_OBJECTS_SET_KEY, ARTICLE_LIKE_SYNC_MAX_BATCH_SIZE
+        )
+        if not encoded_members:
+            logger.info("No likes to sync; exiting on batch %d.", batch_index)
+            break
+
+        liked_object_ids = _decode_liked_objects(encoded_members)
+
+        if not liked_object_ids:
+            logger.info("No valid liked objects in batch %s.", batch_index)
+            continue
+
+        for kind, object_ids in liked_object_ids.items():
+            _sync_like_batch(kind, object_ids, batch_index, redis_conn)
+
+
+def _get_like_kind(obj: Article | ArticleComment) -> str:
+    return "article" if isinstance(obj, Article) else "comment"
+
+
+def _requeue_failed_like_syncs(redis_conn) -> None:
+    """Moves liked objects from retry set back to the main set for
+    reprocessing."""
+    retry_members = redis_conn.smembers(LIKED_OBJECTS_RETRY_SET_KEY)
+    if retry_members:
+        redis_conn.sadd(LIKED_OBJECTS_SET_KEY, *retry_members)
+        redis_conn.delete(LIKED_OBJECTS_RETRY_SET_KEY)
+        logger.info("Re-queued %d failed like syncs", len(retry_members))
+
+
+def _decode_liked_objects(encoded_members: Iterable[bytes]) -> dict[str, list[int]]:
+    """Groups IDs of liked objects encoded as "<kind>:<id>" by kind."""
+    result: dict[str, list[int]] = {}
+    for encoded_member in encoded_members:
+        try:
+            kind, object_id = encoded_member.decode("utf-8").split(":")
+            if kind not in LIKEABLE_MODELS:
+                raise ValueError(f"Unknown kind {kind!r}")
+            result.setdefault(kind, []).append(int(object_id))
+        except (UnicodeDecodeError, ValueError) as e:
+            logger.warning("Skipping invalid liked object: %s (%s)", encoded_member, e)
+    return result
+
+
+def _sync_like_batch(
+    kind: str, object_ids: Iterable[int], batch_index: int, redis_conn
+) -> None:
+    like_changes = _pop_pending_likes_from_cache(redis_conn, kind, object_ids)
+
+    if not like_changes:
+        logger.info(
+            "No pending likes in batch %s for %s IDs: %s",
+            batch_index,
+            kind,
+            object_ids,
+        )
+        return
+
+    try:
+        apply_like_changes(LIKEABLE_MODELS[kind], like_changes)
+        logger.info(
+            "Synced likes for %d %ss in batch %s.",
+            len(like_changes),
+            kind,
+            batch_index,
+        )
+    except (DatabaseError, OperationalError) as e:
+        logger.error(
+            "DB update failed. Re-queuing %s likes for retry. Error: %s", kind, e
+        )
+        _restore_pending_likes_to_cache(redis_conn, kind, like_changes)
+
+
+def _pop_pending_likes_from_cache(
+    redis_conn, kind: str, object_ids: Iterable[int]
+) -> dict[int, dict[int, bool]]:
+    """Atomically reads and removes pending like changes of the objects.
+    Returns {object ID: {user ID: liked}}.
+    """
+    object_ids = list(object_ids)
+    try:
+        with redis_conn.pipeline(transaction=True) as pipe:
+            for object_id in object_ids:
+                pending_key = PENDING_LIKES_KEY.format(kind=kind, id=object_id)
+                pipe.hgetall(pending_key)
+                pipe.delete(pending_key)
+            results = pipe.execute()
+    except RedisError as e:
+        logger.error(
+            "Redis error when getting pending likes of %ss %s: %s", kind, object_ids, e
+        )
+        return {}
+
+    like_changes = {}
+    for object_id, pending_likes in zip(object_ids, results[0::2]):
+        if pending_likes:
+            like_changes[object_id] = {
+                int(user_id): liked == b"1" for user_id, liked in pending_likes.items()
+            }
+    return like_changes
+
+
+def _restore_pending_likes_to_cache(
+    redis_conn, kind: str, like_changes: dict[int, dict[int, bool]]
+) -> None:
+    """Puts back like changes that could not be synced. Changes made by
+    users after they were popped take precedence.
+    """
+    try:
+        with redis_conn.pipeline(transaction=True) as pipe:
+            for object_id, changes in like_changes.items():
+                pending_key = PENDING_LIKES_KEY.format(kind=kind, id=object_id)
+                for user_id, liked in changes.items():
+                    pipe.hsetnx(pending_key, user_id, int(liked))
+            pipe.sadd(
+                LIKED_OBJECTS_RETRY_SET_KEY,
+                *(f"{kind}:{object_id}" for object_id in like_changes),
+            )
+            pipe.execute()
+    except RedisError as e:
+        logger.error("Could not restore pending likes of %ss: %s", kind, e)
@@ -0,0 +1,46 @@
+import logging
+
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from ..selectors import find_trending_article_scores
+from ..settings import ARTICLE_TRENDING_SIZE
+from .view_counts import _decode_article_ids
+
+
+logger = logging.getLogger(__name__)
+
+
+TRENDING_ARTICLES_KEY = "articles:trending"
+TRENDING_ARTICLES_TMP_KEY = "articles:trending:tmp"
+
+
+def update_trending_articles() -> int:
+    """Recomputes trending scores and replaces the sorted set of the top
+    ARTICLE_TRENDING_SIZE trending articles at once, so readers never
+    see a partially built ranking. Returns the number of ranked
+    articles.
+    """
+    scores = dict(find_trending_article_scores(ARTICLE_TRENDING_SIZE))
+    redis_conn = get_redis_connection("default")
+    with redis_conn.pipeline(transaction=True) as pipe:
+        if scores:
+            pipe.delete(TRENDING_ARTICLES_TMP_KEY)
+            pipe.zadd(TRENDING_ARTICLES_TMP_KEY, scores)
+            pipe.rename(TRENDING_ARTICLES_TMP_KEY, TRENDING_ARTICLES_KEY)
+        else:
+            pipe.delete(TRENDING_ARTICLES_KEY)
+        pipe.execute()
+    return len(scores)
+
+
+def get_trending_article_ids() -> list[int]:
+    """Returns IDs of the trending articles, most trending first, or an
+    empty list if the ranking is not available."""
+    redis_conn = get_redis_connection("default")
+    try:
+        encoded_ids = redis_conn.zrevrange(TRENDING_ARTICLES_KEY, 0, -1)
+    except RedisError as e:
+        logger.warning("Could not get trending articles: %s", e)
+        return []
+    return _decode_article_ids(encoded_ids)
@@ -0,0 +1,43 @@
+import hashlib
+
+from django.core.cache import cache
+
+from users.selectors import find_username_suggestions
+
+from ..selectors import find_article_title_suggestions, find_tag_name_suggestions
+from ..settings import (
+    ARTICLE_TYPEAHEAD_CACHE_TIMEOUT,
+    ARTICLE_TYPEAHEAD_MIN_PREFIX_LENGTH,
+    ARTICLE_TYPEAHEAD_RESULTS_LIMIT,
+)
+
+
+TYPEAHEAD_SUGGESTIONS_KEY = "articles:typeahead:{source}:{prefix_hash}"
+
+TYPEAHEAD_SOURCES = {
+    "articles": find_article_title_suggestions,
+    "tags": find_tag_name_suggestions,
+    "authors": find_username_suggestions,
+}
+
+
+def get_cached_typeahead_suggestions(source: str, prefix: str) -> list[dict[str, str]]:
+    """Returns Select2-compatible suggestions ({"id": ..., "text": ...})
+    from the specified source for the prefix. Results are cached for a
+    short time so that hot prefixes do not hit the database.
+    """
+    prefix = prefix.strip().lower()
+    if len(prefix) < ARTICLE_TYPEAHEAD_MIN_PREFIX_LENGTH:
+        return []
+
+    prefix_hash = hashlib.sha256(prefix.encode()).hexdigest()
+    cache_key = TYPEAHEAD_SUGGESTIONS_KEY.format(source=source, prefix_hash=prefix_hash)
+    suggestions = cache.get(cache_key)
+    if suggestions is None:
+        find_suggestions = TYPEAHEAD_SOURCES[source]
+        suggestions = [
+            {"id": value, "text": text}
+            for value, text in find_suggestions(prefix, ARTICLE_TYPEAHEAD_RESULTS_LIMIT)
+        ]
+        cache.set(cache_key, suggestions, timeout=ARTICLE_TYPEAHEAD_CACHE_TIMEOUT)
+    return suggestions
@@ -0,0 +1,619 @@
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Iterable
+
+from django.db import DatabaseError, OperationalError
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from ..models import Article
+from ..services import apply_article_view_deltas, record_hourly_article_views
+from ..settings import (
+    ARTICLE_UNIQUE_VIEW_TIMEOUT,
+    ARTICLE_VIEW_DEDUP_BACKEND,
+    ARTICLE_VIEW_SYNC_LOCK_TIMEOUT,
+    ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE,
+    ARTICLE_VIEW_SYNC_MAX_ITERATIONS,
+    ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE,
+    ARTICLE_VIEW_SYNC_SHARDS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+ARTICLE_VIEWED_BY_KEY = "articles:{article_id}:viewed_by:{viewer_id}"
+ARTICLE_VIEWERS_KEY = "articles:{article_id}:viewers:{window}"
+ARTICLE_COUNTED_VIEWERS_KEY = "articles:{article_id}:viewers:{window}:counted"
+ARTICLE_VIEWS_KEY = "articles:{id}:views"
+
+VIEWED_ARTICLES_SET_KEY = "articles:viewed_to_sync"
+VIEWED_ARTICLES_RETRY_SET_KEY = "articles:viewed_to_sync-retry"
+VIEWED_ARTICLES_SHARD_SET_KEY = "articles:viewed_to_sync:shard:{shard}"
+VIEWED_ARTICLES_SHARD_LOCK_KEY = "articles:viewed_to_sync:shard:{shard}:lock"
+VIEW_SYNC_SHARD_COUNT_KEY = "articles:viewed_to_sync:shards"
+
+STAGED_VIEW_DELTAS_KEY = "articles:views_staging:{token}"
+STAGED_VIEW_SYNC_RUNS_KEY = "articles:views_staging"
+
+HOURLY_ARTICLE_VIEWS_KEY = "articles:views:hourly:{hour}"
+HOURLY_ARTICLE_VIEWS_HOURS_KEY = "articles:views:hourly"
+HOURLY_ARTICLE_VIEWS_ROLLUP_KEY = "articles:views:hourly:{hour}:rollup:{token}"
+HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY = "articles:views:hourly:rollups"
+
+# Hourly view buckets not rolled up within this time (in seconds) expire.
+HOURLY_ARTICLE_VIEWS_TTL = 7 * 24 * 3600
+# Time (in seconds) after the end of an hour during which views registered by
+# web servers with a slightly lagging clock may still arrive in its bucket.
+HOURLY_ARTICLE_VIEWS_ROLLUP_DELAY = 60
+
+# Marks the view of the article by the viewer (KEYS[1]) for ARGV[1] seconds.
+# If the viewer has not viewed it yet, increments the cached view delta
+# (KEYS[2]) and adds the article ID (ARGV[2]) to the set of articles to sync
+# (KEYS[3]). The view is also counted in the bucket of the current hour
+# (KEYS[4]), which expires in ARGV[4] seconds, and the hour (ARGV[3]) is added
+# to the set of hours to roll up (KEYS[5]). Returns 1 if the view was counted
+# and 0 otherwise.
+REGISTER_ARTICLE_VIEW_SCRIPT = """
+if not redis.call("SET", KEYS[1], "1", "EX", ARGV[1], "NX") then
+    return 0
+end
+redis.call("INCR", KEYS[2])
+redis.call("SADD", KEYS[3], ARGV[2])
+redis.call("HINCRBY", KEYS[4], ARGV[2], 1)
+redis.call("EXPIRE", KEYS[4], ARGV[4])
+redis.call("SADD", KEYS[5], ARGV[3])
+return 1
+"""
+
+# Adds the viewer (ARGV[1]) to the HyperLogLog of viewers of the article in
+# the current time window (KEYS[1]). When the estimated number of viewers
+# grows beyond the number already counted for the window (KEYS[2]), the
+# difference is added to the cached view delta (KEYS[3]) and the article ID
+# (ARGV[3]) is added to the set of articles to sync (KEYS[4]). Both window
+# keys expire ARGV[2] seconds after the last view. Counted views are added to
+# the hourly bucket as in REGISTER_ARTICLE_VIEW_SCRIPT (KEYS[5:6], ARGV[4:5]).
+# Returns the number of counted views.
+REGISTER_ARTICLE_VIEW_HLL_SCRIPT = """
+local added = redis.call("PFADD", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+if added == 0 then
+    return 0
+end
+local viewers = redis.call("PFCOUNT", KEYS[1])
+local counted = tonumber(redis.call("GET", KEYS[2]) or "0")
+if viewers <= counted then
+    return 0
+end
+redis.call("SET", KEYS[2], viewers, "EX", ARGV[2])
+redis.call("INCRBY", KEYS[3], viewers - counted)
+redis.call("SADD", KEYS[4], ARGV[3])
+redis.call("HINCRBY", KEYS[5], ARGV[3], viewers - counted)
+redis.call("EXPIRE", KEYS[5], ARGV[5])
+redis.call("SADD", KEYS[6], ARGV[4])
+return viewers - counted
+"""
+
+# Pops up to ARGV[2] article IDs from the set of articles to sync (KEYS[1])
+# and adds each of them to the shard set (KEYS[2:]) chosen by the article ID
+# modulo the number of shards (ARGV[1]). Invalid IDs go to the first shard,
+# where they are skipped when decoded. Returns the number of moved IDs.
+DISTRIBUTE_VIEW_SYNCS_SCRIPT = """
+local shards = tonumber(ARGV[1])
+local article_ids = redis.call("SPOP", KEYS[1], ARGV[2])
+for _, article_id in ipairs(article_ids) do
+    local shard = math.floor(tonumber(article_id) or 0) % shards
+    redis.call("SADD", KEYS[shard + 2], article_id)
+end
+return #article_ids
+"""
+
+# Deletes the lock (KEYS[1]) if it is still held with the token (ARGV[1]),
+# so that a lock that expired and was taken by another worker is kept.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Moves the cached view deltas (KEYS[3:]) of the articles (ARGV[3:]) to the
+# staging hash of the sync run (KEYS[1]) with GETDEL, so views registered
+# afterwards start a new delta. The run token (ARGV[1]) is added to the sorted
+# set of staged runs (KEYS[2]) with the staging time (ARGV[2]) in the same
+# step. Non-numeric deltas are discarded; returns IDs of their articles.
+STAGE_VIEW_DELTAS_SCRIPT = """
+local invalid_article_ids = {}
+for i = 3, #KEYS do
+    local delta = redis.call("GETDEL", KEYS[i])
+    if delta then
+        if tonumber(delta) then
+            redis.call("HINCRBY", KEYS[1], ARGV[i], delta)
+        else
+            table.insert(invalid_article_ids, ARGV[i])
+        end
+    end
+end
+redis.call("ZADD", KEYS[2], ARGV[2], ARGV[1])
+return invalid_article_ids
+"""
+
+# Moves the bucket of the closed hour (KEYS[1]) to the rollup hash (KEYS[2])
+# and adds the rollup (ARGV[2]) to the set of staged rollups (KEYS[4]). The
+# hour (ARGV[1]) is removed from the set of hours to roll up (KEYS[3]) in the
+# same step, so views arriving late start a new bucket for the hour.
+STAGE_HOURLY_VIEWS_ROLLUP_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call("RENAME", KEYS[1], KEYS[2])
+    redis.call("SADD", KEYS[4], ARGV[2])
+end
+redis.call("SREM", KEYS[3], ARGV[1])
+"""
+
+
+def get_cached_article_views(article_id: int) -> int:
+    redis_conn = get_redis_connection("default")
+    article_key = ARTICLE_VIEWS_KEY.format(id=article_id)
+    try:
+        return int(redis_conn.get(article_key) or 0)
+    except (ValueError, TypeError, RedisError) as e:
+        logger.warning("Could not get cached views for article %s: %s", article_id, e)
+        return 0
+
+
+def get_cached_article_views_bulk(article_ids: Iterable[int]) -> dict[int, int]:
+    """Returns cached view deltas of the articles, fetched with a single
+    MGET. Articles without a cached delta map to 0.
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return {}
+
+    redis_conn = get_redis_connection("default")
+    try:
+        view_delta_values = redis_conn.mget(
+            [ARTICLE_VIEWS_KEY.format(id=article_id) for article_id in article_ids]
+        )
+    except RedisError as e:
+        logger.warning("Could not get cached views for articles %s: %s", article_ids, e)
+        return dict.fromkeys(article_ids, 0)
+
+    view_deltas = {}
+    for article_id, delta_value in zip(article_ids, view_delta_values):
+        try:
+            view_deltas[article_id] = int(delta_value or 0)
+        except (ValueError, TypeError) as e:
+            logger.warning(
+                "Could not get cached views for article %s: %s", article_id, e
+            )
+            view_deltas[article_id] = 0
+    return view_deltas
+
+
+def attach_cached_article_views(articles: Iterable[Article]) -> None:
+    """Prefetches cached view deltas of the articles so that their
+    `views` property does not query Redis one article at a time.
+    """
+    articles = list(articles)
+    view_deltas = get_cached_article_views_bulk(article.id for article in articles)
+    for article in articles:
+        article.cached_views_delta = view_deltas.get(article.id, 0)
+
+
+def register_article_view(article_id: int, viewer_id: str) -> bool:
+    """Counts the view of the article unless the viewer has already
+    viewed it within ARTICLE_UNIQUE_VIEW_TIMEOUT, using the backend set
+    by ARTICLE_VIEW_DEDUP_BACKEND. Deduplication, incrementing and
+    enqueueing the article for syncing are done atomically in a single
+    round trip.
+
+    Returns whether the view was counted.
+    """
+    redis_conn = get_redis_connection("default")
+    now = int(time.time())
+    hour = now // 3600
+    hourly_keys = [
+        HOURLY_ARTICLE_VIEWS_KEY.format(hour=hour),
+        HOURLY_ARTICLE_VIEWS_HOURS_KEY,
+    ]
+    if ARTICLE_VIEW_DEDUP_BACKEND == "hyperloglog":
+        window = now // ARTICLE_UNIQUE_VIEW_TIMEOUT
+        register_script = redis_conn.register_script(REGISTER_ARTICLE_VIEW_HLL_SCRIPT)
+        keys = [
+            ARTICLE_VIEWERS_KEY.format(article_id=article_id, window=window),
+            ARTICLE_COUNTED_VIEWERS_KEY.format(article_id=article_id, window=window),
+            ARTICLE_VIEWS_KEY.format(id=article_id),
+            VIEWED_ARTICLES_SET_KEY,
+            *hourly_keys,
+        ]
+        args = [
+            viewer_id,
+            ARTICLE_UNIQUE_VIEW_TIMEOUT,
+            article_id,
+            hour,
+            HOURLY_ARTICLE_VIEWS_TTL,
+        ]
+    else:
+        register_script = redis_conn.register_script(REGISTER_ARTICLE_VIEW_SCRIPT)
+        keys = [
+            ARTICLE_VIEWED_BY_KEY.format(article_id=article_id, viewer_id=viewer_id),
+            ARTICLE_VIEWS_KEY.format(id=article_id),
+            VIEWED_ARTICLES_SET_KEY,
+            *hourly_keys,
+        ]
+        args = [ARTICLE_UNIQUE_VIEW_TIMEOUT, article_id, hour, HOURLY_ARTICLE_VIEWS_TTL]
+
+    try:
+        return bool(register_script(keys=keys, args=args))
+    except RedisError as e:
+        logger.error(
+            "Redis error when registering view of article %s: %s", article_id, e
+        )
+        return False
+
+
+def sync_article_views() -> None:
+    """Syncs all pending view deltas serially in the current process.
+    See `distribute_pending_view_syncs` and `sync_article_view_shard`
+    for the parallel alternative.
+    """
+    redis_conn = get_redis_connection("default")
+
+    _recover_staged_view_deltas(redis_conn)
+    _requeue_failed_view_syncs(redis_conn)
+    _sync_article_views_from_set(
+        redis_conn, VIEWED_ARTICLES_SET_KEY, ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE
+    )
+
+
+def distribute_pending_view_syncs() -> dict[int, int]:
+    """Moves IDs of articles with pending view deltas to the
+    ARTICLE_VIEW_SYNC_SHARDS shard sets, so that each shard can be
+    synced by its own worker. An article always goes to the same shard,
+    so its deltas are never synced by two workers at once. Returns the
+    number of pending articles per shard.
+    """
+    redis_conn = get_redis_connection("default")
+
+    _recover_staged_view_deltas(redis_conn)
+    _requeue_failed_view_syncs(redis_conn)
+    _requeue_removed_view_sync_shards(redis_conn)
+
+    shard_keys = [
+        VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=shard)
+        for shard in range(ARTICLE_VIEW_SYNC_SHARDS)
+    ]
+    distribute_script = redis_conn.register_script(DISTRIBUTE_VIEW_SYNCS_SCRIPT)
+    # Under a sustained inflow, the rest is left for the next run
+    for _ in range(ARTICLE_VIEW_SYNC_MAX_ITERATIONS):
+        moved = distribute_script(
+            keys=[VIEWED_ARTICLES_SET_KEY, *shard_keys],
+            args=[ARTICLE_VIEW_SYNC_SHARDS, ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE],
+        )
+        if moved < ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE:
+            break
+
+    with redis_conn.pipeline(transaction=False) as pipe:
+        for shard_key in shard_keys:
+            pipe.scard(shard_key)
+        backlogs = pipe.execute()
+    return dict(enumerate(backlogs))
+
+
+def sync_article_view_shard(shard: int) -> dict[str, int | float]:
+    """Syncs pending view deltas of the articles in the shard. The batch
+    size adapts to the backlog of the shard. A shard is synced by one
+    worker at a time; if it is already being synced, nothing is done.
+
+    Returns metrics of the run.
+    """
+    redis_conn = get_redis_connection("default")
+    shard_key = VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=shard)
+    lock_key = VIEWED_ARTICLES_SHARD_LOCK_KEY.format(shard=shard)
+
+    lock_token = uuid.uuid4().hex
+    if not redis_conn.set(
+        lock_key, lock_token, ex=ARTICLE_VIEW_SYNC_LOCK_TIMEOUT, nx=True
+    ):
+        logger.info("Shard %d is already being synced; skipping.", shard)
+        return {"shard": shard, "skipped": True}
+
+    try:
+        started_at = time.monotonic()
+        backlog = redis_conn.scard(shard_key)
+        batch_size = _get_view_sync_batch_size(backlog)
+        metrics: dict[str, int | float] = dict(
+            _sync_article_views_from_set(redis_conn, shard_key, batch_size)
+        )
+        metrics.update(
+            shard=shard,
+            backlog=backlog,
+            batch_size=batch_size,
+            remaining=redis_conn.scard(shard_key),
+            duration=round(time.monotonic() - started_at, 3),
+        )
+    finally:
+        redis_conn.register_script(RELEASE_LOCK_SCRIPT)(
+            keys=[lock_key], args=[lock_token]
+        )
+
+    logger.info("Synced article views of shard %d: %s", shard, metrics)
+    return metrics
+
+
+def _get_view_sync_batch_size(backlog: int) -> int:
+    """Spreads the backlog evenly over ARTICLE_VIEW_SYNC_MAX_ITERATIONS
+    batches within the batch size limits: small backlogs are synced in
+    short transactions, large ones with the largest allowed batches.
+    """
+    batch_size = -(-backlog // ARTICLE_VIEW_SYNC_MAX_ITERATIONS)
+    return max(
+        ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE,
+        min(batch_size, ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE),
+    )
+
+
+def _sync_article_views_from_set(
+    redis_conn, set_key: str, batch_size: int
+) -> dict[str, int]:
+    metrics = {"batches": 0, "articles": 0, "synced_articles": 0}
+    for batch_index in range(ARTICLE_VIEW_SYNC_MAX_ITERATIONS):
+        encoded_article_ids = redis_conn.spop(set_key, batch_size)
+        if not encoded_article_ids:
+            logger.info(
+                "No articles to sync; exiting on batch %d.",
+                batch_index,
+            )
+            break
+
+        metrics["batches"] += 1
+        article_ids = _decode_article_ids(encoded_article_ids)
+
+        if not article_ids:
+            logger.info("No valid article IDs in batch %s.", batch_index)
+            continue
+
+        metrics["articles"] += len(article_ids)
+        metrics["synced_articles"] += _sync_article_batch(
+            article_ids, batch_index, redis_conn
+        )
+    return metrics
+
+
+def _requeue_failed_view_syncs(redis_conn) -> None:
+    """Moves article IDs from retry set back to the main set for
+    reprocessing."""
+    retry_ids = redis_conn.smembers(VIEWED_ARTICLES_RETRY_SET_KEY)
+    if retry_ids:
+        redis_conn.sadd(VIEWED_ARTICLES_SET_KEY, *retry_ids)
+        redis_conn.delete(VIEWED_ARTICLES_RETRY_SET_KEY)
+        logger.info("Re-queued %d failed article view syncs", len(retry_ids))
+
+
+def _requeue_removed_view_sync_shards(redis_conn) -> None:
+    """Moves article IDs from the shards that no longer exist after
+    ARTICLE_VIEW_SYNC_SHARDS was decreased back to the main set."""
+    previous_shards = int(
+        redis_conn.getset(VIEW_SYNC_SHARD_COUNT_KEY, ARTICLE_VIEW_SYNC_SHARDS)
+        or ARTICLE_VIEW_SYNC_SHARDS
+    )
+    for shard in range(ARTICLE_VIEW_SYNC_SHARDS, previous_shards):
+        shard_key = VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=shard)
+        with redis_conn.pipeline(transaction=True) as pipe:
+            pipe.sunionstore(
+                VIEWED_ARTICLES_SET_KEY, [VIEWED_ARTICLES_SET_KEY, shard_key]
+            )
+            pipe.delete(shard_key)
+            pipe.execute()
+        logger.info("Re-queued article view syncs of removed shard %d", shard)
+
+
+def _decode_article_ids(encoded_ids: Iterable[bytes]) -> list[int]:
+    article_ids = []
+    for encoded_id in encoded_ids:
+        try:
+            article_id = int(encoded_id.decode("utf-8"))
+            article_ids.append(article_id)
+        except (UnicodeDecodeError, ValueError) as e:
+            logger.warning("Skipping invalid article ID: %s (%s)", encoded_id, e)
+    return article_ids
+
+
+def _sync_article_batch(
+    article_ids: Iterable[int], batch_index: int, redis_conn
+) -> int:
+    """Moves cached view deltas of the articles to a staging hash of a
+    new sync run and writes them to the database under the run token.
+    If the write fails or the worker dies, the staged deltas are applied
+    later by `_recover_staged_view_deltas`. Returns the number of
+    articles whose views were synced.
+    """
+    token = uuid.uuid4().hex
+    view_deltas = _stage_view_deltas(redis_conn, token, article_ids)
+
+    if not view_deltas:
+        logger.info(
+            "No positive view deltas in batch %s for article IDs: %s",
+            batch_index,
+            article_ids,
+        )
+        _remove_staged_view_deltas(redis_conn, token)
+        return 0
+
+    try:
+        apply_article_view_deltas(view_deltas, token)
+        logger.info(
+            "Synced views for %d articles in batch %s.",
+            len(view_deltas),
+            batch_index,
+        )
+    except (DatabaseError, OperationalError) as e:
+        logger.error(
+            "DB update failed. Staged view deltas of run %s will be retried. "
+            "Error: %s",
+            token,
+            e,
+        )
+        _schedule_staged_view_deltas_retry(redis_conn, token)
+        return 0
+
+    _remove_staged_view_deltas(redis_conn, token)
+    return len(view_deltas)
+
+
+def _stage_view_deltas(
+    redis_conn, token: str, article_ids: Iterable[int]
+) -> dict[int, int]:
+    """Atomically moves cached view deltas of the articles to the
+    staging hash of the run. Returns the positive staged deltas.
+    """
+    article_ids = list(article_ids)
+    stage_script = redis_conn.register_script(STAGE_VIEW_DELTAS_SCRIPT)
+    try:
+        invalid_article_ids = stage_script(
+            keys=[
+                STAGED_VIEW_DELTAS_KEY.format(token=token),
+                STAGED_VIEW_SYNC_RUNS_KEY,
+                *(
+                    ARTICLE_VIEWS_KEY.format(id=article_id)
+                    for article_id in article_ids
+                ),
+            ],
+            args=[token, time.time(), *article_ids],
+        )
+        staged_deltas = redis_conn.hgetall(STAGED_VIEW_DELTAS_KEY.format(token=token))
+    except RedisError as e:
+        logger.error(
+            "Redis error when staging views for articles %s: %s", article_ids, e
+        )
+        return {}
+
+    for article_id in invalid_article_ids:
+        logger.warning(
+            "Discarded invalid view delta of key %s.",
+            ARTICLE_VIEWS_KEY.format(id=int(article_id)),
+        )
+    return _build_view_deltas_dict(staged_deltas)
+
+
+def _build_view_deltas_dict(staged_deltas: dict[bytes, bytes]) -> dict[int, int]:
+    result = {}
+    for article_id, delta_value in staged_deltas.items():
+        delta = int(delta_value)
+        if delta > 0:
+            result[int(article_id)] = delta
+    return result
+
+
+def _schedule_staged_view_deltas_retry(redis_conn, token: str) -> None:
+    """Makes the staged view deltas of the run eligible for recovery on
+    the next sync."""
+    try:
+        redis_conn.zadd(STAGED_VIEW_SYNC_RUNS_KEY, {token: 0})
+    except RedisError as e:
+        logger.warning("Could not schedule retry of staged run %s: %s", token, e)
+
+
+def _remove_staged_view_deltas(redis_conn, token: str) -> None:
+    try:
+        with redis_conn.pipeline(transaction=True) as pipe:
+            pipe.delete(STAGED_VIEW_DELTAS_KEY.format(token=token))
+            pipe.zrem(STAGED_VIEW_SYNC_RUNS_KEY, token)
+            pipe.execute()
+    except RedisError as e:
+        # The run will be recovered later and skipped as already applied
+        logger.warning("Redis cleanup failed for staged run %s: %s", token, e)
+
+
+def _recover_staged_view_deltas(redis_conn) -> None:
+    """Applies view deltas of the runs that failed to write them or
+    were interrupted more than ARTICLE_VIEW_SYNC_LOCK_TIMEOUT seconds
+    ago. Runs that have already written their deltas are only cleaned
+    up.
+    """
+    stale_before = time.time() - ARTICLE_VIEW_SYNC_LOCK_TIMEOUT
+    tokens = redis_conn.zrangebyscore(STAGED_VIEW_SYNC_RUNS_KEY, "-inf", stale_before)
+    for encoded_token in tokens:
+        token = encoded_token.decode("utf-8")
+        view_deltas = _build_view_deltas_dict(
+            redis_conn.hgetall(STAGED_VIEW_DELTAS_KEY.format(token=token))
+        )
+        if view_deltas:
+            try:
+                apply_article_view_deltas(view_deltas, token)
+            except (DatabaseError, OperationalError) as e:
+                logger.error(
+                    "DB update failed for staged run %s; will retry. Error: %s",
+                    token,
+                    e,
+                )
+                continue
+        _remove_staged_view_deltas(redis_conn, token)
+        logger.info(
+            "Recovered staged view deltas of run %s for %d articles.",
+            token,
+            len(view_deltas),
+        )
+
+
+def roll_up_hourly_article_views() -> int:
+    """Moves view counts of the closed hours from their Redis buckets to
+    the hourly and daily view buckets in the database. Each bucket is
+    staged under a rollup token first, so rollups interrupted or failed
+    earlier are retried without counting views twice.
+
+    Returns the number of rolled up hours.
+    """
+    redis_conn = get_redis_connection("default")
+    last_closed_hour = (int(time.time()) - HOURLY_ARTICLE_VIEWS_ROLLUP_DELAY) // 3600
+    stage_script = redis_conn.register_script(STAGE_HOURLY_VIEWS_ROLLUP_SCRIPT)
+
+    for encoded_hour in redis_conn.smembers(HOURLY_ARTICLE_VIEWS_HOURS_KEY):
+        hour = int(encoded_hour)
+        if hour >= last_closed_hour:
+            continue
+        token = uuid.uuid4().hex
+        stage_script(
+            keys=[
+                HOURLY_ARTICLE_VIEWS_KEY.format(hour=hour),
+                HOURLY_ARTICLE_VIEWS_ROLLUP_KEY.format(hour=hour, token=token),
+                HOURLY_ARTICLE_VIEWS_HOURS_KEY,
+                HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY,
+            ],
+            args=[hour, f"{hour}:{token}"],
+        )
+
+    rolled_up_hours = 0
+    for encoded_rollup in redis_conn.smembers(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY):
+        rolled_up_hours += _roll_up_hourly_views(redis_conn, encoded_rollup.decode())
+    return rolled_up_hours
+
+
+def _roll_up_hourly_views(redis_conn, rollup: str) -> bool:
+    hour, token = rollup.split(":")
+    rollup_key = HOURLY_ARTICLE_VIEWS_ROLLUP_KEY.format(hour=hour, token=token)
+    view_counts = {
+        int(article_id): int(views)
+        for article_id, views in redis_conn.hgetall(rollup_key).items()
+    }
+    if view_counts:
+        hour_start = datetime.fromtimestamp(int(hour) * 3600, tz=timezone.utc)
+        try:
+            record_hourly_article_views(hour_start, view_counts, token)
+        except (DatabaseError, OperationalError) as e:
+            logger.error(
+                "DB update failed. Views of hour %s will be rolled up later. "
+                "Error: %s",
+                hour_start,
+                e,
+            )
+            return False
+
+    with redis_conn.pipeline(transaction=True) as pipe:
+        pipe.delete(rollup_key)
+        pipe.srem(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY, rollup)
+        pipe.execute()
+    logger.info("Rolled up views of %d articles for hour %s.", len(view_counts), hour)
+    return True
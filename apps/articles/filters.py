@@ -1,5 +1,9 @@
-from django.db.models import QuerySet
+from typing import Any, Optional
+
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import BigIntegerField, F, Func, QuerySet, Value
 from django.forms import TextInput
+from django.urls import reverse_lazy
 from django_filters import FilterSet
 from django_filters.filters import (
     CharFilter,
@@ -9,10 +13,15 @@ from django_filters.filters import (
     OrderingFilter,
 )
 from django_filters.widgets import DateRangeWidget
-from django_select2.forms import Select2TagWidget
 
 from users.selectors import get_all_users
 
+from .cache import (
+    PUBLISHED_ARTICLES_SCOPE,
+    get_article_filter_result_scopes,
+    get_cached_categories,
+    get_trending_article_ids,
+)
 from .models import Article
 from .selectors import (
     find_articles_by_query,
@@ -20,6 +29,39 @@ from .selectors import (
     get_all_categories,
     get_all_tags,
 )
+from .widgets import TypeaheadSelect, TypeaheadSelectMultiple
+
+
+class ArticleOrderingFilter(OrderingFilter):
+    """Adds the "trending" ordering by the precomputed trending ranking
+    to the orderings by fields."""
+
+    TRENDING = "trending"
+
+    def build_choices(self, fields, labels):
+        choices = super().build_choices(fields, labels)
+        return [*choices, (self.TRENDING, "Trending")]
+
+    def filter(self, qs, value) -> QuerySet[Article]:
+        if value and self.TRENDING in value:
+            return order_by_trending(qs)
+        return super().filter(qs, value)
+
+
+def order_by_trending(queryset: QuerySet[Article]) -> QuerySet[Article]:
+    """Limits the queryset to the trending articles in the order of the
+    trending ranking. If the ranking is not available, the queryset is
+    returned as is.
+    """
+    trending_ids = get_trending_article_ids()
+    if not trending_ids:
+        return queryset
+    ranking = Func(
+        Value(trending_ids, output_field=ArrayField(BigIntegerField())),
+        F("id"),
+        function="array_position",
+    )
+    return queryset.filter(id__in=trending_ids).order_by(ranking)
 
 
 class ArticleFilter(FilterSet):
@@ -28,7 +70,10 @@ class ArticleFilter(FilterSet):
         label="Search",
         widget=TextInput(attrs={"placeholder": "Enter text..."}),
     )
-    author = ModelChoiceFilter(to_field_name="username")
+    author = ModelChoiceFilter(
+        to_field_name="username",
+        widget=TypeaheadSelect(reverse_lazy("typeahead", args=["authors"])),
+    )
     date = DateFromToRangeFilter(
         field_name="created_at",
         widget=DateRangeWidget(attrs={"type": "date"}),
@@ -38,9 +83,11 @@ class ArticleFilter(FilterSet):
     tags = ModelMultipleChoiceFilter(
         to_field_name="name",
         method="tags_filter",
-        widget=Select2TagWidget(attrs={"id": "filterTagsInput"}),
+        widget=TypeaheadSelectMultiple(
+            reverse_lazy("typeahead", args=["tags"]), attrs={"id": "filterTagsInput"}
+        ),
     )
-    ordering = OrderingFilter(
+    ordering = ArticleOrderingFilter(
         fields=[
             ("created_at", "Date and Time"),
             ("views_count", "Views"),
@@ -58,6 +105,57 @@ class ArticleFilter(FilterSet):
         self.filters["category"].queryset = get_all_categories()
         self.filters["tags"].queryset = get_all_tags()
 
+    @property
+    def form(self):
+        if not hasattr(self, "_form"):
+            # Categories are rendered from the cache; the queryset is only
+            # queried to validate the selected category.
+            category_field = super().form.fields["category"]
+            category_field.widget.choices = [
+                ("", category_field.empty_label),
+                *(
+                    (category.slug, str(category))
+                    for category in get_cached_categories()
+                ),
+            ]
+        return self._form
+
+    def get_result_cache_params(self) -> Optional[tuple[dict[str, Any], list[str]]]:
+        """Returns the normalized parameters of the filter query and the
+        scopes its results depend on, or None if the results should not
+        be cached: text search queries are too diverse to be reused, and
+        the trending ranking changes on its own.
+        """
+        if not self.is_bound:
+            data = {}
+        elif self.is_valid():
+            data = self.form.cleaned_data
+        else:
+            return None
+
+        ordering = list(data.get("ordering") or [])
+        if data.get("q") or ArticleOrderingFilter.TRENDING in ordering:
+            return None
+
+        author, category, tags, date = (
+            data.get("author"),
+            data.get("category"),
+            data.get("tags") or [],
+            data.get("date"),
+        )
+        author_id: Optional[int] = author.id if author else None
+        category_id: Optional[int] = category.id if category else None
+        tag_ids: list[int] = sorted(tag.id for tag in tags)
+        params = {
+            "author": author_id,
+            "category": category_id,
+            "tags": tag_ids,
+            "date": [date.start, date.stop] if date else None,
+            "ordering": ordering,
+        }
+        scopes = get_article_filter_result_scopes(author_id, [category_id], tag_ids)
+        return params, scopes or [PUBLISHED_ARTICLES_SCOPE]
+
     def search_filter(self, queryset, name, value) -> QuerySet[Article]:
         if not value:
             return queryset
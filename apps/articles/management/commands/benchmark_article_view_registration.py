@@ -0,0 +1,72 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from articles.cache import REGISTER_ARTICLE_VIEW_SCRIPT
+from articles.settings import ARTICLE_UNIQUE_VIEW_TIMEOUT
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the latency of registering an article view with separate "
+        "SET NX / INCR / SADD commands and with the single Lua script call."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--views",
+            type=int,
+            default=10000,
+            help="Number of views to register with each approach.",
+        )
+
+    def handle(self, *args, **options):
+        views = options["views"]
+        redis_conn = get_redis_connection("default")
+        prefix = f"benchmark:{uuid.uuid4().hex}"
+        register_script = redis_conn.register_script(REGISTER_ARTICLE_VIEW_SCRIPT)
+
+        def register_with_commands(viewer_id: int) -> None:
+            if redis_conn.set(
+                f"{prefix}:viewed_by:{viewer_id}",
+                "1",
+                ex=ARTICLE_UNIQUE_VIEW_TIMEOUT,
+                nx=True,
+            ):
+                redis_conn.incr(f"{prefix}:views")
+                redis_conn.sadd(f"{prefix}:to_sync", 1)
+
+        def register_with_script(viewer_id: int) -> None:
+            register_script(
+                keys=[
+                    f"{prefix}:viewed_by:{viewer_id}",
+                    f"{prefix}:views",
+                    f"{prefix}:to_sync",
+                ],
+                args=[ARTICLE_UNIQUE_VIEW_TIMEOUT, 1],
+            )
+
+        try:
+            for name, register_view in (
+                ("SET NX + INCR + SADD", register_with_commands),
+                ("Lua script", register_with_script),
+            ):
+                redis_conn.delete(f"{prefix}:views", f"{prefix}:to_sync")
+                started_at = time.perf_counter()
+                for viewer_id in range(views):
+                    register_view(viewer_id)
+                elapsed = time.perf_counter() - started_at
+                self.stdout.write(
+                    f"{name}: {elapsed / views * 1e6:.1f} us per view "
+                    f"({views} views in {elapsed:.2f} s)"
+                )
+                self._delete_keys(redis_conn, f"{prefix}:*")
+        finally:
+            self._delete_keys(redis_conn, f"{prefix}:*")
+
+    def _delete_keys(self, redis_conn, pattern: str) -> None:
+        keys = list(redis_conn.scan_iter(match=pattern, count=1000))
+        for i in range(0, len(keys), 1000):
+            redis_conn.delete(*keys[i : i + 1000])
@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from psycopg2 import sql as psycopg_sql
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares bulk view count updates built with a CASE clause per "
+        "article and with a single unnest() join, on a temporary table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000],
+            help="Numbers of updated rows per statement.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of times each statement is executed.",
+        )
+
+    def handle(self, *args, **options):
+        for rows in options["rows"]:
+            view_deltas = {article_id: 1 for article_id in range(1, rows * 2, 2)}
+            for name, build_statement in (
+                ("CASE", self._build_case_statement),
+                ("unnest", self._build_unnest_statement),
+            ):
+                sql, params = build_statement(view_deltas)
+                elapsed = self._time_statement(sql, params, rows, options["repeat"])
+                self.stdout.write(
+                    f"{rows:>6} rows, {name:<6}: {elapsed * 1000:8.2f} ms "
+                    f"per statement ({len(sql)} chars of SQL)"
+                )
+
+    def _time_statement(self, sql: str, params: list, rows: int, repeat: int) -> float:
+        """Returns the mean execution time of the statement on a fresh
+        temporary table, so that dead rows left by previous runs do not
+        skew the results.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE benchmark_article "
+                "(id bigint PRIMARY KEY, views_count integer NOT NULL) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                "INSERT INTO benchmark_article "
+                "SELECT id, 0 FROM generate_series(1, %s) AS id",
+                [rows * 2],
+            )
+            cursor.execute("ANALYZE benchmark_article")
+
+            started_at = time.perf_counter()
+            for _ in range(repeat):
+                cursor.execute(sql, params)
+            return (time.perf_counter() - started_at) / repeat
+
+    def _build_case_statement(self, view_deltas: dict[int, int]) -> tuple[str, list]:
+        case_statements = []
+        case_params = []
+        where_params = []
+        for article_id, view_delta in sorted(view_deltas.items()):
+            case_statements.append("WHEN id = %s THEN views_count + %s")
+            case_params.extend([article_id, view_delta])
+            where_params.append(article_id)
+
+        statement = psycopg_sql.SQL(
+            "UPDATE benchmark_article SET views_count = CASE {} END WHERE id IN ({})"
+        ).format(
+            psycopg_sql.SQL(" ").join(map(psycopg_sql.SQL, case_statements)),
+            psycopg_sql.SQL(", ").join([psycopg_sql.Placeholder()] * len(where_params)),
+        )
+        connection.ensure_connection()
+        sql = statement.as_string(connection.connection)
+        return sql, case_params + where_params
+
+    def _build_unnest_statement(self, view_deltas: dict[int, int]) -> tuple[str, list]:
+        article_ids, deltas = zip(*sorted(view_deltas.items()))
+        sql = (
+            "UPDATE benchmark_article AS article "
+            "SET views_count = article.views_count + deltas.view_delta "
+            "FROM unnest(%s::bigint[], %s::integer[]) AS deltas(id, view_delta) "
+            "WHERE article.id = deltas.id"
+        )
+        return sql, [list(article_ids), list(deltas)]
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+from articles.services import rebuild_article_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recomputes full-text search vectors of all articles."
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding article search vectors...")
+        article_ids = Article.objects.values_list("id", flat=True).iterator()
+        updated_count = rebuild_article_search_vectors(article_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt search vectors for {updated_count} articles.")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from articles.services import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Repairs drifted like and comment counters of articles and comments."
+
+    def handle(self, *args, **options):
+        self.stdout.write("Reconciling article counters...")
+        for counter, repaired_count in reconcile_counters().items():
+            self.stdout.write(f"Repaired {repaired_count} {counter} counters.")
+        self.stdout.write(self.style.SUCCESS("Article counters reconciled."))
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:42
+
+from collections import defaultdict
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+from articles.services.search import build_weighted_search_vector
+
+
+def populate_search_vectors(apps, schema_editor):
+    """Indexes existing articles the same way as the saved ones, with
+    HTML markup stripped and entities unescaped in Python."""
+    Article = apps.get_model("articles", "Article")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    db_alias = schema_editor.connection.alias
+
+    tag_names = defaultdict(list)
+    content_type = (
+        ContentType.objects.using(db_alias)
+        .filter(app_label="articles", model="article")
+        .first()
+    )
+    if content_type is not None:
+        for object_id, name in (
+            TaggedItem.objects.using(db_alias)
+            .filter(content_type=content_type)
+            .values_list("object_id", "tag__name")
+        ):
+            tag_names[object_id].append(name)
+
+    articles = Article.objects.using(db_alias).values_list(
+        "id", "title", "category__title", "content"
+    )
+    for article_id, title, category_title, content in articles.iterator():
+        Article.objects.using(db_alias).filter(pk=article_id).update(
+            search_vector=build_weighted_search_vector(
+                title, tag_names[article_id], category_title or "", content
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0001_initial"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="articles_ar_search__95c6c6_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
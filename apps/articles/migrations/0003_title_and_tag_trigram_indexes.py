@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:47
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0002_article_search_vector"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="article",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+                ),
+                name="articles_article_title_trgm",
+            ),
+        ),
+        # taggit_tag belongs to a third-party app, so its index is managed here
+        migrations.RunSQL(
+            (
+                "CREATE INDEX IF NOT EXISTS taggit_tag_name_trgm "
+                "ON taggit_tag USING gin (UPPER(name) gin_trgm_ops)"
+            ),
+            "DROP INDEX IF EXISTS taggit_tag_name_trgm",
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:50
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+from sql_util.utils import SubqueryCount
+
+
+def populate_counters(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+    ArticleComment = apps.get_model("articles", "ArticleComment")
+
+    Article.objects.update(
+        likes_count=Coalesce(SubqueryCount("users_that_liked"), 0),
+        comments_count=Coalesce(SubqueryCount("articlecomment"), 0),
+    )
+    ArticleComment.objects.update(
+        likes_count=Coalesce(SubqueryCount("users_that_liked"), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0003_title_and_tag_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="likes_count",
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name="articlecomment",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0004_article_and_comment_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleViewSyncBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=32, unique=True)),
+                ("synced_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.1 on 2026-10-16 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0005_article_view_sync_batch"),
+    ]
+
+    operations = [
+        # Django cannot create partitioned tables, so the table is created with
+        # SQL. Partitions for each month are created by the rollup of hourly
+        # views; rows of months without a partition go to the default one.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    [
+                        """
+                        CREATE TABLE articles_articleviewbucket (
+                            id bigserial,
+                            article_id bigint NOT NULL
+                                REFERENCES articles_article (id)
+                                DEFERRABLE INITIALLY DEFERRED,
+                            granularity varchar(4) NOT NULL,
+                            period_start timestamp with time zone NOT NULL,
+                            views integer NOT NULL CHECK (views >= 0),
+                            PRIMARY KEY (id, period_start),
+                            CONSTRAINT articles_view_bucket_unique
+                                UNIQUE (article_id, granularity, period_start)
+                        ) PARTITION BY RANGE (period_start)
+                        """,
+                        (
+                            "CREATE INDEX articles_view_bucket_period "
+                            "ON articles_articleviewbucket (granularity, period_start)"
+                        ),
+                        (
+                            "CREATE TABLE articles_articleviewbucket_default "
+                            "PARTITION OF articles_articleviewbucket DEFAULT"
+                        ),
+                    ],
+                    "DROP TABLE articles_articleviewbucket",
+                ),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="ArticleViewBucket",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "granularity",
+                            models.CharField(
+                                choices=[("hour", "Hour"), ("day", "Day")],
+                                max_length=4,
+                            ),
+                        ),
+                        ("period_start", models.DateTimeField()),
+                        ("views", models.PositiveIntegerField(default=0)),
+                        (
+                            "article",
+                            models.ForeignKey(
+                                db_index=False,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="view_buckets",
+                                to="articles.article",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "ordering": ["period_start"],
+                        "indexes": [
+                            models.Index(
+                                fields=["granularity", "period_start"],
+                                name="articles_view_bucket_period",
+                            )
+                        ],
+                        "constraints": [
+                            models.UniqueConstraint(
+                                fields=("article", "granularity", "period_start"),
+                                name="articles_view_bucket_unique",
+                            )
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -1,4 +1,9 @@
+from typing import Optional
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.urls import reverse
 from taggit.managers import TaggableManager
 from tinymce.models import HTMLField
@@ -26,15 +31,44 @@ class Article(models.Model):
         User, related_name="liked_articles", blank=True
     )
     views_count = models.IntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0, db_index=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Articles"
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="articles_article_title_trgm",
+            ),
+            # Keyset pagination of published articles in each list ordering
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_published=True),
+                name="articles_published_created",
+            ),
+            models.Index(
+                fields=["views_count", "id"],
+                condition=models.Q(is_published=True),
+                name="articles_published_views",
+            ),
+            models.Index(
+                fields=["likes_count", "id"],
+                condition=models.Q(is_published=True),
+                name="articles_published_likes",
+            ),
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.from_admin = False
         self._original_title = self.title
+        self._original_slug = self.slug
+        self._original_category_id = self.category_id
+        self._original_is_published = self.is_published
 
     def __str__(self):
         return self.title
@@ -50,13 +84,42 @@ class Article(models.Model):
             self.slug = generate_unique_article_slug(self.title)
 
         super().save(*args, **kwargs)
+        # Signal handlers of this save have seen the previous values
+        self._original_slug = self.slug
+        self._original_category_id = self.category_id
+        self._original_is_published = self.is_published
+
+    @property
+    def original_slug(self) -> str:
+        """The slug of the article when it was loaded or last saved."""
+        return self._original_slug
+
+    def slug_changed(self) -> bool:
+        """Whether the slug differs from the one the article was loaded or
+        last saved with."""
+        return bool(self._original_slug) and self._original_slug != self.slug
+
+    @property
+    def original_category_id(self) -> Optional[int]:
+        """The category of the article when it was loaded or last saved."""
+        return self._original_category_id
+
+    @property
+    def original_is_published(self) -> bool:
+        """Whether the article was published when it was loaded or last
+        saved."""
+        return self._original_is_published
 
     @property
     def views(self) -> int:
-        """Returns current total (DB + cache) view count."""
+        """Returns current total (DB + cache) view count. Uses the view
+        delta prefetched by `attach_cached_article_views` if available.
+        """
         from .cache import get_cached_article_views
 
-        views_delta = get_cached_article_views(self.id)
+        views_delta = getattr(self, "cached_views_delta", None)
+        if views_delta is None:
+            views_delta = get_cached_article_views(self.id)
         return self.views_count + views_delta
 
 
@@ -81,6 +144,7 @@ class ArticleComment(models.Model):
     users_that_liked = models.ManyToManyField(
         User, related_name="liked_comments", blank=True
     )
+    likes_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         verbose_name_plural = "Comments"
@@ -91,3 +155,51 @@ class ArticleComment(models.Model):
         else:
             displayed_text = self.text
         return f"{self.article} - {self.author} - {displayed_text}"
+
+
+class ArticleViewSyncBatch(models.Model):
+    """Records a batch of cached view deltas written to the database so
+    that a retried sync of the same batch is not counted twice.
+    """
+
+    token = models.CharField(max_length=32, unique=True)
+    synced_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.token
+
+
+class ArticleViewBucket(models.Model):
+    """Number of views of an article within an hour or a day (UTC). The
+    table is partitioned by month of `period_start`, so its primary key
+    in the database is (id, period_start).
+    """
+
+    class Granularity(models.TextChoices):
+        HOUR = "hour"
+        DAY = "day"
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="view_buckets", db_index=False
+    )
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    period_start = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["article", "granularity", "period_start"],
+                name="articles_view_bucket_unique",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["granularity", "period_start"],
+                name="articles_view_bucket_period",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} {self.granularity} {self.period_start}"
@@ -1,12 +1,32 @@
 import logging
-from typing import Optional, Sequence
+import re
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence, Type
 
-from django.db.models import Count, Q
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F, FloatField, Func, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Now, Power
 from django.db.models.query import QuerySet
-from sql_util.utils import SubqueryAggregate
+from django.utils import timezone
+from sql_util.utils import SubqueryAggregate, SubquerySum
 from taggit.models import Tag
 
-from articles.models import Article, ArticleCategory, ArticleComment
+from articles.models import (
+    Article,
+    ArticleCategory,
+    ArticleComment,
+    ArticleViewBucket,
+)
+from articles.settings import (
+    ARTICLE_SEARCH_CONFIG,
+    ARTICLE_TRENDING_COMMENT_WEIGHT,
+    ARTICLE_TRENDING_GRAVITY,
+    ARTICLE_TRENDING_LIKE_WEIGHT,
+    ARTICLE_TRENDING_MAX_AGE_DAYS,
+    ARTICLE_TRENDING_VIEW_WEIGHT,
+    ARTICLE_TRENDING_VIEWS_WINDOW_HOURS,
+)
+from core.text_search import filter_by_prefix_or_similarity
 from users.models import User
 
 
@@ -18,8 +38,6 @@ def find_published_articles() -> QuerySet[Article]:
         Article.objects.filter(is_published=True)
         .select_related("category", "author", "author__profile")
         .prefetch_related("tags")
-        .annotate(likes_count=Count("users_that_liked", distinct=True))
-        .annotate(comments_count=Count("articlecomment", distinct=True))
         .order_by("-created_at")
     )
 
@@ -46,15 +64,53 @@ def find_articles_with_all_tags(
 def find_articles_by_query(
     q: str, queryset: Optional[QuerySet[Article]] = None
 ) -> QuerySet[Article]:
+    """Returns articles matching the full-text search query, ordered by
+    relevance. Every word of the query is matched as a prefix against
+    the article's title, tags, category title and content.
+    """
     if queryset is None:
         queryset = find_published_articles()
 
-    return queryset.filter(
-        Q(title__icontains=q)
-        | Q(content__icontains=q)
-        | Q(category__title__icontains=q)
-        | Q(tags__name__icontains=q)
-    ).distinct()
+    search_query = _build_prefix_search_query(q)
+    if search_query is None:
+        return queryset.none()
+
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(search_rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-search_rank", "-created_at")
+    )
+
+
+def _build_prefix_search_query(q: str) -> Optional[SearchQuery]:
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    raw_query = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(raw_query, search_type="raw", config=ARTICLE_SEARCH_CONFIG)
+
+
+def find_article_title_suggestions(prefix: str, limit: int) -> list[tuple[str, str]]:
+    """Returns (slug, title) pairs of published articles whose titles
+    match the prefix, best matches first.
+    """
+    queryset = Article.objects.filter(is_published=True)
+    return list(
+        filter_by_prefix_or_similarity(queryset, "title", prefix).values_list(
+            "slug", "title"
+        )[:limit]
+    )
+
+
+def find_tag_name_suggestions(prefix: str, limit: int) -> list[tuple[str, str]]:
+    """Returns (name, name) pairs of tags matching the prefix, best
+    matches first.
+    """
+    return list(
+        filter_by_prefix_or_similarity(Tag.objects.all(), "name", prefix).values_list(
+            "name", "name"
+        )[:limit]
+    )
 
 
 def find_article_comments_liked_by_user(article: Article, user: User) -> QuerySet[int]:
@@ -64,19 +120,30 @@ def find_article_comments_liked_by_user(article: Article, user: User) -> QuerySe
     ).values_list("id", flat=True)
 
 
+def find_ids_liked_by_user(
+    model: Type[Article | ArticleComment], ids: Iterable[int], user: User
+) -> QuerySet[int]:
+    """Returns ids of the objects with the specified ids liked by the
+    user"""
+    return model.objects.filter(id__in=ids, users_that_liked=user).values_list(
+        "id", flat=True
+    )
+
+
 def find_comments_to_article(article: Article) -> QuerySet[ArticleComment]:
-    return (
-        ArticleComment.objects.filter(article=article)
-        .select_related("author", "author__profile")
-        .annotate(likes_count=Count("users_that_liked", distinct=True))
+    return ArticleComment.objects.filter(article=article).select_related(
+        "author", "author__profile"
     )
 
 
+def find_comments_by_ids(ids: Iterable[int]) -> QuerySet[ArticleComment]:
+    return ArticleComment.objects.filter(id__in=ids)
+
+
 def get_article_by_slug(article_slug: str) -> Article:
     return (
         Article.objects.select_related("author", "author__profile")
         .prefetch_related("tags")
-        .annotate(likes_count=Count("users_that_liked", distinct=True))
         .get(slug=article_slug)
     )
 
@@ -95,3 +162,77 @@ def get_all_tags() -> QuerySet[Tag]:
 
 def get_comment_by_id(comment_id: int) -> ArticleComment:
     return ArticleComment.objects.get(id=comment_id)
+
+
+def find_article_view_history(
+    article_id: int, granularity: str, since: datetime
+) -> QuerySet[ArticleViewBucket]:
+    """Returns (period_start, views) pairs of the article's hourly or
+    daily view buckets starting at or after `since`, oldest first.
+    Periods without views are omitted.
+    """
+    return ArticleViewBucket.objects.filter(
+        article_id=article_id, granularity=granularity, period_start__gte=since
+    ).values_list("period_start", "views")
+
+
+def find_most_viewed_article_ids(
+    since: datetime,
+    limit: int,
+    granularity: str = ArticleViewBucket.Granularity.HOUR,
+) -> list[tuple[int, int]]:
+    """Returns (article_id, views) pairs of the articles with the most
+    views in the buckets starting at or after `since`, most viewed
+    first.
+    """
+    return list(
+        ArticleViewBucket.objects.filter(
+            granularity=granularity, period_start__gte=since
+        )
+        .values("article_id")
+        .annotate(total_views=Sum("views"))
+        .order_by("-total_views", "article_id")
+        .values_list("article_id", "total_views")[:limit]
+    )
+
+
+def find_trending_article_scores(limit: int) -> list[tuple[int, float]]:
+    """Returns (article_id, score) pairs of the published articles with
+    the highest trending scores, highest first. Recent views are read
+    from the hourly view buckets. See ARTICLE_TRENDING_* settings for
+    the formula.
+    """
+    now = timezone.now()
+    views_since = now - timedelta(hours=ARTICLE_TRENDING_VIEWS_WINDOW_HOURS)
+    age_in_hours = Func(
+        Now() - F("created_at"),
+        template="EXTRACT(EPOCH FROM %(expressions)s) / 3600",
+        output_field=FloatField(),
+    )
+    recent_views = Coalesce(
+        SubquerySum(
+            "view_buckets__views",
+            filter=Q(
+                granularity=ArticleViewBucket.Granularity.HOUR,
+                period_start__gte=views_since,
+            ),
+        ),
+        0,
+    )
+    points = (
+        Cast(recent_views, FloatField()) * ARTICLE_TRENDING_VIEW_WEIGHT
+        + F("likes_count") * ARTICLE_TRENDING_LIKE_WEIGHT
+        + F("comments_count") * ARTICLE_TRENDING_COMMENT_WEIGHT
+    )
+    return list(
+        Article.objects.filter(
+            is_published=True,
+            created_at__gte=now - timedelta(days=ARTICLE_TRENDING_MAX_AGE_DAYS),
+        )
+        .annotate(
+            trending_score=points
+            / Power(age_in_hours + Value(2.0), Value(ARTICLE_TRENDING_GRAVITY))
+        )
+        .order_by("-trending_score", "-created_at")
+        .values_list("id", "trending_score")[:limit]
+    )
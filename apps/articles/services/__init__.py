@@ -1,3 +1,6 @@
+from .analytics import *
 from .articles import *
+from .counters import *
 from .likes import *
 from .media import *
+from .search import *
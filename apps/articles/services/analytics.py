@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime, timedelta
+
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from ..models import ArticleViewBucket, ArticleViewSyncBatch
+from ..settings import ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS
+
+
+logger = logging.getLogger(__name__)
+
+VIEW_BUCKET_PARTITION_NAME = "articles_articleviewbucket_{year:04d}_{month:02d}"
+
+
+def record_hourly_article_views(
+    hour_start: datetime, view_counts: dict[int, int], token: str
+) -> bool:
+    """Adds the views counted within the hour to the hourly and daily
+    view buckets of the articles, skipping deleted articles. As with
+    view deltas, the rollup identified by the token is applied once.
+
+    Returns whether the views were recorded.
+    """
+    day_start = hour_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    _ensure_view_bucket_partition(hour_start)
+
+    article_ids, views = zip(*sorted(view_counts.items()))
+    sql = """
+        INSERT INTO articles_articleviewbucket
+            (article_id, granularity, period_start, views)
+        SELECT counts.article_id, periods.granularity, periods.period_start,
+            counts.views
+        FROM unnest(%s::bigint[], %s::integer[]) AS counts(article_id, views)
+        JOIN articles_article AS article ON article.id = counts.article_id
+        CROSS JOIN (VALUES (%s, %s::timestamptz), (%s, %s::timestamptz))
+            AS periods(granularity, period_start)
+        ON CONFLICT (article_id, granularity, period_start)
+        DO UPDATE SET views = articles_articleviewbucket.views + EXCLUDED.views
+    """
+    params = [
+        list(article_ids),
+        list(views),
+        ArticleViewBucket.Granularity.HOUR,
+        hour_start,
+        ArticleViewBucket.Granularity.DAY,
+        day_start,
+    ]
+
+    with transaction.atomic():
+        _, created = ArticleViewSyncBatch.objects.get_or_create(token=token)
+        if not created:
+            logger.warning("Views of rollup %s have already been recorded.", token)
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+    return True
+
+
+def prune_hourly_article_view_buckets() -> int:
+    """Deletes hourly view buckets older than
+    ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS. Returns the number of
+    deleted buckets.
+    """
+    period_start_before = timezone.now() - timedelta(
+        days=ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS
+    )
+    deleted_count, _ = ArticleViewBucket.objects.filter(
+        granularity=ArticleViewBucket.Granularity.HOUR,
+        period_start__lt=period_start_before,
+    ).delete()
+    return deleted_count
+
+
+_existing_partitions = set()
+
+
+def _ensure_view_bucket_partition(period_start: datetime) -> None:
+    """Creates the partition of view buckets for the month of the
+    period unless it exists. If the partition cannot be created, e.g.
+    because the default partition already has rows of that month, the
+    buckets stay in the default partition.
+    """
+    month_start = period_start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    partition_name = VIEW_BUCKET_PARTITION_NAME.format(
+        year=month_start.year, month=month_start.month
+    )
+    if partition_name in _existing_partitions:
+        return
+
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [partition_name])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    f"CREATE TABLE {partition_name} "
+                    "PARTITION OF articles_articleviewbucket "
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [month_start, next_month_start],
+                )
+                logger.info("Created view bucket partition %s.", partition_name)
+    except DatabaseError as e:
+        logger.warning(
+            "Could not create view bucket partition %s: %s", partition_name, e
+        )
+        return
+    _existing_partitions.add(partition_name)
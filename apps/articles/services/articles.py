@@ -1,10 +1,16 @@
 import logging
+from datetime import timedelta
+from typing import Iterable
 
 from django.db import DatabaseError, connection, transaction
 from django.template.defaultfilters import slugify
+from django.utils import timezone
 from nanoid import generate
 
-from ..models import Article
+from core.cache import get_object_scope, invalidate_scopes
+
+from ..models import Article, ArticleViewSyncBatch
+from ..settings import ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS
 
 
 logger = logging.getLogger(__name__)
@@ -18,9 +24,32 @@ def generate_unique_article_slug(article_title: str) -> str:
     return slug
 
 
+def invalidate_cached_articles(article_ids: Iterable[int]) -> None:
+    """Replaces cached copies of the articles once the current
+    transaction commits."""
+    from ..cache import article_cache
+
+    article_ids = list(article_ids)
+    if article_ids:
+        transaction.on_commit(lambda: article_cache.invalidate(article_ids))
+
+
+def invalidate_article_pages(article_ids: Iterable[int]) -> None:
+    """Marks what the pages of the articles show besides the articles,
+    e.g. their comments, as changed once the current transaction
+    commits."""
+    from ..cache import ARTICLE_PAGE
+
+    scopes = [get_object_scope(ARTICLE_PAGE, article_id) for article_id in article_ids]
+    if scopes:
+        transaction.on_commit(lambda: invalidate_scopes(scopes))
+
+
 def bulk_increment_article_view_counts(view_deltas: dict[int, int]) -> None:
     """Increment article view counts in the DB using a single bulk
-    UPDATE with CASE.
+    UPDATE joined with the unnested arrays of IDs and deltas. The SQL
+    text does not depend on the number of articles, so Postgres parses
+    and plans the same statement for every batch.
 
     view_deltas: a dictionary mapping article IDs to numbers of views
     to increment with.
@@ -29,31 +58,51 @@ def bulk_increment_article_view_counts(view_deltas: dict[int, int]) -> None:
         logger.warning("No deltas to process for bulk update.")
         return
 
-    case_statements = []
-    case_params = []
-    where_placeholders = []
-    where_params = []
-
-    for article_id, view_delta in sorted(view_deltas.items()):
-        case_statements.append("WHEN id = %s THEN views_count + %s")
-        case_params.extend([article_id, view_delta])
-        where_placeholders.append("%s")
-        where_params.append(article_id)
-
-    case_sql = "CASE " + " ".join(case_statements) + " END"
-    where_clause = f"id IN ({', '.join(where_placeholders)})"
-
-    sql_template = """
-        UPDATE articles_article
-        SET views_count = {case_sql}
-        WHERE {where_clause}
+    article_ids, deltas = zip(*sorted(view_deltas.items()))
+    sql = """
+        UPDATE articles_article AS article
+        SET views_count = article.views_count + deltas.view_delta
+        FROM unnest(%s::bigint[], %s::integer[]) AS deltas(id, view_delta)
+        WHERE article.id = deltas.id
     """
-    sql = sql_template.format(case_sql=case_sql, where_clause=where_clause)
-    params = case_params + where_params
+    params = [list(article_ids), list(deltas)]
 
     try:
         with transaction.atomic():
             with connection.cursor() as cursor:
                 cursor.execute(sql, params)
+            invalidate_cached_articles(article_ids)
     except DatabaseError as e:
         logger.exception("Failed to bulk update view counts: %s", e)
+        raise
+
+
+def apply_article_view_deltas(view_deltas: dict[int, int], token: str) -> bool:
+    """Increments article view counts by the deltas unless the batch
+    identified by the token has already been applied. The token is
+    recorded in the same transaction as the update, so a batch is never
+    counted twice.
+
+    Returns whether the deltas were applied.
+    """
+    with transaction.atomic():
+        _, created = ArticleViewSyncBatch.objects.get_or_create(token=token)
+        if not created:
+            logger.warning("View deltas of batch %s have already been applied.", token)
+            return False
+        bulk_increment_article_view_counts(view_deltas)
+    return True
+
+
+def prune_article_view_sync_batches() -> int:
+    """Deletes tokens of batches synced more than
+    ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS ago. Returns the number of
+    deleted tokens.
+    """
+    synced_before = timezone.now() - timedelta(
+        days=ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS
+    )
+    deleted_count, _ = ArticleViewSyncBatch.objects.filter(
+        synced_at__lt=synced_before
+    ).delete()
+    return deleted_count
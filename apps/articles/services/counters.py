@@ -0,0 +1,79 @@
+import logging
+from typing import Iterable, Type
+
+from django.db.models import F, Model
+from django.db.models.functions import Coalesce
+from sql_util.utils import SubqueryCount
+
+from ..models import Article, ArticleComment
+from .articles import invalidate_article_pages, invalidate_cached_articles
+
+
+logger = logging.getLogger(__name__)
+
+
+def adjust_article_comments_count(article_id: int, delta: int) -> None:
+    Article.objects.filter(pk=article_id).update(
+        comments_count=F("comments_count") + delta
+    )
+    invalidate_cached_articles([article_id])
+
+
+def recount_likes(model: Type[Article | ArticleComment], ids: Iterable[int]) -> None:
+    """Recomputes `likes_count` of the specified objects from the likes
+    table.
+    """
+    ids = list(ids)
+    model.objects.filter(pk__in=ids).update(
+        likes_count=Coalesce(SubqueryCount("users_that_liked"), 0)
+    )
+    if model is Article:
+        invalidate_cached_articles(ids)
+    else:
+        invalidate_article_pages(
+            model.objects.filter(pk__in=ids)
+            .values_list("article_id", flat=True)
+            .distinct()
+        )
+
+
+def reconcile_counters() -> dict[str, int]:
+    """Repairs denormalized like and comment counters that drifted from
+    the actual numbers of likes and comments. Returns the number of
+    repaired rows per counter.
+    """
+    from ..cache import invalidate_buffered_likes
+
+    article_like_ids = _repair_counter(Article, "likes_count", "users_that_liked")
+    comment_like_ids = _repair_counter(
+        ArticleComment, "likes_count", "users_that_liked"
+    )
+    # Buffered like state is reloaded along with the repaired counters
+    invalidate_buffered_likes(Article, article_like_ids)
+    invalidate_buffered_likes(ArticleComment, comment_like_ids)
+
+    repaired = {
+        "article likes": len(article_like_ids),
+        "article comments": len(
+            _repair_counter(Article, "comments_count", "articlecomment")
+        ),
+        "comment likes": len(comment_like_ids),
+    }
+    for counter, count in repaired.items():
+        if count:
+            logger.warning("Repaired %d drifted %s counters.", count, counter)
+    return repaired
+
+
+def _repair_counter(model: Type[Model], counter_field: str, relation: str) -> list[int]:
+    """Recomputes the counter of the objects where it drifted. Returns
+    the IDs of the repaired objects."""
+    actual_count = Coalesce(SubqueryCount(relation), 0)
+    drifted_ids = list(
+        model.objects.alias(actual_count=actual_count)
+        .exclude(**{counter_field: F("actual_count")})
+        .values_list("pk", flat=True)
+    )
+    if drifted_ids:
+        model.objects.filter(pk__in=drifted_ids).update(**{counter_field: actual_count})
+    return drifted_ids
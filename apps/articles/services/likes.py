@@ -1,10 +1,16 @@
 import logging
-from typing import Optional
+from typing import Optional, Type
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 
+from users.models import User
+
 from ..models import Article, ArticleComment
+from ..settings import ARTICLE_LIKES_BUFFER_ENABLED
+from .articles import invalidate_article_pages, invalidate_cached_articles
+from .counters import recount_likes
 
 
 logger = logging.getLogger(__name__)
@@ -12,19 +18,110 @@ logger = logging.getLogger(__name__)
 
 def toggle_article_like(article_slug: str, user_id: int) -> int:
     article = get_object_or_404(Article, slug=article_slug)
-    return toggle_like(article, user_id)
+    return _toggle_like(article, user_id)
 
 
 def toggle_comment_like(comment_id: int, user_id: int) -> Optional[int]:
     comment = get_object_or_404(ArticleComment, id=comment_id)
-    return toggle_like(comment, user_id)
+    return _toggle_like(comment, user_id)
+
+
+def _toggle_like(obj: Article | ArticleComment, user_id: int) -> int:
+    if ARTICLE_LIKES_BUFFER_ENABLED:
+        from ..cache import toggle_buffered_like
+
+        return toggle_buffered_like(obj, user_id)
+    return toggle_like(obj, user_id)
 
 
 @transaction.atomic
 def toggle_like(obj: Article | ArticleComment, user_id: int) -> int:
-    if obj.users_that_liked.filter(id=user_id).exists():
-        obj.users_that_liked.remove(user_id)
+    """Likes the object on behalf of the user or removes the existing
+    like. The object's `likes_count` is adjusted by the number of
+    actually inserted or deleted likes with an atomic F() update.
+
+    Returns the updated number of likes.
+    """
+    manager = obj.users_that_liked
+    like_lookup = {
+        f"{manager.source_field_name}_id": obj.pk,
+        f"{manager.target_field_name}_id": user_id,
+    }
+
+    deleted_count, _ = manager.through.objects.filter(**like_lookup).delete()
+    if deleted_count:
+        delta = -deleted_count
+    else:
+        try:
+            with transaction.atomic():
+                manager.through.objects.create(**like_lookup)
+            delta = 1
+        except IntegrityError:
+            # A concurrent request of the same user has already liked it
+            delta = 0
+
+    model = type(obj)
+    model.objects.filter(pk=obj.pk).update(likes_count=F("likes_count") + delta)
+    from ..cache import invalidate_buffered_likes
+
+    invalidate_buffered_likes(model, [obj.pk])
+    if model is Article:
+        invalidate_cached_articles([obj.pk])
     else:
-        obj.users_that_liked.add(user_id)
+        invalidate_article_pages([obj.article_id])
+    obj.likes_count = model.objects.values_list("likes_count", flat=True).get(pk=obj.pk)
+    return obj.likes_count
+
+
+@transaction.atomic
+def apply_like_changes(
+    model: Type[Article | ArticleComment], like_changes: dict[int, dict[int, bool]]
+) -> None:
+    """Writes buffered like changes ({object ID: {user ID: liked}}) to the
+    likes table in bulk and recounts `likes_count` of the changed
+    objects. Changes of objects or users that no longer exist are
+    skipped.
+    """
+    field = model.users_that_liked.field
+    object_field = f"{field.m2m_field_name()}_id"
+    user_field = f"{field.m2m_reverse_field_name()}_id"
+    through = model.users_that_liked.through
+
+    object_ids = set(
+        model.objects.filter(pk__in=like_changes).values_list("pk", flat=True)
+    )
+    user_ids = set(
+        User.objects.filter(
+            pk__in={user_id for changes in like_changes.values() for user_id in changes}
+        ).values_list("pk", flat=True)
+    )
+
+    new_likes = []
+    removed_likes = set()
+    for object_id in object_ids:
+        for user_id, liked in like_changes[object_id].items():
+            if not liked:
+                removed_likes.add((object_id, user_id))
+            elif user_id in user_ids:
+                new_likes.append(
+                    through(**{object_field: object_id, user_field: user_id})
+                )
 
-    return obj.users_that_liked.count()
+    through.objects.bulk_create(new_likes, ignore_conflicts=True)
+    if removed_likes:
+        # Narrows the rows down by both columns and matches the exact
+        # pairs here instead of OR-ing one condition per removed like
+        candidate_likes = through.objects.filter(
+            **{
+                f"{object_field}__in": {object_id for object_id, _ in removed_likes},
+                f"{user_field}__in": {user_id for _, user_id in removed_likes},
+            }
+        ).values_list("pk", object_field, user_field)
+        through.objects.filter(
+            pk__in=[
+                pk
+                for pk, object_id, user_id in candidate_likes
+                if (object_id, user_id) in removed_likes
+            ]
+        ).delete()
+    recount_likes(model, object_ids)
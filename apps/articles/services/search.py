@@ -0,0 +1,73 @@
+import logging
+from html import unescape
+from typing import Iterable
+
+from django.contrib.postgres.search import CombinedSearchVector, SearchVector
+from django.db.models import TextField, Value
+from django.utils.html import strip_tags
+
+from ..models import Article
+from ..settings import ARTICLE_SEARCH_CONFIG
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_article_search_vector(article: Article) -> CombinedSearchVector:
+    """Builds a weighted search vector expression for the article:
+    title (A) > tags (B) > category title (C) > content (D). HTML markup
+    is stripped from the content before indexing.
+    """
+    return build_weighted_search_vector(
+        article.title,
+        article.tags.names(),
+        article.category.title if article.category else "",
+        article.content,
+    )
+
+
+def build_weighted_search_vector(
+    title: str, tag_names: Iterable[str], category_title: str, content: str
+) -> CombinedSearchVector:
+    """Builds the search vector expression of `build_article_search_vector`
+    from plain values, so that it can be used with historical models."""
+    return (
+        _weighted_search_vector(title, "A")
+        + _weighted_search_vector(" ".join(tag_names), "B")
+        + _weighted_search_vector(category_title, "C")
+        + _weighted_search_vector(unescape(strip_tags(content)), "D")
+    )
+
+
+def update_article_search_vector(article_id: int) -> None:
+    try:
+        article = Article.objects.select_related("category").get(pk=article_id)
+    except Article.DoesNotExist:
+        logger.warning(
+            "Could not update search vector: article %s does not exist.", article_id
+        )
+        return
+
+    Article.objects.filter(pk=article_id).update(
+        search_vector=build_article_search_vector(article)
+    )
+
+
+def rebuild_article_search_vectors(article_ids: Iterable[int]) -> int:
+    """Recomputes search vectors of the specified articles. Returns the
+    number of updated articles.
+    """
+    updated_count = 0
+    for article_id in article_ids:
+        update_article_search_vector(article_id)
+        updated_count += 1
+    logger.info("Rebuilt search vectors for %d articles.", updated_count)
+    return updated_count
+
+
+def _weighted_search_vector(text: str, weight: str) -> SearchVector:
+    return SearchVector(
+        Value(text, output_field=TextField()),
+        weight=weight,
+        config=ARTICLE_SEARCH_CONFIG,
+    )
@@ -4,6 +4,42 @@ import os
 # Indicates how many articles will be displayed by paginator on the home page
 ARTICLES_PER_PAGE_COUNT = int(os.getenv("ARTICLES_PER_PAGE_COUNT", "5"))
 
+# Pagination of the article list:
+# - "offset": numbered pages.
+# - "cursor": "previous" and "next" pages linked by cursors on the ordering
+#   keys, so deep pages cost as much as the first one. Orderings that cannot
+#   be paginated by keys (e.g. trending) fall back to numbered pages.
+ARTICLE_LIST_PAGINATION = os.getenv("ARTICLE_LIST_PAGINATION", "offset")
+
+# Counting of the articles matching the list filters:
+# - "exact": COUNT(*) on every page.
+# - "cached": COUNT(*) cached for ARTICLE_LIST_COUNT_CACHE_TIMEOUT seconds.
+# - "estimated": as "cached", but lists that the Postgres planner estimates to
+#   be longer than ARTICLE_LIST_EXACT_COUNT_LIMIT are not counted and the
+#   estimate is shown instead. Only used with "cursor" pagination, since
+#   numbered pages need an exact count; "cached" is used otherwise.
+ARTICLE_LIST_COUNT = os.getenv("ARTICLE_LIST_COUNT", "exact")
+ARTICLE_LIST_COUNT_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_LIST_COUNT_CACHE_TIMEOUT", "60")  # 1 minute
+)
+ARTICLE_LIST_EXACT_COUNT_LIMIT = int(
+    os.getenv("ARTICLE_LIST_EXACT_COUNT_LIMIT", "1000")
+)
+
+# Timeout (in seconds) of the cached results of article list filters by
+# author, category, tags and date: the ordered IDs of the first
+# ARTICLE_FILTER_RESULT_CACHE_MAX_IDS matching articles and their count. The
+# results are invalidated earlier when an article of the filtered author,
+# category or tags is published, changed or deleted; the timeout bounds how
+# stale orderings by views and likes may get. Text search and trending results
+# are not cached. Used with "offset" pagination only. 0 disables the cache.
+ARTICLE_FILTER_RESULT_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_FILTER_RESULT_CACHE_TIMEOUT", "0")
+)
+ARTICLE_FILTER_RESULT_CACHE_MAX_IDS = int(
+    os.getenv("ARTICLE_FILTER_RESULT_CACHE_MAX_IDS", "1000")
+)
+
 # Indicates how many chars of a long comment will be displayed by __str__ method
 DISPLAYED_COMMENT_LENGTH = int(os.getenv("DISPLAYED_COMMENT_LENGTH", "25"))
 
@@ -13,11 +49,75 @@ ARTICLE_UNIQUE_VIEW_TIMEOUT = int(
     os.getenv("ARTICLE_UNIQUE_VIEW_TIMEOUT", "3600")  # 1 hour
 )
 
+# Backend used to count each viewer of an article once per
+# ARTICLE_UNIQUE_VIEW_TIMEOUT:
+# - "keys": a Redis key per article and viewer. Exact, but memory grows with
+#   the number of viewers.
+# - "hyperloglog": a HyperLogLog per article and time window of
+#   ARTICLE_UNIQUE_VIEW_TIMEOUT seconds (at most 12 KB each). Counts are
+#   estimates with a standard error of 0.81%; windows are fixed rather than
+#   sliding.
+# Both backends feed the same cached view deltas, so the backend can be switched
+# at any time. Viewers seen shortly before a switch may be counted once more.
+ARTICLE_VIEW_DEDUP_BACKEND = os.getenv("ARTICLE_VIEW_DEDUP_BACKEND", "keys")
+
 # Article details page cache timeout (for anonymous users only) in seconds.
+# Pages are cached minified and compressed, by the version of the article, so
+# a changed article is rendered anew.
 ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT = int(
     os.getenv("ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT", "300")  # 5 minutes
 )
 
+# Timeout (in seconds) for which shared caches in front of the app (e.g. nginx)
+# may serve the article list and details pages. The pages are then rendered the
+# same for all users, and personal state (likes, the header, notifications) is
+# fetched by the page from the `article-page-state` endpoint, which also counts
+# the views. Cached details pages and the first list page are refreshed when an
+# article or its comments change; other list pages expire. 0 disables it, and
+# pages are rendered per user.
+ARTICLE_EDGE_CACHE_TIMEOUT = int(os.getenv("ARTICLE_EDGE_CACHE_TIMEOUT", "0"))
+
+# Max number of articles and comments whose state can be requested at once.
+ARTICLE_PAGE_STATE_MAX_IDS = int(os.getenv("ARTICLE_PAGE_STATE_MAX_IDS", "500"))
+
+# Time (in seconds) for which the ETag of a rendered article list page is
+# cached, so that revalidated pages can be answered with 304 Not Modified
+# without rendering them. The ETag is dropped earlier when the listed articles
+# or the list filters change, but not when articles outside the page gain
+# likes or views and move onto it. Search and trending pages get no ETag. 0
+# disables ETags of list pages. Details pages always get validators, computed
+# from the versions of the cached article.
+ARTICLE_LIST_ETAG_TIMEOUT = int(os.getenv("ARTICLE_LIST_ETAG_TIMEOUT", "60"))
+
+# Timeout (in seconds) of the cached article slug -> ID mapping used to
+# count views without querying the database.
+ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT", "86400")  # 1 day
+)
+
+# Timeout (in seconds) during which a slug that does not belong to any article
+# is remembered as unknown.
+ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT", "60")  # 1 minute
+)
+
+# Timeout (in seconds) of cached articles. A cached article is also replaced
+# as soon as it, its counters, its author, category or tags change.
+ARTICLE_CACHE_TIMEOUT = int(os.getenv("ARTICLE_CACHE_TIMEOUT", "3600"))  # 1 hour
+
+# Timeout (in seconds) of the cached list of categories. The list is also
+# replaced as soon as a category or a published article changes.
+ARTICLE_CATEGORIES_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_CATEGORIES_CACHE_TIMEOUT", "3600")  # 1 hour
+)
+
+# Timeout (in seconds) of the cached markup of article cards and comments,
+# shared by all users. A fragment is rendered anew as soon as the article or
+# comment, its author, category, tags or counters change.
+ARTICLE_FRAGMENT_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_FRAGMENT_CACHE_TIMEOUT", "3600")  # 1 hour
+)
+
 # Max number of iterations when syncing article views from cache to database.
 ARTICLE_VIEW_SYNC_MAX_ITERATIONS = int(
     os.getenv("ARTICLE_VIEW_SYNC_MAX_ITERATIONS", "20")
@@ -27,3 +127,93 @@ ARTICLE_VIEW_SYNC_MAX_ITERATIONS = int(
 ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE = int(
     os.getenv("ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE", "500")
 )
+
+# Min number of articles to process in each batch when syncing a shard of
+# article views. The batch size grows with the backlog of the shard up to
+# ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE.
+ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE = int(
+    os.getenv("ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE", "50")
+)
+
+# Number of shards of pending article view syncs, synced in parallel.
+ARTICLE_VIEW_SYNC_SHARDS = int(os.getenv("ARTICLE_VIEW_SYNC_SHARDS", "4"))
+
+# Max time (in seconds) a worker may hold a shard of article views for sync.
+ARTICLE_VIEW_SYNC_LOCK_TIMEOUT = int(
+    os.getenv("ARTICLE_VIEW_SYNC_LOCK_TIMEOUT", "300")  # 5 minutes
+)
+
+# Time (in days) during which tokens of synced batches of article views are
+# kept to make retried syncs of the same batch idempotent.
+ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS = int(
+    os.getenv("ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS", "1")
+)
+
+# Time (in days) during which hourly article view buckets are kept in the
+# database. Daily buckets are kept indefinitely.
+ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS = int(
+    os.getenv("ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS", "30")
+)
+
+# Max number of days of view history an author can request for an article.
+ARTICLE_VIEW_HISTORY_MAX_DAYS = int(os.getenv("ARTICLE_VIEW_HISTORY_MAX_DAYS", "365"))
+
+# Trending articles are ranked by a score that decays with the article's age:
+#   (VIEW_WEIGHT * views in the last VIEWS_WINDOW_HOURS
+#    + LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments)
+#   / (age in hours + 2) ** GRAVITY
+# Only published articles younger than MAX_AGE_DAYS are ranked, and the top
+# SIZE of them are kept by the `update_trending_articles_task` Celery task,
+# which must be scheduled.
+ARTICLE_TRENDING_VIEW_WEIGHT = float(os.getenv("ARTICLE_TRENDING_VIEW_WEIGHT", "1"))
+ARTICLE_TRENDING_LIKE_WEIGHT = float(os.getenv("ARTICLE_TRENDING_LIKE_WEIGHT", "5"))
+ARTICLE_TRENDING_COMMENT_WEIGHT = float(
+    os.getenv("ARTICLE_TRENDING_COMMENT_WEIGHT", "10")
+)
+ARTICLE_TRENDING_GRAVITY = float(os.getenv("ARTICLE_TRENDING_GRAVITY", "1.8"))
+ARTICLE_TRENDING_VIEWS_WINDOW_HOURS = int(
+    os.getenv("ARTICLE_TRENDING_VIEWS_WINDOW_HOURS", "48")
+)
+ARTICLE_TRENDING_MAX_AGE_DAYS = int(os.getenv("ARTICLE_TRENDING_MAX_AGE_DAYS", "30"))
+ARTICLE_TRENDING_SIZE = int(os.getenv("ARTICLE_TRENDING_SIZE", "500"))
+
+# Enables buffering of article and comment likes in Redis. Like state is
+# answered from Redis and periodically flushed to the database by the
+# `sync_buffered_likes_task` Celery task, which must be scheduled.
+ARTICLE_LIKES_BUFFER_ENABLED = bool(int(os.getenv("ARTICLE_LIKES_BUFFER_ENABLED", "0")))
+
+# Time in seconds for which buffered like state of an object is kept in Redis
+# after it was last liked or unliked. Once it expires, it is reloaded from the
+# database with the changes that are not synced yet applied on top.
+ARTICLE_LIKES_BUFFER_TIMEOUT = int(os.getenv("ARTICLE_LIKES_BUFFER_TIMEOUT", "86400"))
+
+# Max number of iterations when syncing buffered likes from cache to database.
+ARTICLE_LIKE_SYNC_MAX_ITERATIONS = int(
+    os.getenv("ARTICLE_LIKE_SYNC_MAX_ITERATIONS", "20")
+)
+
+# Max number of liked objects to process in each batch when syncing likes.
+ARTICLE_LIKE_SYNC_MAX_BATCH_SIZE = int(
+    os.getenv("ARTICLE_LIKE_SYNC_MAX_BATCH_SIZE", "500")
+)
+
+# Postgres text search configuration used both for building article search
+# vectors and for parsing search queries. The "simple" configuration does not
+# drop stop words or stem, which keeps prefix matching predictable. Changing
+# it requires running the `rebuild_article_search_vectors` command.
+ARTICLE_SEARCH_CONFIG = os.getenv("ARTICLE_SEARCH_CONFIG", "simple")
+
+# Max number of suggestions returned by the typeahead endpoint.
+ARTICLE_TYPEAHEAD_RESULTS_LIMIT = int(
+    os.getenv("ARTICLE_TYPEAHEAD_RESULTS_LIMIT", "10")
+)
+
+# Min length of a prefix for which typeahead suggestions are looked up.
+ARTICLE_TYPEAHEAD_MIN_PREFIX_LENGTH = int(
+    os.getenv("ARTICLE_TYPEAHEAD_MIN_PREFIX_LENGTH", "2")
+)
+
+# Typeahead suggestions cache timeout in seconds.
+ARTICLE_TYPEAHEAD_CACHE_TIMEOUT = int(
+    os.getenv("ARTICLE_TYPEAHEAD_CACHE_TIMEOUT", "60")  # 1 minute
+)
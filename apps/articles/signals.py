@@ -1,13 +1,35 @@
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.urls import reverse
+from taggit.models import Tag
 
+from core.cache import get_object_scope, invalidate_scopes
+from core.tasks import refresh_edge_cached_pages_task
 from notifications.tasks import (
     send_new_article_notification,
     send_new_comment_notification,
 )
+from users.models import Profile, User
 
-from .models import Article, ArticleComment
+from .cache import (
+    ARTICLE_CACHE,
+    ARTICLE_PAGE,
+    CATEGORIES_SCOPE,
+    PUBLISHED_ARTICLES_SCOPE,
+    cache_article_id_by_slug,
+    get_article_filter_result_scopes,
+    invalidate_article_id_by_slug,
+    invalidate_buffered_likes,
+)
+from .models import Article, ArticleCategory, ArticleComment
+from .services import (
+    adjust_article_comments_count,
+    rebuild_article_search_vectors,
+    recount_likes,
+    update_article_search_vector,
+)
+from .settings import ARTICLE_EDGE_CACHE_TIMEOUT
 from .tasks import delete_article_inline_media_task
 
 
@@ -19,12 +41,214 @@ def send_article_notification(sender, instance, created, **kwargs) -> None:
         )
 
 
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def refresh_edge_cached_pages_on_article_change(sender, instance, **kwargs) -> None:
+    if not ARTICLE_EDGE_CACHE_TIMEOUT or kwargs.get("raw", False):
+        return
+    paths = [reverse("articles"), instance.get_absolute_url()]
+    if instance.slug_changed():
+        paths.append(reverse("article-details", args=[instance.original_slug]))
+    transaction.on_commit(lambda: refresh_edge_cached_pages_task.delay(paths))
+
+
+@receiver(post_save, sender=ArticleComment)
+@receiver(post_delete, sender=ArticleComment)
+def refresh_edge_cached_pages_on_comment_change(sender, instance, **kwargs) -> None:
+    if not ARTICLE_EDGE_CACHE_TIMEOUT or kwargs.get("raw", False):
+        return
+    article_slug = (
+        Article.objects.filter(id=instance.article_id)
+        .values_list("slug", flat=True)
+        .first()
+    )
+    if article_slug is None:
+        return
+    paths = [reverse("articles"), reverse("article-details", args=[article_slug])]
+    transaction.on_commit(lambda: refresh_edge_cached_pages_task.delay(paths))
+
+
+@receiver(post_save, sender=Article)
+def cache_article_id_on_article_save(sender, instance, **kwargs) -> None:
+    if kwargs.get("raw", False):
+        return
+
+    article_id, slug = instance.id, instance.slug
+    original_slug = instance.original_slug if instance.slug_changed() else None
+
+    def update_cached_article_id() -> None:
+        if original_slug:
+            invalidate_article_id_by_slug(original_slug)
+        cache_article_id_by_slug(slug, article_id)
+
+    transaction.on_commit(update_cached_article_id)
+
+
+@receiver(post_delete, sender=Article)
+def invalidate_article_id_on_article_delete(sender, instance, **kwargs) -> None:
+    slug = instance.slug
+    transaction.on_commit(lambda: invalidate_article_id_by_slug(slug))
+
+
+@receiver(post_save, sender=Article)
+def invalidate_cached_article_on_article_save(sender, instance, **kwargs) -> None:
+    """Replaces the cached article. If the article is or was published,
+    cached filter results and categories that depend on it are replaced
+    as well."""
+    if kwargs.get("raw", False):
+        return
+
+    is_listed = instance.original_is_published or instance.is_published
+    category_ids = {instance.original_category_id, instance.category_id}
+
+    def invalidate_cached_values() -> None:
+        scopes = [get_object_scope(ARTICLE_CACHE, instance.id)]
+        if is_listed:
+            scopes += [
+                PUBLISHED_ARTICLES_SCOPE,
+                *get_article_filter_result_scopes(
+                    instance.author_id,
+                    category_ids,
+                    instance.tags.values_list("id", flat=True),
+                ),
+            ]
+        invalidate_scopes(scopes)
+
+    transaction.on_commit(invalidate_cached_values)
+
+
+@receiver(pre_delete, sender=Article)
+def invalidate_cached_article_on_article_delete(sender, instance, **kwargs) -> None:
+    scopes = [get_object_scope(ARTICLE_CACHE, instance.id)]
+    if instance.original_is_published or instance.is_published:
+        scopes += [
+            PUBLISHED_ARTICLES_SCOPE,
+            *get_article_filter_result_scopes(
+                instance.author_id,
+                {instance.original_category_id, instance.category_id},
+                instance.tags.values_list("id", flat=True),
+            ),
+        ]
+    transaction.on_commit(lambda: invalidate_scopes(scopes))
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_cached_article_on_tags_change(
+    sender, instance, action, pk_set, **kwargs
+) -> None:
+    """Of the cached filter results, only the ones filtered by the added
+    or removed tags are affected: results of other filters do not depend
+    on the tags of the articles."""
+    if not isinstance(instance, Article):
+        return
+    if action in ("post_add", "post_remove"):
+        tag_ids = pk_set
+    elif action == "pre_clear":
+        tag_ids = list(instance.tags.values_list("id", flat=True))
+    else:
+        return
+    if not tag_ids:
+        return
+
+    scopes = [get_object_scope(ARTICLE_CACHE, instance.id)]
+    if instance.is_published:
+        scopes += get_article_filter_result_scopes(tag_ids=tag_ids)
+    transaction.on_commit(lambda: invalidate_scopes(scopes))
+
+
+@receiver(post_save, sender=ArticleCategory)
+@receiver(post_delete, sender=ArticleCategory)
+def invalidate_cached_category(sender, instance, **kwargs) -> None:
+    scopes = [get_object_scope("category", instance.id), CATEGORIES_SCOPE]
+    transaction.on_commit(lambda: invalidate_scopes(scopes))
+
+
+@receiver(post_save, sender=ArticleComment)
+@receiver(post_delete, sender=ArticleComment)
+def invalidate_cached_comment(sender, instance, **kwargs) -> None:
+    scopes = [
+        get_object_scope("comment", instance.id),
+        get_object_scope(ARTICLE_PAGE, instance.article_id),
+    ]
+    transaction.on_commit(lambda: invalidate_scopes(scopes))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cached_tag(sender, instance, **kwargs) -> None:
+    scope = get_object_scope("tag", instance.id)
+    transaction.on_commit(lambda: invalidate_scopes([scope]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Profile)
+def invalidate_cached_user(sender, instance, **kwargs) -> None:
+    """Replaces cached articles of the user, which include the user and
+    their profile."""
+    if kwargs.get("update_fields") == {"last_login"}:
+        return
+    user_id = instance.id if isinstance(instance, User) else instance.user_id
+    scope = get_object_scope("user", user_id)
+    transaction.on_commit(lambda: invalidate_scopes([scope]))
+
+
+@receiver(post_save, sender=Article)
+def update_search_vector_on_article_save(sender, instance, **kwargs) -> None:
+    if not kwargs.get("raw", False):
+        update_article_search_vector(instance.id)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_search_vector_on_tags_change(sender, instance, action, **kwargs) -> None:
+    if isinstance(instance, Article) and action in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        update_article_search_vector(instance.id)
+
+
+@receiver(post_save, sender=ArticleCategory)
+def update_search_vectors_on_category_save(sender, instance, created, **kwargs) -> None:
+    if created or kwargs.get("raw", False):
+        return
+    article_ids = Article.objects.filter(category=instance).values_list("id", flat=True)
+    rebuild_article_search_vectors(article_ids)
+
+
 @receiver(post_save, sender=ArticleComment)
 def send_comment_notification(sender, instance, created, **kwargs) -> None:
     if created and not kwargs.get("raw", False):
         send_new_comment_notification.delay(instance.id, instance.article.author.id)
 
 
+@receiver(post_save, sender=ArticleComment)
+def increment_comments_count(sender, instance, created, **kwargs) -> None:
+    if created and not kwargs.get("raw", False):
+        adjust_article_comments_count(instance.article_id, 1)
+
+
+@receiver(post_delete, sender=ArticleComment)
+def decrement_comments_count(sender, instance, **kwargs) -> None:
+    adjust_article_comments_count(instance.article_id, -1)
+
+
+@receiver(m2m_changed, sender=Article.users_that_liked.through)
+@receiver(m2m_changed, sender=ArticleComment.users_that_liked.through)
+def recount_likes_on_m2m_change(sender, instance, action, model, pk_set, **kwargs):
+    """Keeps `likes_count` consistent when likes are changed through the
+    M2M managers (e.g. in the admin) rather than by `toggle_like`.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not kwargs["reverse"]:
+        recount_likes(type(instance), [instance.pk])
+        invalidate_buffered_likes(type(instance), [instance.pk])
+    elif pk_set:
+        recount_likes(model, pk_set)
+        invalidate_buffered_likes(model, pk_set)
+
+
 @receiver(post_delete, sender=Article)
 def delete_article_media_files(sender, instance, **kwargs) -> None:
     delete_article_inline_media_task.delay(instance.id, instance.author.id)
@@ -1,12 +1,25 @@
 import logging
 
 from botocore.exceptions import BotoCoreError, ClientError
+from celery import chord
 from celery.exceptions import SoftTimeLimitExceeded
 
 from config.celery import app
 
-from .cache import sync_article_views
-from .services import delete_media_files_attached_to_article
+from .cache import (
+    distribute_pending_view_syncs,
+    roll_up_hourly_article_views,
+    sync_article_view_shard,
+    sync_buffered_likes,
+    update_trending_articles,
+)
+from .services import (
+    delete_media_files_attached_to_article,
+    prune_article_view_sync_batches,
+    prune_hourly_article_view_buckets,
+    reconcile_counters,
+)
+from .settings import ARTICLE_VIEW_SYNC_LOCK_TIMEOUT
 
 
 logger = logging.getLogger(__name__)
@@ -14,8 +27,77 @@ logger = logging.getLogger(__name__)
 
 @app.task
 def sync_article_views_task() -> None:
-    sync_article_views()
-    logger.info("Updated article view counts")
+    """Fans out syncing of pending article views to a worker per
+    non-empty shard and logs the combined metrics once all of them are
+    done.
+    """
+    backlogs = distribute_pending_view_syncs()
+    shards = [shard for shard, backlog in backlogs.items() if backlog]
+    if not shards:
+        logger.info("No article views to sync")
+        return
+
+    chord(sync_article_view_shard_task.s(shard) for shard in shards)(
+        log_article_view_sync_metrics_task.s()
+    )
+    logger.info("Dispatched article view sync of shards: %s", backlogs)
+
+
+@app.task(soft_time_limit=ARTICLE_VIEW_SYNC_LOCK_TIMEOUT - 10)
+def sync_article_view_shard_task(shard: int) -> dict[str, int | float]:
+    return sync_article_view_shard(shard)
+
+
+@app.task
+def log_article_view_sync_metrics_task(shard_metrics: list[dict]) -> None:
+    synced_shards = [metrics for metrics in shard_metrics if not metrics.get("skipped")]
+    logger.info(
+        "Updated article view counts: synced %d of %d articles in %d shards "
+        "(%d skipped), slowest shard took %.3f s",
+        sum(metrics["synced_articles"] for metrics in synced_shards),
+        sum(metrics["articles"] for metrics in synced_shards),
+        len(synced_shards),
+        len(shard_metrics) - len(synced_shards),
+        max((metrics["duration"] for metrics in synced_shards), default=0),
+    )
+
+
+@app.task
+def sync_buffered_likes_task() -> None:
+    sync_buffered_likes()
+    logger.info("Synced buffered likes")
+
+
+@app.task
+def roll_up_article_views_task() -> None:
+    """Rolls up views of the closed hours into the hourly and daily view
+    buckets and deletes the expired hourly buckets.
+    """
+    rolled_up_hours = roll_up_hourly_article_views()
+    deleted = prune_hourly_article_view_buckets()
+    logger.info(
+        "Rolled up article views of %d hours; pruned %d hourly view buckets",
+        rolled_up_hours,
+        deleted,
+    )
+
+
+@app.task
+def update_trending_articles_task() -> None:
+    ranked = update_trending_articles()
+    logger.info("Updated trending articles: %d ranked", ranked)
+
+
+@app.task
+def prune_article_view_sync_batches_task() -> None:
+    deleted = prune_article_view_sync_batches()
+    logger.info("Pruned %d applied article view sync batches", deleted)
+
+
+@app.task
+def reconcile_counters_task() -> None:
+    repaired = reconcile_counters()
+    logger.info("Reconciled article counters: %s", repaired)
 
 
 @app.task(
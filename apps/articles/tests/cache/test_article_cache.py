@@ -0,0 +1,133 @@
+from unittest.mock import call, patch
+
+from cachalot.api import cachalot_disabled
+from django.core.cache import cache
+from django.test import TestCase
+
+from articles.cache import (
+    ARTICLE_ID_BY_SLUG_KEY,
+    cache_article_id_by_slug,
+    get_article_id_by_slug,
+    get_cached_article_by_slug,
+    get_cached_categories,
+    invalidate_article_id_by_slug,
+)
+from articles.models import Article, ArticleCategory
+from articles.services import adjust_article_comments_count
+from articles.settings import (
+    ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT,
+    ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT,
+)
+from users.models import User
+
+
+class TestGetArticleIdBySlug(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        cache.clear()
+        self.user = User.objects.create_user(username="user", email="u@test.com")
+        self.article = Article.objects.create(
+            title="a1", author=self.user, preview_text="text", content="content"
+        )
+        cache.clear()
+
+    def test_cached_after_first_lookup(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_article_id_by_slug("a1"), self.article.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_article_id_by_slug("a1"), self.article.id)
+
+    def test_unknown_slug_cached(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_article_id_by_slug("unknown"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_article_id_by_slug("unknown"))
+
+        cache_article_id_by_slug("unknown", self.article.id)
+        self.assertEqual(get_article_id_by_slug("unknown"), self.article.id)
+
+    @patch("articles.cache.articles.cache")
+    def test_cache_timeouts(self, mock_cache):
+        cache_article_id_by_slug("a1", self.article.id)
+        cache_article_id_by_slug("unknown", None)
+        mock_cache.set.assert_has_calls(
+            [
+                call(
+                    ARTICLE_ID_BY_SLUG_KEY.format(slug="a1"),
+                    self.article.id,
+                    timeout=ARTICLE_ID_BY_SLUG_CACHE_TIMEOUT,
+                ),
+                call(
+                    ARTICLE_ID_BY_SLUG_KEY.format(slug="unknown"),
+                    0,
+                    timeout=ARTICLE_ID_BY_SLUG_NEGATIVE_CACHE_TIMEOUT,
+                ),
+            ]
+        )
+
+    def test_invalidate(self):
+        get_article_id_by_slug("a1")
+        invalidate_article_id_by_slug("a1")
+        with self.assertNumQueries(1):
+            get_article_id_by_slug("a1")
+
+
+class TestArticleObjectCache(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        self.user = User.objects.create_user(username="user", email="u@test.com")
+        self.category = ArticleCategory.objects.create(title="c1", slug="c1")
+        self.article = Article.objects.create(
+            title="a1",
+            slug="a1",
+            author=self.user,
+            category=self.category,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        cache.clear()
+
+    def test_get_cached_article_by_slug(self):
+        with self.assertNumQueries(3):
+            article = get_cached_article_by_slug("a1")
+        self.assertEqual(article, self.article)
+        self.assertEqual(article.category, self.category)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_article_by_slug("a1"), self.article)
+
+        with self.assertRaises(Article.DoesNotExist):
+            get_cached_article_by_slug("unknown")
+
+    def test_outdated_slug_mapping(self):
+        cache_article_id_by_slug("a1", self.article.id + 1)
+        self.assertEqual(get_cached_article_by_slug("a1"), self.article)
+        self.assertEqual(get_article_id_by_slug("a1"), self.article.id)
+
+    def test_article_invalidated_on_counter_change(self):
+        get_cached_article_by_slug("a1")
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_article_comments_count(self.article.id, 2)
+        self.assertEqual(get_cached_article_by_slug("a1").comments_count, 2)
+
+    def test_article_invalidated_on_related_object_change(self):
+        get_cached_article_by_slug("a1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.title = "c2"
+            self.category.save()
+        self.assertEqual(get_cached_article_by_slug("a1").category.title, "c2")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = "user2"
+            self.user.save()
+        self.assertEqual(get_cached_article_by_slug("a1").author.username, "user2")
+
+    def test_get_cached_categories(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_cached_categories(), [self.category])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_categories(), [self.category])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            category = ArticleCategory.objects.create(title="c0", slug="c0")
+        self.assertCountEqual(get_cached_categories(), [self.category, category])
@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+from cachalot.api import cachalot_disabled
+from django.core.cache import cache
+from django.test import TestCase
+
+from articles.cache import (
+    get_article_filter_result_scopes,
+    get_cached_article_filter_results,
+)
+from articles.models import Article
+from core.cache import SCOPE_VERSION_KEY, invalidate_scopes
+from users.models import User
+
+
+@patch("articles.cache.article_lists.ARTICLE_FILTER_RESULT_CACHE_TIMEOUT", 60)
+class TestArticleFilterResultCache(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        self.user = User.objects.create_user(username="user", email="u@test.com")
+        self.articles = [
+            Article.objects.create(
+                title=f"a{i}",
+                author=self.user,
+                preview_text="text",
+                content="content",
+                is_published=True,
+            )
+            for i in range(3)
+        ]
+        self.queryset = Article.objects.filter(is_published=True).order_by("-id")
+        self.params = {"author": self.user.id}
+        self.scopes = get_article_filter_result_scopes(self.user.id)
+        cache.clear()
+
+    def test_get_article_filter_result_scopes(self):
+        self.assertEqual(
+            get_article_filter_result_scopes(1, [None, 3, 2, 3], {5, 4}),
+            [
+                "articles:author:1",
+                "articles:category:2",
+                "articles:category:3",
+                "articles:tag:4",
+                "articles:tag:5",
+            ],
+        )
+        self.assertEqual(get_article_filter_result_scopes(category_ids=[None]), [])
+
+    def test_results_cached(self):
+        expected = ([a.id for a in reversed(self.articles)], 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_cached_article_filter_results(
+                    self.queryset, self.params, self.scopes
+                ),
+                expected,
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_cached_article_filter_results(
+                    self.queryset, self.params, self.scopes
+                ),
+                expected,
+            )
+
+    @patch("articles.cache.article_lists.ARTICLE_FILTER_RESULT_CACHE_MAX_IDS", 2)
+    def test_only_leading_ids_cached(self):
+        with self.assertNumQueries(2):
+            article_ids, count = get_cached_article_filter_results(
+                self.queryset, self.params, self.scopes
+            )
+        self.assertEqual(article_ids, [self.articles[2].id, self.articles[1].id])
+        self.assertEqual(count, 3)
+
+    def test_invalidate_results(self):
+        get_cached_article_filter_results(self.queryset, self.params, self.scopes)
+        self.articles[0].delete()
+
+        invalidate_scopes(["articles:category:1"])
+        _, count = get_cached_article_filter_results(
+            self.queryset, self.params, self.scopes
+        )
+        self.assertEqual(count, 3)
+
+        invalidate_scopes(["articles:category:1", *self.scopes])
+        _, count = get_cached_article_filter_results(
+            self.queryset, self.params, self.scopes
+        )
+        self.assertEqual(count, 2)
+
+    def test_evicted_scope_version(self):
+        get_cached_article_filter_results(self.queryset, self.params, self.scopes)
+        self.articles[0].delete()
+
+        cache.delete(SCOPE_VERSION_KEY.format(scope=self.scopes[0]))
+        _, count = get_cached_article_filter_results(
+            self.queryset, self.params, self.scopes
+        )
+        self.assertEqual(count, 2)
@@ -0,0 +1,219 @@
+from unittest.mock import ANY, patch
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from articles.cache import (
+    LIKED_BY_KEY,
+    LIKED_OBJECTS_RETRY_SET_KEY,
+    LIKED_OBJECTS_SET_KEY,
+    LIKES_LOADED_KEY,
+    PENDING_LIKES_KEY,
+    apply_buffered_likes,
+    sync_buffered_likes,
+    toggle_buffered_like,
+)
+from articles.models import Article, ArticleComment
+from articles.settings import ARTICLE_LIKES_BUFFER_TIMEOUT
+from config.settings.test import REDIS_CACHES
+from users.models import User
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class TestBufferedLikes(TestCase):
+    def setUp(self):
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+        self.user1 = User.objects.create_user(username="user1", email="u1@test.com")
+        self.user2 = User.objects.create_user(username="user2", email="u2@test.com")
+        self.article = Article.objects.create(
+            title="a1",
+            author=self.user1,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        self.comment = ArticleComment.objects.create(
+            article=self.article, author=self.user1, text="text"
+        )
+        self.article.users_that_liked.add(self.user1)
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    def test_toggle_is_seeded_from_database(self):
+        self.assertEqual(toggle_buffered_like(self.article, self.user2.id), 2)
+        self.assertEqual(toggle_buffered_like(self.article, self.user1.id), 1)
+        self.assertEqual(
+            self.redis_conn.smembers(
+                LIKED_BY_KEY.format(kind="article", id=self.article.id)
+            ),
+            {str(self.user2.id).encode()},
+        )
+        self.assertEqual(
+            self.redis_conn.hgetall(
+                PENDING_LIKES_KEY.format(kind="article", id=self.article.id)
+            ),
+            {str(self.user1.id).encode(): b"0", str(self.user2.id).encode(): b"1"},
+        )
+        self.assertEqual(
+            self.redis_conn.smembers(LIKED_OBJECTS_SET_KEY),
+            {f"article:{self.article.id}".encode()},
+        )
+
+        # The database is not touched until the likes are synced
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 1)
+
+    def test_toggle_expires_loaded_state(self):
+        toggle_buffered_like(self.article, self.user2.id)
+        for key in (LIKED_BY_KEY, LIKES_LOADED_KEY):
+            self.assertEqual(
+                self.redis_conn.ttl(key.format(kind="article", id=self.article.id)),
+                ARTICLE_LIKES_BUFFER_TIMEOUT,
+            )
+        # Pending changes are kept until they are synced
+        self.assertEqual(
+            self.redis_conn.ttl(
+                PENDING_LIKES_KEY.format(kind="article", id=self.article.id)
+            ),
+            -1,
+        )
+
+    @patch("articles.cache.likes.ARTICLE_LIKES_BUFFER_ENABLED", True)
+    def test_likes_changed_in_database_are_reloaded(self):
+        user3 = User.objects.create_user(username="user3", email="u3@test.com")
+        toggle_buffered_like(self.article, self.user2.id)
+
+        self.article.users_that_liked.remove(self.user1)
+        self.assertFalse(
+            self.redis_conn.exists(
+                LIKES_LOADED_KEY.format(kind="article", id=self.article.id)
+            )
+        )
+        self.assertEqual(apply_buffered_likes([self.article], self.user1.id), {})
+
+        # Reloaded from the database with the pending like of user2
+        self.assertEqual(toggle_buffered_like(self.article, user3.id), 2)
+        self.assertEqual(
+            self.redis_conn.smembers(
+                LIKED_BY_KEY.format(kind="article", id=self.article.id)
+            ),
+            {str(self.user2.id).encode(), str(user3.id).encode()},
+        )
+
+    @patch("articles.cache.likes.toggle_like", return_value=5)
+    @patch("articles.cache.likes.logger.error")
+    @patch("articles.cache.likes.get_redis_connection")
+    def test_toggle_falls_back_to_database(
+        self, mock_get_redis, mock_error, mock_toggle_like
+    ):
+        mock_get_redis.return_value.register_script.return_value.side_effect = (
+            RedisError("Redis error")
+        )
+
+        self.assertEqual(toggle_buffered_like(self.comment, self.user2.id), 5)
+        mock_toggle_like.assert_called_once_with(self.comment, self.user2.id)
+        mock_error.assert_called_once()
+
+    def test_apply_buffered_likes(self):
+        toggle_buffered_like(self.comment, self.user2.id)
+        comment2 = ArticleComment.objects.create(
+            article=self.article, author=self.user1, text="text"
+        )
+        comment2.users_that_liked.add(self.user2)
+        comments = list(ArticleComment.objects.order_by("id"))
+
+        liked = apply_buffered_likes(comments, self.user2.id)
+        self.assertEqual(liked, {self.comment.id: True})
+        self.assertEqual(comments[0].likes_count, 1)
+        self.assertEqual(comments[1].likes_count, 1)
+
+        self.assertEqual(apply_buffered_likes(comments), {self.comment.id: False})
+        self.assertEqual(apply_buffered_likes([]), {})
+
+    def test_sync(self):
+        toggle_buffered_like(self.article, self.user1.id)
+        toggle_buffered_like(self.article, self.user2.id)
+        toggle_buffered_like(self.comment, self.user2.id)
+        self.redis_conn.sadd(LIKED_OBJECTS_SET_KEY, "invalid", "post:1")
+
+        sync_buffered_likes()
+
+        self.article.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual(list(self.article.users_that_liked.all()), [self.user2])
+        self.assertEqual(self.article.likes_count, 1)
+        self.assertEqual(list(self.comment.users_that_liked.all()), [self.user2])
+        self.assertEqual(self.comment.likes_count, 1)
+
+        self.assertEqual(self.redis_conn.smembers(LIKED_OBJECTS_SET_KEY), set())
+        self.assertFalse(
+            self.redis_conn.exists(
+                PENDING_LIKES_KEY.format(kind="article", id=self.article.id)
+            )
+        )
+        # Buffered like state is kept to answer subsequent reads
+        self.assertEqual(
+            self.redis_conn.scard(
+                LIKED_BY_KEY.format(kind="article", id=self.article.id)
+            ),
+            1,
+        )
+
+    def test_sync_skips_deleted_users_and_objects(self):
+        toggle_buffered_like(self.article, self.user2.id)
+        toggle_buffered_like(self.comment, self.user2.id)
+        self.comment.delete()
+        self.user2.delete()
+
+        sync_buffered_likes()
+
+        self.article.refresh_from_db()
+        self.assertEqual(list(self.article.users_that_liked.all()), [self.user1])
+        self.assertEqual(self.article.likes_count, 1)
+
+    @patch("articles.cache.likes.logger.error")
+    @patch("articles.cache.likes.apply_like_changes", side_effect=DatabaseError)
+    def test_db_error_when_syncing_likes(self, mock_apply, mock_error):
+        toggle_buffered_like(self.article, self.user2.id)
+        pending_key = PENDING_LIKES_KEY.format(kind="article", id=self.article.id)
+        user2_id = str(self.user2.id).encode()
+
+        sync_buffered_likes()
+        mock_apply.assert_called_once_with(
+            Article, {self.article.id: {self.user2.id: True}}
+        )
+        mock_error.assert_called_once_with(
+            "DB update failed. Re-queuing %s likes for retry. Error: %s", "article", ANY
+        )
+        self.assertEqual(self.redis_conn.hgetall(pending_key), {user2_id: b"1"})
+        self.assertEqual(
+            self.redis_conn.smembers(LIKED_OBJECTS_RETRY_SET_KEY),
+            {f"article:{self.article.id}".encode()},
+        )
+
+        # Changes made after the failed sync take precedence
+        toggle_buffered_like(self.article, self.user2.id)
+        mock_apply.reset_mock(side_effect=True)
+
+        sync_buffered_likes()
+        mock_apply.assert_called_once_with(
+            Article, {self.article.id: {self.user2.id: False}}
+        )
+        self.assertEqual(self.redis_conn.smembers(LIKED_OBJECTS_RETRY_SET_KEY), set())
+        self.assertEqual(self.redis_conn.hgetall(pending_key), {})
+
+    @patch("articles.cache.likes.ARTICLE_LIKE_SYNC_MAX_BATCH_SIZE", 1)
+    @patch("articles.cache.likes.ARTICLE_LIKE_SYNC_MAX_ITERATIONS", 1)
+    @patch("articles.cache.likes.apply_like_changes")
+    def test_max_iterations(self, mock_apply):
+        toggle_buffered_like(self.article, self.user2.id)
+        toggle_buffered_like(self.comment, self.user2.id)
+
+        sync_buffered_likes()
+        mock_apply.assert_called_once()
+        self.assertEqual(self.redis_conn.scard(LIKED_OBJECTS_SET_KEY), 1)
@@ -0,0 +1,45 @@
+from unittest.mock import ANY, patch
+
+from django.test import SimpleTestCase, override_settings
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from articles.cache import (
+    TRENDING_ARTICLES_KEY,
+    get_trending_article_ids,
+    update_trending_articles,
+)
+from articles.settings import ARTICLE_TRENDING_SIZE
+from config.settings.test import REDIS_CACHES
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class TestTrendingArticles(SimpleTestCase):
+    def setUp(self):
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    @patch("articles.cache.trending.find_trending_article_scores")
+    def test_update_trending_articles(self, mock_find):
+        self.redis_conn.zadd(TRENDING_ARTICLES_KEY, {"9999": 100})
+        mock_find.return_value = [(3, 2.5), (1, 1.5), (2, 0.5)]
+
+        self.assertEqual(update_trending_articles(), 3)
+        mock_find.assert_called_once_with(ARTICLE_TRENDING_SIZE)
+        self.assertEqual(get_trending_article_ids(), [3, 1, 2])
+
+        mock_find.return_value = []
+        self.assertEqual(update_trending_articles(), 0)
+        self.assertEqual(get_trending_article_ids(), [])
+
+    @patch("articles.cache.trending.logger.warning")
+    @patch("articles.cache.trending.get_redis_connection")
+    def test_redis_error_when_getting_trending_articles(
+        self, mock_get_redis, mock_warning
+    ):
+        mock_get_redis.return_value.zrevrange.side_effect = RedisError("Redis error")
+        self.assertEqual(get_trending_article_ids(), [])
+        mock_warning.assert_called_once_with("Could not get trending articles: %s", ANY)
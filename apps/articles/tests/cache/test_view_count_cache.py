@@ -0,0 +1,766 @@
+import time
+from unittest.mock import ANY, MagicMock, Mock, call, patch
+
+from cachalot.api import cachalot_disabled
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django_redis import get_redis_connection
+from redis import RedisError
+
+from articles.cache import (
+    ARTICLE_VIEWED_BY_KEY,
+    ARTICLE_VIEWERS_KEY,
+    ARTICLE_VIEWS_KEY,
+    HOURLY_ARTICLE_VIEWS_HOURS_KEY,
+    HOURLY_ARTICLE_VIEWS_KEY,
+    HOURLY_ARTICLE_VIEWS_TTL,
+    STAGED_VIEW_DELTAS_KEY,
+    STAGED_VIEW_SYNC_RUNS_KEY,
+    VIEW_SYNC_SHARD_COUNT_KEY,
+    VIEWED_ARTICLES_RETRY_SET_KEY,
+    VIEWED_ARTICLES_SET_KEY,
+    VIEWED_ARTICLES_SHARD_LOCK_KEY,
+    VIEWED_ARTICLES_SHARD_SET_KEY,
+    attach_cached_article_views,
+    distribute_pending_view_syncs,
+    get_cached_article_views,
+    get_cached_article_views_bulk,
+    register_article_view,
+    sync_article_view_shard,
+    sync_article_views,
+)
+from articles.cache.view_counts import (
+    _decode_article_ids,
+    _get_view_sync_batch_size,
+    _remove_staged_view_deltas,
+    _stage_view_deltas,
+    _sync_article_batch,
+)
+from articles.models import Article
+from articles.services import apply_article_view_deltas
+from articles.settings import (
+    ARTICLE_UNIQUE_VIEW_TIMEOUT,
+    ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE,
+    ARTICLE_VIEW_SYNC_MAX_ITERATIONS,
+    ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE,
+)
+from config.settings.test import REDIS_CACHES
+from users.models import User
+
+
+class TestGetCachedArticleViews(SimpleTestCase):
+    @patch("articles.cache.view_counts.logger.warning")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_redis_error(self, mock_get_redis, mock_warning):
+        mock_redis = Mock()
+        mock_redis.get.side_effect = RedisError("Redis error")
+        mock_get_redis.return_value = mock_redis
+        article_id = 1234
+
+        get_cached_article_views(article_id)
+        mock_warning.assert_called_once_with(
+            "Could not get cached views for article %s: %s",
+            article_id,
+            mock_redis.get.side_effect,
+        )
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_none_views(self, mock_get_redis):
+        mock_redis = Mock()
+        mock_redis.get.return_value = None
+        mock_get_redis.return_value = mock_redis
+        article_id = 1234
+
+        self.assertEqual(get_cached_article_views(article_id), 0)
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_correct_case(self, mock_get_redis):
+        mock_redis = Mock()
+        mock_redis.get.return_value = "42"
+        mock_get_redis.return_value = mock_redis
+        article_id = 1234
+
+        self.assertEqual(get_cached_article_views(article_id), 42)
+
+
+class TestGetCachedArticleViewsBulk(SimpleTestCase):
+    def test_no_articles(self):
+        self.assertEqual(get_cached_article_views_bulk([]), {})
+
+    @patch("articles.cache.view_counts.logger.warning")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_redis_error(self, mock_get_redis, mock_warning):
+        mock_redis = Mock()
+        mock_redis.mget.side_effect = RedisError("Redis error")
+        mock_get_redis.return_value = mock_redis
+
+        self.assertEqual(get_cached_article_views_bulk([1, 2]), {1: 0, 2: 0})
+        mock_warning.assert_called_once_with(
+            "Could not get cached views for articles %s: %s",
+            [1, 2],
+            mock_redis.mget.side_effect,
+        )
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_correct_case(self, mock_get_redis):
+        mock_redis = Mock()
+        mock_redis.mget.return_value = [b"42", None, b"invalid"]
+        mock_get_redis.return_value = mock_redis
+
+        self.assertEqual(get_cached_article_views_bulk([1, 2, 3]), {1: 42, 2: 0, 3: 0})
+        mock_redis.mget.assert_called_once_with(
+            [ARTICLE_VIEWS_KEY.format(id=id) for id in (1, 2, 3)]
+        )
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_attach_cached_article_views(self):
+        r = get_redis_connection("default")
+        r.flushdb()
+        r.set(ARTICLE_VIEWS_KEY.format(id=9991), 7)
+        articles = [Article(id=9991, views_count=3), Article(id=9992, views_count=1)]
+
+        attach_cached_article_views(articles)
+        with patch("articles.cache.get_cached_article_views") as mock_get_cached:
+            self.assertEqual([article.views for article in articles], [10, 1])
+            mock_get_cached.assert_not_called()
+
+        r.flushdb()
+
+
+class TestRegisterArticleView(SimpleTestCase):
+    @patch("articles.cache.view_counts.logger.error")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_redis_error(self, mock_get_redis, mock_error):
+        mock_script = mock_get_redis.return_value.register_script.return_value
+        mock_script.side_effect = RedisError("Redis error")
+        article_id = 1234
+
+        self.assertFalse(register_article_view(article_id, "user:1"))
+        mock_error.assert_called_once_with(
+            "Redis error when registering view of article %s: %s",
+            article_id,
+            mock_script.side_effect,
+        )
+
+    @override_settings(CACHES=REDIS_CACHES)
+    @patch("articles.cache.view_counts.time.time", return_value=3600 * 100 + 10)
+    def test_correct_case(self, mock_time):
+        r = get_redis_connection("default")
+        r.flushdb()
+        article_id = 1234
+        viewed_by_key = ARTICLE_VIEWED_BY_KEY.format(
+            article_id=article_id, viewer_id="user:1"
+        )
+
+        self.assertTrue(register_article_view(article_id, "user:1"))
+        self.assertFalse(register_article_view(article_id, "user:1"))
+        self.assertTrue(register_article_view(article_id, "user:2"))
+
+        self.assertEqual(r.get(ARTICLE_VIEWS_KEY.format(id=article_id)), b"2")
+        self.assertEqual(r.smembers(VIEWED_ARTICLES_SET_KEY), {b"1234"})
+        self.assertEqual(r.ttl(viewed_by_key), ARTICLE_UNIQUE_VIEW_TIMEOUT)
+
+        hourly_views_key = HOURLY_ARTICLE_VIEWS_KEY.format(hour=100)
+        self.assertEqual(r.hgetall(hourly_views_key), {b"1234": b"2"})
+        self.assertEqual(r.ttl(hourly_views_key), HOURLY_ARTICLE_VIEWS_TTL)
+        self.assertEqual(r.smembers(HOURLY_ARTICLE_VIEWS_HOURS_KEY), {b"100"})
+
+        r.flushdb()
+
+
+@override_settings(CACHES=REDIS_CACHES)
+@patch("articles.cache.view_counts.ARTICLE_VIEW_DEDUP_BACKEND", "hyperloglog")
+class TestRegisterArticleViewHyperLogLog(SimpleTestCase):
+    def setUp(self):
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    @patch(
+        "articles.cache.view_counts.time.time",
+        return_value=ARTICLE_UNIQUE_VIEW_TIMEOUT * 10,
+    )
+    def test_viewer_counted_once_per_window(self, mock_time):
+        article_id = 1234
+        views_key = ARTICLE_VIEWS_KEY.format(id=article_id)
+
+        self.assertTrue(register_article_view(article_id, "user:1"))
+        self.assertFalse(register_article_view(article_id, "user:1"))
+        self.assertTrue(register_article_view(article_id, "user:2"))
+        self.assertEqual(self.redis_conn.get(views_key), b"2")
+        self.assertEqual(self.redis_conn.smembers(VIEWED_ARTICLES_SET_KEY), {b"1234"})
+
+        viewers_key = ARTICLE_VIEWERS_KEY.format(article_id=article_id, window=10)
+        self.assertEqual(self.redis_conn.pfcount(viewers_key), 2)
+        self.assertEqual(self.redis_conn.ttl(viewers_key), ARTICLE_UNIQUE_VIEW_TIMEOUT)
+        self.assertEqual(
+            self.redis_conn.keys(
+                ARTICLE_VIEWED_BY_KEY.format(article_id="*", viewer_id="*")
+            ),
+            [],
+        )
+
+        mock_time.return_value = ARTICLE_UNIQUE_VIEW_TIMEOUT * 11
+        self.assertTrue(register_article_view(article_id, "user:1"))
+        self.assertEqual(self.redis_conn.get(views_key), b"3")
+
+        hours = [ARTICLE_UNIQUE_VIEW_TIMEOUT * window // 3600 for window in (10, 11)]
+        self.assertEqual(
+            sum(
+                int(
+                    self.redis_conn.hget(
+                        HOURLY_ARTICLE_VIEWS_KEY.format(hour=h), "1234"
+                    )
+                )
+                for h in set(hours)
+            ),
+            3,
+        )
+
+    def test_many_viewers(self):
+        article_id = 1234
+        for viewer_id in range(5000):
+            register_article_view(article_id, f"user:{viewer_id}")
+            register_article_view(article_id, f"user:{viewer_id}")
+
+        views = int(self.redis_conn.get(ARTICLE_VIEWS_KEY.format(id=article_id)))
+        self.assertAlmostEqual(views, 5000, delta=5000 * 0.03)
+
+
+class TestSyncArticleViews(TestCase):
+    @patch("articles.cache.view_counts.logger.info")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_no_articles(self, mock_get_redis, mock_info):
+        mock_redis = Mock()
+        mock_redis.spop.return_value = []
+        mock_redis.smembers.return_value = set()
+        mock_redis.zrangebyscore.return_value = []
+        mock_get_redis.return_value = mock_redis
+
+        sync_article_views()
+        mock_redis.spop.assert_called_with(
+            VIEWED_ARTICLES_SET_KEY, ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE
+        )
+        mock_info.assert_called_with("No articles to sync; exiting on batch %d.", 0)
+
+    def test_decode_article_ids(self):
+        encoded_ids = [b"9991", b"9992", b"9993"]
+        self.assertEqual(_decode_article_ids(encoded_ids), [9991, 9992, 9993])
+
+        encoded_ids = [b"9991", b"abc"]
+        with patch("articles.cache.view_counts.logger") as mock_logger:
+            self.assertEqual(_decode_article_ids(encoded_ids), [9991])
+            mock_logger.warning.assert_called_once_with(
+                "Skipping invalid article ID: %s (%s)",
+                b"abc",
+                ANY,
+            )
+            self.assertIsInstance(
+                mock_logger.warning.call_args_list[0][0][2], ValueError
+            )
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_no_valid_article_ids(self, mock_get_redis):
+        mock_redis = Mock()
+        mock_redis.spop.side_effect = [{b"abc", b"xyz"}, set()]
+        mock_redis.zrangebyscore.return_value = []
+        mock_get_redis.return_value = mock_redis
+
+        with (
+            patch("articles.cache.view_counts._requeue_failed_view_syncs"),
+            patch("articles.cache.view_counts._sync_article_batch") as mock_sync,
+            patch("articles.cache.view_counts.logger") as mock_logger,
+        ):
+
+            sync_article_views()
+            mock_sync.assert_not_called()
+            self.assertEqual(
+                mock_logger.info.call_args_list,
+                [
+                    call("No valid article IDs in batch %s.", 0),
+                    call("No articles to sync; exiting on batch %d.", 1),
+                ],
+            )
+
+    @override_settings(CACHES=REDIS_CACHES)
+    @patch("articles.cache.view_counts.logger.info")
+    @patch("articles.cache.view_counts.logger.warning")
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    def test_skips_invalid_view_deltas(self, mock_increment, mock_warning, mock_info):
+        r = get_redis_connection("default")
+        r.flushdb()
+
+        view_deltas = {9991: 3, 9992: "abc"}
+        keys = {id: ARTICLE_VIEWS_KEY.format(id=id) for id in view_deltas}
+
+        with r.pipeline() as pipe:
+            for article_id, delta in view_deltas.items():
+                pipe.set(keys[article_id], delta)
+                pipe.sadd(VIEWED_ARTICLES_SET_KEY, article_id)
+            pipe.execute()
+
+        with r.pipeline() as pipe:
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+        self.assertFalse(any(vc is None for vc in view_counts))
+
+        sync_article_views()
+        expected_args = {9991: 3}
+        mock_increment.assert_called_once_with(expected_args, ANY)
+        mock_warning.assert_called_once_with(
+            "Discarded invalid view delta of key %s.",
+            ARTICLE_VIEWS_KEY.format(id=9992),
+        )
+        mock_info.assert_has_calls(
+            [
+                call("Synced views for %d articles in batch %s.", 1, 0),
+                call("No articles to sync; exiting on batch %d.", 1),
+            ]
+        )
+
+        viewed_articles = r.smembers(VIEWED_ARTICLES_SET_KEY)
+        self.assertFalse(viewed_articles)
+
+        with r.pipeline() as pipe:
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+        self.assertTrue(all(vc is None for vc in view_counts))
+        self.assertFalse(r.exists(STAGED_VIEW_SYNC_RUNS_KEY))
+
+        r.flushdb()
+
+    @patch("articles.cache.view_counts._remove_staged_view_deltas")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    @patch("articles.cache.view_counts.logger")
+    def test_redis_error_when_staging_views(
+        self, mock_logger, mock_get_redis, mock_remove
+    ):
+        mock_get_redis.return_value.spop.side_effect = [{b"9999"}, set()]
+        mock_get_redis.return_value.register_script.return_value.side_effect = (
+            RedisError("script failed")
+        )
+
+        sync_article_views()
+
+        mock_logger.error.assert_called_once_with(
+            "Redis error when staging views for articles %s: %s", [9999], ANY
+        ),
+
+        self.assertEqual(
+            mock_logger.info.call_args_list,
+            [
+                call("Re-queued %d failed article view syncs", 0),
+                call(
+                    "No positive view deltas in batch %s for article IDs: %s",
+                    0,
+                    [9999],
+                ),
+                call("No articles to sync; exiting on batch %d.", 1),
+            ],
+        )
+        mock_remove.assert_called_once_with(mock_get_redis.return_value, ANY)
+
+    @patch("articles.cache.view_counts.logger")
+    @patch("articles.cache.view_counts._remove_staged_view_deltas")
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    @patch("articles.cache.view_counts._stage_view_deltas", return_value={9999: 1})
+    def test_db_error_when_syncing_views(
+        self,
+        mock_stage,
+        mock_apply,
+        mock_remove,
+        mock_logger,
+    ):
+        mock_redis = Mock()
+        mock_apply.side_effect = DatabaseError("DB error")
+
+        self.assertEqual(_sync_article_batch([9999], 0, mock_redis), 0)
+
+        token = mock_stage.call_args[0][1]
+        mock_apply.assert_called_once_with({9999: 1}, token)
+        mock_redis.zadd.assert_called_once_with(STAGED_VIEW_SYNC_RUNS_KEY, {token: 0})
+        mock_logger.error.assert_called_once_with(
+            "DB update failed. Staged view deltas of run %s will be retried. "
+            "Error: %s",
+            token,
+            ANY,
+        )
+        self.assertIsInstance(mock_logger.error.call_args[0][2], DatabaseError)
+        mock_remove.assert_not_called()
+
+    @patch("articles.cache.view_counts.logger")
+    def test_redis_error_when_removing_staged_deltas(self, mock_logger):
+        mock_redis = Mock()
+        mock_pipeline = MagicMock()
+        mock_pipeline.return_value.__enter__.return_value = mock_pipeline
+        mock_pipeline.return_value.__exit__.return_value = None
+        mock_pipeline.execute.side_effect = RedisError("Redis error")
+        mock_redis.pipeline = mock_pipeline
+
+        _remove_staged_view_deltas(mock_redis, "token")
+        mock_logger.warning.assert_called_once_with(
+            "Redis cleanup failed for staged run %s: %s", "token", ANY
+        )
+        self.assertIsInstance(mock_logger.warning.call_args[0][2], RedisError)
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_failed_syncs_get_requeued(self):
+        r = get_redis_connection("default")
+        r.flushdb()
+
+        r.sadd(VIEWED_ARTICLES_RETRY_SET_KEY, 9991, 9992)
+        self.assertEqual(r.smembers(VIEWED_ARTICLES_RETRY_SET_KEY), {b"9991", b"9992"})
+        self.assertEqual(r.smembers(VIEWED_ARTICLES_SET_KEY), set())
+
+        with patch("articles.cache.view_counts._decode_article_ids") as mock_decode:
+            sync_article_views()
+            mock_decode.assert_called_once_with([b"9991", b"9992"])
+
+        self.assertEqual(r.smembers(VIEWED_ARTICLES_RETRY_SET_KEY), set())
+        self.assertEqual(r.smembers(VIEWED_ARTICLES_SET_KEY), set())
+
+        r.flushdb()
+
+    @override_settings(CACHES=REDIS_CACHES)
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    def test_cached_views_get_reset(self, mock_increment):
+        r = get_redis_connection("default")
+        r.flushdb()
+
+        key = ARTICLE_VIEWS_KEY.format(id=9991)
+        r.set(key, 10)
+        self.assertEqual(r.get(key), b"10")
+        r.sadd(VIEWED_ARTICLES_SET_KEY, 9991)
+
+        sync_article_views()
+        mock_increment.assert_called_once_with({9991: 10}, ANY)
+        self.assertEqual(r.get(key), None)
+
+        r.flushdb()
+
+    @override_settings(CACHES=REDIS_CACHES)
+    @patch("articles.cache.view_counts.logger.info")
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    def test_single_batch(self, mock_increment, mock_info):
+        r = get_redis_connection("default")
+        r.flushdb()
+
+        view_deltas = {9991: 3, 9992: 0, 9993: 10}
+        keys = {id: ARTICLE_VIEWS_KEY.format(id=id) for id in view_deltas}
+
+        with r.pipeline() as pipe:
+            for article_id, delta in view_deltas.items():
+                pipe.set(keys[article_id], delta)
+                pipe.sadd(VIEWED_ARTICLES_SET_KEY, article_id)
+            pipe.execute()
+
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+            self.assertFalse(any(vc is None for vc in view_counts))
+
+            sync_article_views()
+            expected_args = {k: v for k, v in view_deltas.items() if v > 0}
+            mock_increment.assert_called_once_with(expected_args, ANY)
+
+            viewed_articles = r.smembers(VIEWED_ARTICLES_SET_KEY)
+            self.assertFalse(viewed_articles)
+
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+            self.assertTrue(all(vc is None for vc in view_counts))
+
+        mock_info.assert_has_calls(
+            [
+                call("Synced views for %d articles in batch %s.", 2, 0),
+                call("No articles to sync; exiting on batch %d.", 1),
+            ]
+        )
+
+        r.flushdb()
+
+    @override_settings(CACHES=REDIS_CACHES)
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE", 2)
+    @patch("articles.cache.view_counts.logger.info")
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    def test_multiple_batches(self, mock_increment, mock_info):
+        r = get_redis_connection("default")
+        r.flushdb()
+
+        view_deltas = {9991: 3, 9992: 1, 9993: 0, 9994: 0, 9995: 10}
+        keys = {id: ARTICLE_VIEWS_KEY.format(id=id) for id in view_deltas}
+
+        with r.pipeline() as pipe:
+            for article_id, delta in view_deltas.items():
+                pipe.set(keys[article_id], delta)
+                pipe.sadd(VIEWED_ARTICLES_SET_KEY, article_id)
+            pipe.execute()
+
+        with r.pipeline() as pipe:
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+        self.assertFalse(any(vc is None for vc in view_counts))
+
+        self.assertEqual(
+            r.smembers(VIEWED_ARTICLES_SET_KEY),
+            {b"9991", b"9992", b"9993", b"9994", b"9995"},
+        )
+
+        with patch("redis.commands.core.SetCommands.spop") as mock_spop:
+            mock_spop.side_effect = [
+                [b"9991", b"9992"],
+                [b"9993", b"9994"],
+                [b"9995"],
+                [],
+            ]
+            sync_article_views()
+
+        self.assertEqual(
+            mock_increment.call_args_list,
+            [
+                call({9991: 3, 9992: 1}, ANY),
+                call({9995: 10}, ANY),
+            ],
+        )
+
+        with r.pipeline() as pipe:
+            [pipe.get(keys[article_id]) for article_id in view_deltas]
+            view_counts = pipe.execute()
+        self.assertTrue(all(vc is None for vc in view_counts))
+
+        self.assertCountEqual(
+            mock_info.call_args_list,
+            [
+                call("Synced views for %d articles in batch %s.", 2, 0),
+                call(
+                    "No positive view deltas in batch %s for article IDs: %s",
+                    1,
+                    [9993, 9994],
+                ),
+                call("Synced views for %d articles in batch %s.", 1, 2),
+                call("No articles to sync; exiting on batch %d.", 3),
+            ],
+        )
+
+        r.flushdb()
+
+    @patch("articles.cache.view_counts._decode_article_ids")
+    @patch("articles.cache.view_counts._sync_article_batch")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_max_iterations(self, mock_get_redis, mock_sync, mock_decode):
+        mock_redis = Mock()
+        article_ids = range(ARTICLE_VIEW_SYNC_MAX_ITERATIONS + 1)
+        mock_redis.spop.return_value = True
+        mock_get_redis.return_value = mock_redis
+        mock_decode.side_effect = [
+            [aid] * ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE for aid in article_ids
+        ]
+
+        with (
+            patch("articles.cache.view_counts._recover_staged_view_deltas"),
+            patch("articles.cache.view_counts._requeue_failed_view_syncs"),
+        ):
+            sync_article_views()
+
+        self.assertEqual(
+            len(mock_sync.call_args_list), ARTICLE_VIEW_SYNC_MAX_ITERATIONS
+        )
+        for i, _call in enumerate(mock_sync.call_args_list):
+            self.assertEqual(
+                _call,
+                call(
+                    [article_ids[i]] * ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE, i, mock_redis
+                ),
+            )
+        self.assertNotIn(
+            call([article_ids[-1] * ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE], ANY, ANY),
+            mock_sync.call_args_list,
+        )
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class TestStagedArticleViewSync(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+        user = User.objects.create_user(username="user1", email="u1@test.com")
+        self.article = Article.objects.create(
+            title="a1", author=user, preview_text="text", content="content"
+        )
+        self.views_key = ARTICLE_VIEWS_KEY.format(id=self.article.id)
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    def queue_views(self, views):
+        self.redis_conn.incrby(self.views_key, views)
+        self.redis_conn.sadd(VIEWED_ARTICLES_SET_KEY, self.article.id)
+
+    def assert_views_count(self, views_count):
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_count, views_count)
+
+    def test_views_registered_during_sync_are_kept(self):
+        self.queue_views(3)
+        self.assertEqual(
+            _stage_view_deltas(self.redis_conn, "token", [self.article.id]),
+            {self.article.id: 3},
+        )
+        self.assertFalse(self.redis_conn.exists(self.views_key))
+
+        self.queue_views(2)
+        self.assertEqual(self.redis_conn.get(self.views_key), b"2")
+        self.assertEqual(
+            self.redis_conn.hgetall(STAGED_VIEW_DELTAS_KEY.format(token="token")),
+            {str(self.article.id).encode(): b"3"},
+        )
+
+    def test_failed_run_is_retried(self):
+        self.queue_views(3)
+        with (
+            patch(
+                "articles.cache.view_counts.apply_article_view_deltas",
+                side_effect=DatabaseError("DB error"),
+            ),
+            patch("articles.cache.view_counts.logger"),
+        ):
+            sync_article_views()
+        self.assert_views_count(0)
+        self.assertEqual(self.redis_conn.zcard(STAGED_VIEW_SYNC_RUNS_KEY), 1)
+
+        self.queue_views(2)
+        sync_article_views()
+        self.assert_views_count(5)
+        self.assertFalse(self.redis_conn.exists(STAGED_VIEW_SYNC_RUNS_KEY))
+        self.assertFalse(self.redis_conn.exists(self.views_key))
+
+    def test_interrupted_run_is_applied_once(self):
+        self.queue_views(3)
+        view_deltas = _stage_view_deltas(self.redis_conn, "token", [self.article.id])
+        apply_article_view_deltas(view_deltas, "token")
+        self.assert_views_count(3)
+
+        with patch(
+            "articles.cache.view_counts.time.time", return_value=time.time() + 3600
+        ):
+            sync_article_views()
+        self.assert_views_count(3)
+        self.assertFalse(self.redis_conn.exists(STAGED_VIEW_SYNC_RUNS_KEY))
+        self.assertFalse(
+            self.redis_conn.exists(STAGED_VIEW_DELTAS_KEY.format(token="token"))
+        )
+
+    def test_running_sync_is_not_recovered(self):
+        self.queue_views(3)
+        _stage_view_deltas(self.redis_conn, "token", [self.article.id])
+
+        sync_article_views()
+        self.assert_views_count(0)
+        self.assertEqual(self.redis_conn.zcard(STAGED_VIEW_SYNC_RUNS_KEY), 1)
+
+
+@override_settings(CACHES=REDIS_CACHES)
+@patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_SHARDS", 4)
+class TestShardedArticleViewSync(SimpleTestCase):
+    def setUp(self):
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    def shard_members(self, shard):
+        return self.redis_conn.smembers(
+            VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=shard)
+        )
+
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE", 3)
+    def test_distribute_pending_view_syncs(self):
+        self.redis_conn.sadd(VIEWED_ARTICLES_SET_KEY, *range(1, 10), "abc")
+        self.redis_conn.sadd(VIEWED_ARTICLES_RETRY_SET_KEY, 10)
+
+        self.assertEqual(distribute_pending_view_syncs(), {0: 3, 1: 3, 2: 3, 3: 2})
+        self.assertEqual(self.shard_members(0), {b"4", b"8", b"abc"})
+        self.assertEqual(self.shard_members(1), {b"1", b"5", b"9"})
+        self.assertEqual(self.shard_members(2), {b"2", b"6", b"10"})
+        self.assertEqual(self.shard_members(3), {b"3", b"7"})
+        self.assertFalse(self.redis_conn.exists(VIEWED_ARTICLES_SET_KEY))
+        self.assertFalse(self.redis_conn.exists(VIEWED_ARTICLES_RETRY_SET_KEY))
+
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE", 3)
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_ITERATIONS", 2)
+    def test_distribute_pending_view_syncs_max_iterations(self):
+        self.redis_conn.sadd(VIEWED_ARTICLES_SET_KEY, *range(1, 10))
+
+        self.assertEqual(sum(distribute_pending_view_syncs().values()), 6)
+        self.assertEqual(self.redis_conn.scard(VIEWED_ARTICLES_SET_KEY), 3)
+
+    def test_distribute_requeues_removed_shards(self):
+        self.redis_conn.set(VIEW_SYNC_SHARD_COUNT_KEY, 6)
+        self.redis_conn.sadd(VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=5), 17)
+
+        self.assertEqual(distribute_pending_view_syncs(), {0: 0, 1: 1, 2: 0, 3: 0})
+        self.assertEqual(self.shard_members(1), {b"17"})
+        self.assertEqual(self.shard_members(5), set())
+        self.assertEqual(self.redis_conn.get(VIEW_SYNC_SHARD_COUNT_KEY), b"4")
+
+    @patch("articles.cache.view_counts.apply_article_view_deltas")
+    def test_sync_article_view_shard(self, mock_increment):
+        for article_id, delta in {1: 3, 5: 0, 9: 2}.items():
+            self.redis_conn.set(ARTICLE_VIEWS_KEY.format(id=article_id), delta)
+            self.redis_conn.sadd(
+                VIEWED_ARTICLES_SHARD_SET_KEY.format(shard=1), article_id
+            )
+
+        metrics = sync_article_view_shard(1)
+        mock_increment.assert_called_once_with({1: 3, 9: 2}, ANY)
+        self.assertEqual(
+            metrics,
+            {
+                "shard": 1,
+                "backlog": 3,
+                "batch_size": ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE,
+                "batches": 1,
+                "articles": 3,
+                "synced_articles": 2,
+                "remaining": 0,
+                "duration": ANY,
+            },
+        )
+        self.assertEqual(self.shard_members(1), set())
+        self.assertFalse(
+            self.redis_conn.exists(VIEWED_ARTICLES_SHARD_LOCK_KEY.format(shard=1))
+        )
+
+    @patch("articles.cache.view_counts._sync_article_views_from_set")
+    def test_shard_synced_by_one_worker_at_a_time(self, mock_sync):
+        self.redis_conn.set(VIEWED_ARTICLES_SHARD_LOCK_KEY.format(shard=2), "1")
+
+        self.assertEqual(sync_article_view_shard(2), {"shard": 2, "skipped": True})
+        mock_sync.assert_not_called()
+
+    @patch("articles.cache.view_counts._sync_article_views_from_set")
+    def test_shard_lock_of_another_worker_is_kept(self, mock_sync):
+        lock_key = VIEWED_ARTICLES_SHARD_LOCK_KEY.format(shard=3)
+
+        def sync(*args):
+            # The lock expires during the sync and is taken by another worker
+            self.redis_conn.set(lock_key, "other")
+            return {}
+
+        mock_sync.side_effect = sync
+
+        sync_article_view_shard(3)
+        self.assertEqual(self.redis_conn.get(lock_key), b"other")
+
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MIN_BATCH_SIZE", 50)
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_BATCH_SIZE", 500)
+    @patch("articles.cache.view_counts.ARTICLE_VIEW_SYNC_MAX_ITERATIONS", 20)
+    def test_view_sync_batch_size(self):
+        self.assertEqual(_get_view_sync_batch_size(0), 50)
+        self.assertEqual(_get_view_sync_batch_size(1000), 50)
+        self.assertEqual(_get_view_sync_batch_size(2001), 101)
+        self.assertEqual(_get_view_sync_batch_size(100000), 500)
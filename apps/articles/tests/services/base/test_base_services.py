@@ -94,3 +94,19 @@ class TestServices(TestCase):
         self.assertEqual(likes_count, 1)
         likes_count = toggle_comment_like(comment.id, user.id)
         self.assertEqual(likes_count, 0)
+
+    @patch("articles.services.likes.ARTICLE_LIKES_BUFFER_ENABLED", True)
+    @patch("articles.cache.toggle_buffered_like", return_value=3)
+    def test_toggle_article_like_buffered(self, mock_toggle_buffered):
+        a = Article.objects.create(
+            title="a1",
+            slug="a1",
+            author=self.user,
+            preview_text="text1",
+            content="content1",
+            is_published=True,
+        )
+
+        self.assertEqual(toggle_article_like(a.slug, self.user.id), 3)
+        mock_toggle_buffered.assert_called_once_with(a, self.user.id)
+        self.assertFalse(a.users_that_liked.exists())
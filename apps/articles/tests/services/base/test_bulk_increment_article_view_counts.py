@@ -1,11 +1,17 @@
 import re
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 from django.db import DatabaseError
 from django.test import TestCase
-
-from articles.models import Article
-from articles.services import bulk_increment_article_view_counts
+from django.utils import timezone
+
+from articles.models import Article, ArticleViewSyncBatch
+from articles.services import (
+    apply_article_view_deltas,
+    bulk_increment_article_view_counts,
+    prune_article_view_sync_batches,
+)
 from users.models import User
 
 
@@ -21,30 +27,17 @@ class TestBulkIncrementArticleViewCounts(TestCase):
 
     def test_correct_sql(self):
         self.patch_cursor()
-        view_deltas = {1: 10, 2: 5}
+        view_deltas = {2: 5, 1: 10}
 
         bulk_increment_article_view_counts(view_deltas)
 
-        case_statements = []
-        case_params = []
-        where_placeholders = []
-        where_params = []
-
-        for article_id, view_delta in sorted(view_deltas.items()):
-            case_statements.append("WHEN id = %s THEN views_count + %s")
-            case_params.extend([article_id, view_delta])
-            where_placeholders.append("%s")
-            where_params.append(article_id)
-
-        case_sql = "CASE " + " ".join(case_statements) + " END"
-        where_clause = f"id IN ({', '.join(where_placeholders)})"
-
-        expected_sql = f"""
-            UPDATE articles_article
-            SET views_count = {case_sql}
-            WHERE {where_clause}
+        expected_sql = """
+            UPDATE articles_article AS article
+            SET views_count = article.views_count + deltas.view_delta
+            FROM unnest(%s::bigint[], %s::integer[]) AS deltas(id, view_delta)
+            WHERE article.id = deltas.id
         """
-        expected_params = [1, 10, 2, 5, 1, 2]
+        expected_params = [[1, 2], [10, 5]]
 
         actual_sql = self.mocked_cursor.execute.call_args_list[1][0][0]
         actual_params = self.mocked_cursor.execute.call_args_list[1][0][1]
@@ -102,5 +95,49 @@ class TestBulkIncrementArticleViewCounts(TestCase):
         self.mocked_cursor.execute.side_effect = DatabaseError("DB failed")
 
         with patch("articles.services.articles.logger.exception") as mock_exc:
-            bulk_increment_article_view_counts({1: 5})
+            with self.assertRaises(DatabaseError):
+                bulk_increment_article_view_counts({1: 5})
             mock_exc.assert_called_once()
+
+
+class TestApplyArticleViewDeltas(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="user", email="user@test.com")
+        self.article = Article.objects.create(
+            title="a1", author=user, preview_text="1", content="1", views_count=5
+        )
+
+    def test_deltas_applied_once_per_token(self):
+        self.assertTrue(apply_article_view_deltas({self.article.id: 3}, "token1"))
+        with patch("articles.services.articles.logger.warning") as mock_warn:
+            self.assertFalse(apply_article_view_deltas({self.article.id: 3}, "token1"))
+            mock_warn.assert_called_once_with(
+                "View deltas of batch %s have already been applied.", "token1"
+            )
+        self.assertTrue(apply_article_view_deltas({self.article.id: 2}, "token2"))
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_count, 10)
+        self.assertEqual(ArticleViewSyncBatch.objects.count(), 2)
+
+    def test_token_not_recorded_on_db_error(self):
+        with patch(
+            "articles.services.articles.bulk_increment_article_view_counts",
+            side_effect=DatabaseError("DB failed"),
+        ):
+            with self.assertRaises(DatabaseError):
+                apply_article_view_deltas({self.article.id: 3}, "token1")
+        self.assertFalse(ArticleViewSyncBatch.objects.exists())
+
+    @patch("articles.services.articles.ARTICLE_VIEW_SYNC_BATCH_RETENTION_DAYS", 1)
+    def test_prune_article_view_sync_batches(self):
+        old_batch = ArticleViewSyncBatch.objects.create(token="old")
+        ArticleViewSyncBatch.objects.filter(pk=old_batch.pk).update(
+            synced_at=timezone.now() - timedelta(days=2)
+        )
+        ArticleViewSyncBatch.objects.create(token="new")
+
+        self.assertEqual(prune_article_view_sync_batches(), 1)
+        self.assertEqual(
+            list(ArticleViewSyncBatch.objects.values_list("token", flat=True)), ["new"]
+        )
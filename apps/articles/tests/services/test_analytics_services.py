@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from cachalot.api import cachalot_disabled
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+
+from articles.cache import (
+    HOURLY_ARTICLE_VIEWS_HOURS_KEY,
+    HOURLY_ARTICLE_VIEWS_ROLLUP_KEY,
+    HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY,
+    register_article_view,
+    roll_up_hourly_article_views,
+)
+from articles.models import Article, ArticleViewBucket
+from articles.services import (
+    prune_hourly_article_view_buckets,
+    record_hourly_article_views,
+)
+from config.settings.test import REDIS_CACHES
+from users.models import User
+
+
+class TestAnalyticsServices(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        user = User.objects.create_user(username="user1", email="u1@test.com")
+        self.a1 = Article.objects.create(
+            title="a1", author=user, preview_text="text", content="content"
+        )
+        self.a2 = Article.objects.create(
+            title="a2", author=user, preview_text="text", content="content"
+        )
+        self.hour_start = datetime(2026, 10, 16, 13, tzinfo=timezone.utc)
+        self.day_start = datetime(2026, 10, 16, tzinfo=timezone.utc)
+
+    def buckets(self):
+        return set(
+            ArticleViewBucket.objects.values_list(
+                "article_id", "granularity", "period_start", "views"
+            )
+        )
+
+    def test_record_hourly_article_views(self):
+        self.assertTrue(
+            record_hourly_article_views(
+                self.hour_start, {self.a1.id: 3, self.a2.id: 1, 9999: 5}, "token1"
+            )
+        )
+        next_hour_start = self.hour_start + timedelta(hours=1)
+        record_hourly_article_views(next_hour_start, {self.a1.id: 2}, "token2")
+
+        self.assertEqual(
+            self.buckets(),
+            {
+                (self.a1.id, "hour", self.hour_start, 3),
+                (self.a1.id, "hour", next_hour_start, 2),
+                (self.a1.id, "day", self.day_start, 5),
+                (self.a2.id, "hour", self.hour_start, 1),
+                (self.a2.id, "day", self.day_start, 1),
+            },
+        )
+
+    def test_rollup_recorded_once_per_token(self):
+        record_hourly_article_views(self.hour_start, {self.a1.id: 3}, "token1")
+        with patch("articles.services.analytics.logger.warning") as mock_warning:
+            self.assertFalse(
+                record_hourly_article_views(self.hour_start, {self.a1.id: 3}, "token1")
+            )
+            mock_warning.assert_called_once_with(
+                "Views of rollup %s have already been recorded.", "token1"
+            )
+        self.assertEqual(
+            ArticleViewBucket.objects.get(article=self.a1, granularity="day").views, 3
+        )
+
+    def test_buckets_stored_in_monthly_partition(self):
+        record_hourly_article_views(self.hour_start, {self.a1.id: 3}, "token1")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text, count(*) "
+                "FROM articles_articleviewbucket GROUP BY 1"
+            )
+            self.assertEqual(
+                cursor.fetchall(), [("articles_articleviewbucket_2026_10", 2)]
+            )
+
+    @patch("articles.services.analytics.ARTICLE_VIEW_HOURLY_BUCKET_RETENTION_DAYS", 30)
+    def test_prune_hourly_article_view_buckets(self):
+        old_hour_start = datetime.now(timezone.utc) - timedelta(days=31)
+        record_hourly_article_views(old_hour_start, {self.a1.id: 3}, "token1")
+        record_hourly_article_views(self.hour_start, {self.a1.id: 1}, "token2")
+
+        self.assertEqual(prune_hourly_article_view_buckets(), 1)
+        self.assertFalse(
+            ArticleViewBucket.objects.filter(
+                granularity="hour", period_start=old_hour_start
+            ).exists()
+        )
+        self.assertEqual(ArticleViewBucket.objects.filter(granularity="day").count(), 2)
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class TestRollUpHourlyArticleViews(TestCase):
+    def setUp(self):
+        self.enterContext(cachalot_disabled())
+        self.redis_conn = get_redis_connection("default")
+        self.redis_conn.flushdb()
+
+        user = User.objects.create_user(username="user1", email="u1@test.com")
+        self.article = Article.objects.create(
+            title="a1", author=user, preview_text="text", content="content"
+        )
+
+    def tearDown(self):
+        self.redis_conn.flushdb()
+
+    def register_views(self, hour, views, first_viewer_id=0):
+        with patch("articles.cache.view_counts.time.time", return_value=hour * 3600):
+            for viewer_id in range(first_viewer_id, first_viewer_id + views):
+                register_article_view(self.article.id, f"{hour}:{viewer_id}")
+
+    def hourly_views(self):
+        return dict(
+            ArticleViewBucket.objects.filter(granularity="hour").values_list(
+                "period_start", "views"
+            )
+        )
+
+    @patch("articles.cache.view_counts.time.time", return_value=3600 * 500_003 + 30)
+    def test_closed_hours_rolled_up(self, mock_time):
+        self.register_views(500_001, 3)
+        self.register_views(500_002, 2)
+        self.register_views(500_003, 1)
+
+        with patch("articles.cache.view_counts.logger"):
+            self.assertEqual(roll_up_hourly_article_views(), 1)
+
+        hour_start = datetime.fromtimestamp(3600 * 500_001, tz=timezone.utc)
+        self.assertEqual(self.hourly_views(), {hour_start: 3})
+        self.assertEqual(
+            self.redis_conn.smembers(HOURLY_ARTICLE_VIEWS_HOURS_KEY),
+            {b"500002", b"500003"},
+        )
+        self.assertFalse(self.redis_conn.exists(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY))
+
+        mock_time.return_value = 3600 * 500_003 + 90
+        self.assertEqual(roll_up_hourly_article_views(), 1)
+        self.assertEqual(len(self.hourly_views()), 2)
+        self.assertEqual(ArticleViewBucket.objects.get(granularity="day").views, 5)
+
+    @patch("articles.cache.view_counts.time.time", return_value=3600 * 500_003)
+    def test_failed_rollup_retried(self, mock_time):
+        self.register_views(500_001, 3)
+        with (
+            patch(
+                "articles.cache.view_counts.record_hourly_article_views",
+                side_effect=DatabaseError("DB error"),
+            ),
+            patch("articles.cache.view_counts.logger"),
+        ):
+            self.assertEqual(roll_up_hourly_article_views(), 0)
+        self.assertEqual(self.hourly_views(), {})
+        self.assertEqual(self.redis_conn.scard(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY), 1)
+
+        self.register_views(500_001, 1, first_viewer_id=3)
+        self.assertEqual(roll_up_hourly_article_views(), 2)
+        self.assertEqual(sum(self.hourly_views().values()), 4)
+
+    @patch("articles.cache.view_counts.time.time", return_value=3600 * 500_003)
+    def test_interrupted_rollup_recorded_once(self, mock_time):
+        self.redis_conn.hset(
+            HOURLY_ARTICLE_VIEWS_ROLLUP_KEY.format(hour=500_001, token="token"),
+            self.article.id,
+            3,
+        )
+        self.redis_conn.sadd(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY, "500001:token")
+        hour_start = datetime.fromtimestamp(3600 * 500_001, tz=timezone.utc)
+        record_hourly_article_views(hour_start, {self.article.id: 3}, "token")
+
+        with patch("articles.services.analytics.logger"):
+            self.assertEqual(roll_up_hourly_article_views(), 1)
+        self.assertEqual(self.hourly_views(), {hour_start: 3})
+        self.assertFalse(self.redis_conn.exists(HOURLY_ARTICLE_VIEWS_ROLLUPS_KEY))
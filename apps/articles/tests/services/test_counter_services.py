@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from articles.models import Article, ArticleComment
+from articles.services import (
+    apply_like_changes,
+    reconcile_counters,
+    recount_likes,
+    toggle_like,
+)
+from users.models import User
+
+
+class TestCounterServices(TestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username="user1", email="u1@test.com")
+        self.user2 = User.objects.create_user(username="user2", email="u2@test.com")
+        self.article = Article.objects.create(
+            title="a1",
+            author=self.user1,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        self.comment = ArticleComment.objects.create(
+            article=self.article, author=self.user1, text="text"
+        )
+
+    def test_comments_count_follows_comment_create_and_delete(self):
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 1)
+
+        comment2 = ArticleComment.objects.create(
+            article=self.article, author=self.user2, text="text"
+        )
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 2)
+
+        comment2.delete()
+        self.comment.delete()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comments_count, 0)
+
+    def test_likes_count_follows_m2m_changes(self):
+        self.article.users_that_liked.add(self.user1, self.user2)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 2)
+
+        self.article.users_that_liked.remove(self.user1)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 1)
+
+        self.user1.liked_comments.add(self.comment)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, 1)
+
+        self.article.users_that_liked.clear()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 0)
+
+    def test_toggle_like_concurrent_like_not_counted_twice(self):
+        with patch.object(
+            Article.users_that_liked.through.objects,
+            "create",
+            side_effect=IntegrityError("duplicate key"),
+        ):
+            self.assertEqual(toggle_like(self.article, self.user1.id), 0)
+
+    def test_apply_like_changes_removes_only_changed_likes(self):
+        article2 = Article.objects.create(
+            title="a2", author=self.user1, preview_text="text", content="content"
+        )
+        self.article.users_that_liked.add(self.user1, self.user2)
+        article2.users_that_liked.add(self.user1, self.user2)
+
+        apply_like_changes(
+            Article,
+            {
+                self.article.id: {self.user1.id: False},
+                article2.id: {self.user2.id: False},
+            },
+        )
+        self.assertEqual(list(self.article.users_that_liked.all()), [self.user2])
+        self.assertEqual(list(article2.users_that_liked.all()), [self.user1])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 1)
+
+    def test_recount_likes(self):
+        self.article.users_that_liked.add(self.user1)
+        Article.objects.filter(id=self.article.id).update(likes_count=10)
+
+        recount_likes(Article, [self.article.id])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 1)
+
+    def test_reconcile_counters(self):
+        self.comment.users_that_liked.add(self.user2)
+        self.assertEqual(
+            reconcile_counters(),
+            {"article likes": 0, "article comments": 0, "comment likes": 0},
+        )
+
+        Article.objects.filter(id=self.article.id).update(
+            likes_count=5, comments_count=0
+        )
+        ArticleComment.objects.filter(id=self.comment.id).update(likes_count=3)
+        self.assertEqual(
+            reconcile_counters(),
+            {"article likes": 1, "article comments": 1, "comment likes": 1},
+        )
+
+        self.article.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 0)
+        self.assertEqual(self.article.comments_count, 1)
+        self.assertEqual(self.comment.likes_count, 1)
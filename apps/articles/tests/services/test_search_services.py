@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from articles.models import Article, ArticleCategory
+from articles.selectors import find_articles_by_query
+from articles.services import (
+    rebuild_article_search_vectors,
+    update_article_search_vector,
+)
+from users.models import User
+
+
+class TestSearchServices(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", email="user@test.com")
+        self.category = ArticleCategory.objects.create(title="Cooking", slug="cooking")
+        self.article = Article.objects.create(
+            title="Pancakes",
+            author=self.user,
+            category=self.category,
+            preview_text="text",
+            content="<p>Fluffy <strong>breakfast</strong> &amp; brunch</p>",
+            is_published=True,
+        )
+
+    def test_search_vector_built_on_save(self):
+        self.article.refresh_from_db()
+        self.assertEqual(
+            self.article.search_vector,
+            "'breakfast':4 'brunch':5 'cooking':2C 'fluffy':3 'pancakes':1A",
+        )
+
+    def test_html_stripped_from_content(self):
+        self.assertCountEqual(find_articles_by_query("breakfast"), [self.article])
+        self.assertCountEqual(find_articles_by_query("strong"), [])
+        self.assertCountEqual(find_articles_by_query("amp"), [])
+
+    def test_search_vector_updated_on_tags_change(self):
+        self.assertCountEqual(find_articles_by_query("dessert"), [])
+
+        self.article.tags.add("dessert")
+        self.assertCountEqual(find_articles_by_query("dessert"), [self.article])
+
+        self.article.tags.remove("dessert")
+        self.assertCountEqual(find_articles_by_query("dessert"), [])
+
+    def test_search_vector_updated_on_category_rename(self):
+        self.category.title = "Baking"
+        self.category.save()
+
+        self.assertCountEqual(find_articles_by_query("baking"), [self.article])
+        self.assertCountEqual(find_articles_by_query("cooking"), [])
+
+    def test_update_article_search_vector_missing_article(self):
+        with patch("articles.services.search.logger.warning") as mock_warning:
+            update_article_search_vector(999999)
+            mock_warning.assert_called_once_with(
+                "Could not update search vector: article %s does not exist.", 999999
+            )
+
+    def test_rebuild_article_search_vectors(self):
+        Article.objects.filter(id=self.article.id).update(search_vector=None)
+        self.assertCountEqual(find_articles_by_query("pancakes"), [])
+
+        self.assertEqual(rebuild_article_search_vectors([self.article.id]), 1)
+        self.assertCountEqual(find_articles_by_query("pancakes"), [self.article])
+
+    def test_results_ranked_by_relevance(self):
+        by_content = Article.objects.create(
+            title="Waffles",
+            author=self.user,
+            preview_text="text",
+            content="Better than pancakes",
+            is_published=True,
+        )
+        by_tag = Article.objects.create(
+            title="Crepes",
+            author=self.user,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        by_tag.tags.add("pancakes")
+
+        self.assertEqual(
+            list(find_articles_by_query("pancakes")),
+            [self.article, by_tag, by_content],
+        )
@@ -1,4 +1,5 @@
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.utils import timezone
@@ -142,8 +143,8 @@ class TestArticleFilter(TestCase):
         filtered = ArticleFilter(data={"q": "a2"}).qs
         self.assertCountEqual(filtered, [self.article2])
 
-        filtered = ArticleFilter(data={"q": "ent1"}).qs
-        self.assertCountEqual(filtered, [self.article1])
+        filtered = ArticleFilter(data={"q": "cont"}).qs
+        self.assertCountEqual(filtered, [self.article1, self.article2])
 
         filtered = ArticleFilter(data={"q": "content2"}).qs
         self.assertCountEqual(filtered, [self.article2])
@@ -151,7 +152,10 @@ class TestArticleFilter(TestCase):
         filtered = ArticleFilter(data={"q": "Cat1"}).qs
         self.assertCountEqual(filtered, [self.article1])
 
-        filtered = ArticleFilter(data={"q": "at2"}).qs
+        filtered = ArticleFilter(data={"q": "cat2"}).qs
+        self.assertCountEqual(filtered, [self.article2])
+
+        filtered = ArticleFilter(data={"q": "tag1 a2"}).qs
         self.assertCountEqual(filtered, [self.article2])
 
         filtered = ArticleFilter(data={"q": "qafwejkfb"}).qs
@@ -182,6 +186,22 @@ class TestArticleFilter(TestCase):
         filtered = ArticleFilter(data=data).qs
         self.assertCountEqual(filtered, [self.article2, self.article1])
 
+    def test_ordering_trending(self):
+        with patch(
+            "articles.filters.get_trending_article_ids",
+            return_value=[self.article2.id, 9999, self.article1.id],
+        ):
+            filtered = ArticleFilter(data={"ordering": "trending"}).qs
+            self.assertEqual(list(filtered), [self.article2, self.article1])
+
+            data = {"ordering": "trending", "author": self.user1.username}
+            filtered = ArticleFilter(data=data).qs
+            self.assertEqual(list(filtered), [self.article1])
+
+        with patch("articles.filters.get_trending_article_ids", return_value=[]):
+            filtered = ArticleFilter(data={"ordering": "trending"}).qs
+            self.assertCountEqual(filtered, [self.article1, self.article2])
+
     def test_ordering_invalid(self):
         f = ArticleFilter(data={"ordering": "invalid"})
         self.assertFalse(f.is_valid())
@@ -228,3 +248,68 @@ class TestArticleFilter(TestCase):
         }
         filtered = ArticleFilter(data=data).qs
         self.assertCountEqual(filtered, [self.article2])
+
+    def test_get_result_cache_params(self):
+        params, scopes = ArticleFilter(data=None).get_result_cache_params()
+        self.assertEqual(
+            params,
+            {
+                "author": None,
+                "category": None,
+                "tags": [],
+                "date": None,
+                "ordering": [],
+            },
+        )
+        self.assertEqual(scopes, ["articles"])
+
+        data = {
+            "author": self.user1.username,
+            "category": self.category1.slug,
+            "tags": [self.tag2.name, self.tag1.name],
+            "date_after": "2024-01-02",
+            "ordering": "-Views",
+        }
+        params, scopes = ArticleFilter(data=data).get_result_cache_params()
+        self.assertEqual(params["tags"], sorted([self.tag1.id, self.tag2.id]))
+        self.assertEqual(params["date"][0].date().isoformat(), "2024-01-02")
+        self.assertIsNone(params["date"][1])
+        self.assertEqual(params["ordering"], ["-Views"])
+        self.assertEqual(
+            scopes,
+            [
+                f"articles:author:{self.user1.id}",
+                f"articles:category:{self.category1.id}",
+                *(f"articles:tag:{i}" for i in sorted((self.tag1.id, self.tag2.id))),
+            ],
+        )
+
+        # Equivalent queries share the parameters
+        reordered = {**data, "tags": [self.tag1.name, self.tag2.name]}
+        self.assertEqual(
+            ArticleFilter(data=reordered).get_result_cache_params()[0], params
+        )
+
+        for data in (
+            {"q": "text"},
+            {"ordering": "trending"},
+            {"author": "non-existent"},
+        ):
+            self.assertIsNone(ArticleFilter(data=data).get_result_cache_params())
+
+    def test_typeahead_widgets_render_only_selected_options(self):
+        Tag.objects.create(name="tag3")
+        form = ArticleFilter(
+            data={"author": self.user1.username, "tags": ["tag2"]}
+        ).form
+
+        author_html = str(form["author"])
+        self.assertIn(f'value="{self.user1.username}" selected', author_html)
+        self.assertNotIn(self.user2.username, author_html)
+        self.assertIn('data-typeahead-url="/typeahead/authors"', author_html)
+
+        tags_html = str(form["tags"])
+        self.assertIn('value="tag2" selected', tags_html)
+        self.assertNotIn("tag1", tags_html)
+        self.assertNotIn("tag3", tags_html)
+        self.assertIn('data-typeahead-url="/typeahead/tags"', tags_html)
@@ -4,7 +4,7 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
 
 from articles.models import Article
-from config.settings import CACHES
+from config.settings.test import REDIS_CACHES
 
 
 User = get_user_model()
@@ -64,7 +64,7 @@ class TestArticleModel(TestCase):
         self.assertEqual(self.a.title, "a")
         self.assertEqual(self.a.slug, "abc")
 
-    @override_settings(CACHES=CACHES)
+    @override_settings(CACHES=REDIS_CACHES)
     def test_views_property(self):
         self.assertEqual(self.a.views, 0)
         self.a.views_count = 10
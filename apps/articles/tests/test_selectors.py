@@ -1,13 +1,27 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
 from django.test import TestCase
+from django.utils import timezone as django_timezone
 from taggit.models import Tag
 
-from articles.models import Article, ArticleCategory, ArticleComment
+from articles.models import (
+    Article,
+    ArticleCategory,
+    ArticleComment,
+    ArticleViewBucket,
+)
 from articles.selectors import (
     find_article_comments_liked_by_user,
+    find_article_title_suggestions,
+    find_article_view_history,
     find_articles_by_query,
     find_articles_with_all_tags,
     find_comments_to_article,
+    find_most_viewed_article_ids,
     find_published_articles,
+    find_tag_name_suggestions,
+    find_trending_article_scores,
     get_all_categories,
     get_all_tags,
     get_article_by_slug,
@@ -320,3 +334,163 @@ class TestSelectors(TestCase):
         c1.delete()
         with self.assertRaises(ArticleComment.DoesNotExist):
             get_comment_by_id(c1_id)
+
+    def test_find_article_title_suggestions(self):
+        a1 = Article.objects.create(
+            title="Python basics",
+            author=self.test_user,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        a2 = Article.objects.create(
+            title="Advanced Python",
+            author=self.test_user,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        Article.objects.create(
+            title="Python drafts",
+            author=self.test_user,
+            preview_text="text",
+            content="content",
+            is_published=False,
+        )
+
+        self.assertEqual(
+            find_article_title_suggestions("pyth", 10),
+            [(a2.slug, a2.title), (a1.slug, a1.title)],
+        )
+        self.assertEqual(
+            find_article_title_suggestions("pyth", 1), [(a2.slug, a2.title)]
+        )
+        self.assertEqual(
+            find_article_title_suggestions("basics", 10), [(a1.slug, a1.title)]
+        )
+        self.assertEqual(
+            find_article_title_suggestions("pythom", 10),
+            [(a2.slug, a2.title), (a1.slug, a1.title)],
+        )  # Typo
+        self.assertEqual(find_article_title_suggestions("java", 10), [])
+
+    def test_find_tag_name_suggestions(self):
+        a = Article.objects.create(
+            title="a1",
+            author=self.test_user,
+            preview_text="text",
+            content="content",
+        )
+        a.tags.add("django", "Djangonaut", "flask")
+
+        self.assertEqual(
+            find_tag_name_suggestions("djan", 10),
+            [("django", "django"), ("Djangonaut", "Djangonaut")],
+        )
+        self.assertEqual(find_tag_name_suggestions("FLA", 10), [("flask", "flask")])
+        self.assertEqual(find_tag_name_suggestions("rails", 10), [])
+
+
+class TestViewAnalyticsSelectors(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="user1", email="u1@test.com")
+        self.a1 = Article.objects.create(
+            title="a1", author=user, preview_text="text", content="content"
+        )
+        self.a2 = Article.objects.create(
+            title="a2", author=user, preview_text="text", content="content"
+        )
+        self.hour = datetime(2026, 10, 16, 13, tzinfo=timezone.utc)
+        buckets = [
+            (self.a1, "hour", self.hour - timedelta(hours=2), 10),
+            (self.a1, "hour", self.hour - timedelta(hours=1), 1),
+            (self.a1, "hour", self.hour, 2),
+            (self.a2, "hour", self.hour, 4),
+            (self.a1, "day", self.hour.replace(hour=0), 13),
+            (self.a2, "day", self.hour.replace(hour=0), 4),
+        ]
+        ArticleViewBucket.objects.bulk_create(
+            ArticleViewBucket(
+                article=article,
+                granularity=granularity,
+                period_start=period_start,
+                views=views,
+            )
+            for article, granularity, period_start, views in buckets
+        )
+
+    def test_find_article_view_history(self):
+        self.assertEqual(
+            list(
+                find_article_view_history(
+                    self.a1.id, "hour", self.hour - timedelta(hours=1)
+                )
+            ),
+            [(self.hour - timedelta(hours=1), 1), (self.hour, 2)],
+        )
+        self.assertEqual(
+            list(
+                find_article_view_history(self.a2.id, "day", self.hour.replace(hour=0))
+            ),
+            [(self.hour.replace(hour=0), 4)],
+        )
+
+    def test_find_most_viewed_article_ids(self):
+        since = self.hour - timedelta(hours=1)
+        self.assertEqual(
+            find_most_viewed_article_ids(since, 10), [(self.a2.id, 4), (self.a1.id, 3)]
+        )
+        self.assertEqual(find_most_viewed_article_ids(since, 1), [(self.a2.id, 4)])
+        self.assertEqual(
+            find_most_viewed_article_ids(self.hour.replace(hour=0), 10, "day"),
+            [(self.a1.id, 13), (self.a2.id, 4)],
+        )
+
+
+class TestTrendingSelectors(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", email="u1@test.com")
+
+    def create_article(self, title, age, is_published=True, **counters):
+        article = Article.objects.create(
+            title=title,
+            author=self.user,
+            preview_text="text",
+            content="content",
+            is_published=is_published,
+        )
+        Article.objects.filter(id=article.id).update(
+            created_at=django_timezone.now() - age, **counters
+        )
+        return article
+
+    @patch("articles.selectors.ARTICLE_TRENDING_MAX_AGE_DAYS", 30)
+    @patch("articles.selectors.ARTICLE_TRENDING_GRAVITY", 1.8)
+    def test_find_trending_article_scores(self):
+        fresh = self.create_article("fresh", timedelta(hours=1), likes_count=1)
+        popular = self.create_article(
+            "popular", timedelta(days=2), likes_count=50, comments_count=10
+        )
+        viewed = self.create_article("viewed", timedelta(days=1))
+        ArticleViewBucket.objects.create(
+            article=viewed,
+            granularity="hour",
+            period_start=django_timezone.now() - timedelta(hours=2),
+            views=400,
+        )
+        ArticleViewBucket.objects.create(
+            article=viewed,
+            granularity="hour",
+            period_start=django_timezone.now() - timedelta(days=5),
+            views=100_000,
+        )
+        self.create_article("old", timedelta(days=31), likes_count=1000)
+        self.create_article("draft", timedelta(hours=1), False, likes_count=1000)
+
+        scores = find_trending_article_scores(10)
+        self.assertEqual(
+            [article_id for article_id, _ in scores],
+            [viewed.id, fresh.id, popular.id],
+        )
+        self.assertAlmostEqual(scores[1][1], 5 / 3**1.8, places=2)
+        self.assertEqual(len(find_trending_article_scores(2)), 2)
@@ -1,11 +1,13 @@
-from unittest.mock import patch
+from unittest.mock import call, patch
 
+from django.core.cache import cache
 from django.db.models import signals
 from django.test import TransactionTestCase
 
 from users.models import User
 
-from ..models import Article, ArticleComment
+from ..cache import ARTICLE_ID_BY_SLUG_KEY
+from ..models import Article, ArticleCategory, ArticleComment
 from ..signals import (
     delete_article_media_files,
     send_article_notification,
@@ -88,3 +90,111 @@ class TestSignals(TransactionTestCase):
         ) as send_new_comment_notification__mock:
             ArticleComment.objects.create(article=a, author=user, text="2")
             send_new_comment_notification__mock.assert_not_called()
+
+    def test_cached_article_id_follows_article_slug(self):
+        cache.clear()
+        user = User.objects.create(username="user")
+        a1 = Article.objects.create(
+            title="a1", author=user, preview_text="a1", content="a1"
+        )
+        self.assertEqual(cache.get(ARTICLE_ID_BY_SLUG_KEY.format(slug="a1")), a1.id)
+
+        a1.title = "a2"
+        a1.save()
+        self.assertIsNone(cache.get(ARTICLE_ID_BY_SLUG_KEY.format(slug="a1")))
+        self.assertEqual(cache.get(ARTICLE_ID_BY_SLUG_KEY.format(slug="a2")), a1.id)
+
+        a1.delete()
+        self.assertIsNone(cache.get(ARTICLE_ID_BY_SLUG_KEY.format(slug="a2")))
+
+    @patch("articles.signals.invalidate_scopes")
+    def test_cached_values_invalidated_on_article_changes(self, mock_invalidate):
+        user = User.objects.create(username="user")
+        category1 = ArticleCategory.objects.create(title="c1", slug="c1")
+        category2 = ArticleCategory.objects.create(title="c2", slug="c2")
+        mock_invalidate.assert_called_with([f"category:{category2.id}", "categories"])
+
+        a = Article.objects.create(
+            title="a1", author=user, category=category1, preview_text="a", content="a"
+        )
+        mock_invalidate.assert_called_with([f"article:{a.id}"])
+        a.tags.add("tag1")
+        tag_id = a.tags.get().id
+        # Drafts do not affect filter results
+        mock_invalidate.assert_called_with([f"article:{a.id}"])
+
+        mock_invalidate.reset_mock()
+        a.is_published = True
+        a.save()
+        mock_invalidate.assert_called_once_with(
+            [
+                f"article:{a.id}",
+                "articles",
+                f"articles:author:{user.id}",
+                f"articles:category:{category1.id}",
+                f"articles:tag:{tag_id}",
+            ]
+        )
+
+        mock_invalidate.reset_mock()
+        a.category = category2
+        a.save()
+        mock_invalidate.assert_called_once_with(
+            [
+                f"article:{a.id}",
+                "articles",
+                f"articles:author:{user.id}",
+                f"articles:category:{category1.id}",
+                f"articles:category:{category2.id}",
+                f"articles:tag:{tag_id}",
+            ]
+        )
+
+        mock_invalidate.reset_mock()
+        a.tags.clear()
+        mock_invalidate.assert_called_once_with(
+            [f"article:{a.id}", f"articles:tag:{tag_id}"]
+        )
+
+        mock_invalidate.reset_mock()
+        user.profile.save()
+        mock_invalidate.assert_called_once_with([f"user:{user.id}"])
+
+        mock_invalidate.reset_mock()
+        article_id = a.id
+        a.delete()
+        mock_invalidate.assert_called_once_with(
+            [
+                f"article:{article_id}",
+                "articles",
+                f"articles:author:{user.id}",
+                f"articles:category:{category2.id}",
+            ]
+        )
+
+    @patch("articles.signals.ARTICLE_EDGE_CACHE_TIMEOUT", 60)
+    @patch("articles.signals.refresh_edge_cached_pages_task.delay")
+    def test_edge_cached_pages_refreshed(self, mock_refresh):
+        user = User.objects.create(username="user")
+        a = Article.objects.create(
+            title="a1", slug="a1", author=user, preview_text="a1", content="a1"
+        )
+        mock_refresh.assert_called_once_with(["/articles/", "/articles/a1"])
+
+        mock_refresh.reset_mock()
+        a.title = "a2"
+        a.save()
+        mock_refresh.assert_called_once_with(
+            ["/articles/", "/articles/a2", "/articles/a1"]
+        )
+
+        mock_refresh.reset_mock()
+        comment = ArticleComment.objects.create(article=a, author=user, text="c")
+        comment.delete()
+        self.assertEqual(
+            mock_refresh.call_args_list, [call(["/articles/", "/articles/a2"])] * 2
+        )
+
+        mock_refresh.reset_mock()
+        a.delete()
+        mock_refresh.assert_called_once_with(["/articles/", "/articles/a2"])
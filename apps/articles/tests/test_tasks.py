@@ -3,18 +3,115 @@ from unittest.mock import patch
 from celery.exceptions import Retry
 from django.test import SimpleTestCase, override_settings
 
-from articles.tasks import delete_article_inline_media_task, sync_article_views_task
+from articles.tasks import (
+    delete_article_inline_media_task,
+    log_article_view_sync_metrics_task,
+    prune_article_view_sync_batches_task,
+    reconcile_counters_task,
+    roll_up_article_views_task,
+    sync_article_view_shard_task,
+    sync_article_views_task,
+    update_trending_articles_task,
+)
 
 
 @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
 class TestTasks(SimpleTestCase):
     @patch("articles.tasks.logger")
-    @patch("articles.tasks.sync_article_views")
-    def test_sync_article_views_task(self, mock_sync, mock_logger):
+    @patch("articles.tasks.chord")
+    @patch("articles.tasks.distribute_pending_view_syncs", return_value={0: 0, 1: 0})
+    def test_sync_article_views_task_no_backlog(
+        self, mock_distribute, mock_chord, mock_logger
+    ):
         res = sync_article_views_task()
         self.assertIsNone(res)
-        mock_sync.assert_called_once()
-        mock_logger.info.assert_called_once_with("Updated article view counts")
+        mock_distribute.assert_called_once()
+        mock_chord.assert_not_called()
+        mock_logger.info.assert_called_once_with("No article views to sync")
+
+    @patch("articles.tasks.logger")
+    @patch("articles.tasks.chord")
+    @patch(
+        "articles.tasks.distribute_pending_view_syncs",
+        return_value={0: 10, 1: 0, 2: 3},
+    )
+    def test_sync_article_views_task(self, mock_distribute, mock_chord, mock_logger):
+        sync_article_views_task()
+        header = list(mock_chord.call_args[0][0])
+        self.assertEqual(
+            header,
+            [sync_article_view_shard_task.s(0), sync_article_view_shard_task.s(2)],
+        )
+        mock_chord.return_value.assert_called_once_with(
+            log_article_view_sync_metrics_task.s()
+        )
+        mock_logger.info.assert_called_once_with(
+            "Dispatched article view sync of shards: %s", {0: 10, 1: 0, 2: 3}
+        )
+
+    @patch("articles.tasks.sync_article_view_shard", return_value={"shard": 1})
+    def test_sync_article_view_shard_task(self, mock_sync_shard):
+        self.assertEqual(sync_article_view_shard_task(1), {"shard": 1})
+        mock_sync_shard.assert_called_once_with(1)
+
+    @patch("articles.tasks.logger")
+    def test_log_article_view_sync_metrics_task(self, mock_logger):
+        log_article_view_sync_metrics_task(
+            [
+                {"articles": 10, "synced_articles": 8, "duration": 0.5},
+                {"shard": 1, "skipped": True},
+                {"articles": 3, "synced_articles": 3, "duration": 1.25},
+            ]
+        )
+        mock_logger.info.assert_called_once_with(
+            "Updated article view counts: synced %d of %d articles in %d shards "
+            "(%d skipped), slowest shard took %.3f s",
+            11,
+            13,
+            2,
+            1,
+            1.25,
+        )
+
+    @patch("articles.tasks.logger")
+    @patch("articles.tasks.prune_hourly_article_view_buckets", return_value=5)
+    @patch("articles.tasks.roll_up_hourly_article_views", return_value=2)
+    def test_roll_up_article_views_task(self, mock_roll_up, mock_prune, mock_logger):
+        roll_up_article_views_task()
+        mock_roll_up.assert_called_once()
+        mock_prune.assert_called_once()
+        mock_logger.info.assert_called_once_with(
+            "Rolled up article views of %d hours; pruned %d hourly view buckets",
+            2,
+            5,
+        )
+
+    @patch("articles.tasks.logger")
+    @patch("articles.tasks.update_trending_articles", return_value=7)
+    def test_update_trending_articles_task(self, mock_update, mock_logger):
+        update_trending_articles_task()
+        mock_update.assert_called_once()
+        mock_logger.info.assert_called_once_with(
+            "Updated trending articles: %d ranked", 7
+        )
+
+    @patch("articles.tasks.logger")
+    @patch("articles.tasks.prune_article_view_sync_batches", return_value=3)
+    def test_prune_article_view_sync_batches_task(self, mock_prune, mock_logger):
+        prune_article_view_sync_batches_task()
+        mock_prune.assert_called_once()
+        mock_logger.info.assert_called_once_with(
+            "Pruned %d applied article view sync batches", 3
+        )
+
+    @patch("articles.tasks.logger")
+    @patch("articles.tasks.reconcile_counters", return_value={"article likes": 2})
+    def test_reconcile_counters_task(self, mock_reconcile, mock_logger):
+        reconcile_counters_task()
+        mock_reconcile.assert_called_once()
+        mock_logger.info.assert_called_once_with(
+            "Reconciled article counters: %s", {"article likes": 2}
+        )
 
 
 @override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True)
@@ -9,9 +9,11 @@ from articles.views import (
     ArticleLikeView,
     ArticleListFilterView,
     ArticleUpdateView,
+    ArticleViewHistoryView,
     AttachedFileUploadView,
     CommentLikeView,
     HomePageView,
+    TypeaheadView,
 )
 
 
@@ -48,6 +50,10 @@ class TestURLs(SimpleTestCase):
         url = reverse("article-like", args=[1])
         self.assertEqual(resolve(url).func.view_class, ArticleLikeView)
 
+    def test_article_view_history_url_is_resolved(self):
+        url = reverse("article-view-history", args=[1])
+        self.assertEqual(resolve(url).func.view_class, ArticleViewHistoryView)
+
     def test_comment_like_url_is_resolved(self):
         url = reverse("comment-like", args=[1])
         self.assertEqual(resolve(url).func.view_class, CommentLikeView)
@@ -55,3 +61,7 @@ class TestURLs(SimpleTestCase):
     def test_attached_file_upload_url_is_resolved(self):
         url = reverse("attached-file-upload")
         self.assertEqual(resolve(url).func.view_class, AttachedFileUploadView)
+
+    def test_typeahead_url_is_resolved(self):
+        url = reverse("typeahead", args=["tags"])
+        self.assertEqual(resolve(url).func.view_class, TypeaheadView)
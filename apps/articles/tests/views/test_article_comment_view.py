@@ -45,10 +45,7 @@ class TestArticleCommentView(TestCase):
         comment_data = {"text": ""}
 
         self.client.force_login(self.user)
-        with (
-            patch("articles.cache.get_redis_connection"),
-            patch("articles.views.decorators.get_redis_connection"),
-        ):
+        with patch("articles.cache.view_counts.get_redis_connection"):
             response = self.client.post(self.url, comment_data)
             self.assertRedirects(
                 response,
@@ -66,10 +63,7 @@ class TestArticleCommentView(TestCase):
         comment_data = {"text": "text"}
 
         self.client.force_login(self.user)
-        with (
-            patch("articles.cache.get_redis_connection"),
-            patch("articles.views.decorators.get_redis_connection"),
-        ):
+        with patch("articles.cache.view_counts.get_redis_connection"):
             response = self.client.post(self.url, comment_data)
             self.assertRedirects(
                 response,
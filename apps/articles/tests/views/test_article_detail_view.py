@@ -1,5 +1,7 @@
+import gzip
 from unittest.mock import patch
 
+from cachalot.api import cachalot_disabled
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django_redis import get_redis_connection
@@ -8,6 +10,7 @@ from articles.cache import (
     ARTICLE_VIEWED_BY_KEY,
     ARTICLE_VIEWS_KEY,
     VIEWED_ARTICLES_SET_KEY,
+    toggle_buffered_like,
 )
 from articles.forms import ArticleCommentForm
 from articles.models import Article, ArticleCategory, ArticleComment
@@ -15,11 +18,12 @@ from articles.settings import (
     ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT,
     ARTICLE_UNIQUE_VIEW_TIMEOUT,
 )
-from config.settings import CACHES
+from config.settings.test import REDIS_CACHES
+from core.page_cache import PAGE_CACHE_ENCODINGS
 from users.models import User
 
 
-@override_settings(CACHES=CACHES)
+@override_settings(CACHES=REDIS_CACHES)
 class TestArticleDetailView(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -77,24 +81,86 @@ class TestArticleDetailView(TestCase):
         self.assertIsInstance(response.context.get("form"), ArticleCommentForm)
         self.assertCountEqual(response.context.get("liked_comments"), [self.comment.id])
 
+    @patch("articles.views.articles.ARTICLE_LIKES_BUFFER_ENABLED", True)
+    def test_context_data_with_buffered_likes(self):
+        self.article.users_that_liked.add(self.user)
+        self.comment.users_that_liked.add(self.user)
+        toggle_buffered_like(self.article, self.user.id)
+
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["user_liked"])
+        self.assertEqual(response.context["article"].likes_count, 0)
+        self.assertCountEqual(response.context.get("liked_comments"), [self.comment.id])
+
+    def test_comments_rendered_from_shared_fragments(self):
+        user2 = User.objects.create_user(username="user2", email="user2@test.com")
+        self.comment.users_that_liked.add(self.user)
+        liked_icon = 'fas fa-thumbs-up m-1 active"'
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(self.url), liked_icon)
+        self.client.force_login(user2)
+        self.assertNotContains(self.client.get(self.url), liked_icon)
+
+        ArticleComment.objects.filter(id=self.comment.id).update(text="new_text")
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "new_text")
+        self.assertEqual(
+            response.context["comments"][0].fragment_version,
+            self.client.get(self.url).context["comments"][0].fragment_version,
+        )
+
+        self.comment.text = "new_text"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comment.save()
+        self.assertContains(self.client.get(self.url), "new_text")
+
+    @patch("articles.views.mixins.ARTICLE_EDGE_CACHE_TIMEOUT", 60)
+    @patch("articles.views.articles.ARTICLE_EDGE_CACHE_TIMEOUT", 60)
+    def test_edge_cached(self):
+        self.article.users_that_liked.add(self.user)
+        user2 = User.objects.create_user(username="user2", email="user2@test.com")
+
+        self.client.force_login(self.user)
+        response1 = self.client.get(self.url)
+        self.client.force_login(user2)
+        response2 = self.client.get(self.url)
+
+        self.assertEqual(response1.content, response2.content)
+        self.assertEqual(response1["Cache-Control"], "public, max-age=0, s-maxage=60")
+        self.assertEqual(response1["Surrogate-Key"], f"article-{self.article.id}")
+        self.assertFalse(response1.context["user_liked"])
+        self.assertIsInstance(response1.context["form"], ArticleCommentForm)
+        self.assertNotContains(response1, "user2")
+        # Views are counted by the page state endpoint
+        self.assertFalse(self.redis_conn.exists(VIEWED_ARTICLES_SET_KEY))
+
     def test_cached_for_anonymous_user(self):
-        query_string = "*:views.decorators.cache.cache_page*"
+        query_string = "*page_cache*"
         self.assertEqual(self.redis_conn.keys(query_string), [])
 
         response1 = self.client.get(self.url)
         keys = self.redis_conn.keys(query_string)
-        self.assertEqual(len(keys), 1)
+        self.assertEqual(len(keys), len(PAGE_CACHE_ENCODINGS))
         self.assertEqual(
             self.redis_conn.ttl(keys[0]), ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT
         )
         self.assertTemplateUsed(response1, "articles/article.html")
 
-        response2 = self.client.get(self.url)
+        with cachalot_disabled(), self.assertNumQueries(0):
+            response2 = self.client.get(self.url)
         self.assertEqual(response1.content, response2.content)
         self.assertTemplateNotUsed(response2, "articles/article.html")
 
+        response3 = self.client.get(self.url, headers={"accept-encoding": "gzip"})
+        self.assertEqual(response3["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response3.content), response1.content)
+        self.assertTemplateNotUsed(response3, "articles/article.html")
+
     def test_not_cached_for_authenticated_user(self):
-        query_string = "*:views.decorators.cache.cache_page*"
+        query_string = "*page_cache*"
         self.assertEqual(self.redis_conn.keys(query_string), [])
         self.client.force_login(self.user)
 
@@ -106,6 +172,53 @@ class TestArticleDetailView(TestCase):
         self.assertTemplateUsed(response1, "articles/article.html")
         self.assertTemplateUsed(response2, "articles/article.html")
 
+    def test_conditional_get_anonymous(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with cachalot_disabled(), self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        toggle_buffered_like(self.comment, self.user.id)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        etag = response["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ArticleComment.objects.create(
+                author=self.user, article=self.article, text="new_comment"
+            )
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertContains(response, "new_comment")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_conditional_get_varies_on_time_zone(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.cookies["timezone"] = "America/New_York"
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_no_validators_for_authenticated_user(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    @patch("articles.views.mixins.ARTICLE_EDGE_CACHE_TIMEOUT", 60)
+    @patch("articles.views.articles.ARTICLE_EDGE_CACHE_TIMEOUT", 60)
+    def test_conditional_get_edge_cached(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["X-Accel-Expires"], "60")
+
     @patch("articles.views.decorators.get_visitor_id")
     def test_cached_views_increment(self, mock_get_id):
         mock_get_id.side_effect = lambda request: (
@@ -1,4 +1,3 @@
-from django.db.models import Count
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -49,22 +48,12 @@ class TestArticleLikeView(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "success", "data": {"likes": 1}})
         self.assertCountEqual(list(self.article.users_that_liked.all()), [self.user])
-        likes_count = (
-            Article.objects.filter(slug=self.article.slug)
-            .annotate(likes_count=Count("users_that_liked", distinct=True))
-            .first()
-            .likes_count
-        )
-        self.assertEqual(likes_count, 1)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 1)
 
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "success", "data": {"likes": 0}})
         self.assertCountEqual(list(self.article.users_that_liked.all()), [])
-        likes_count = (
-            Article.objects.filter(slug=self.article.slug)
-            .annotate(likes_count=Count("users_that_liked", distinct=True))
-            .first()
-            .likes_count
-        )
-        self.assertEqual(likes_count, 0)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.likes_count, 0)
@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from articles.models import Article, ArticleComment
+from config.settings.test import REDIS_CACHES
+from notifications.models import Notification
+from users.models import User
+
+
+@override_settings(CACHES=REDIS_CACHES)
+class TestArticlePageStateView(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.redis_conn = get_redis_connection("default")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.redis_conn.flushdb()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.redis_conn.flushdb()
+        self.user = User.objects.create_user(username="user", email="user@test.com")
+        self.user2 = User.objects.create_user(username="user2", email="u2@test.com")
+        self.article = Article.objects.create(
+            title="a1",
+            slug="a1",
+            author=self.user,
+            preview_text="text1",
+            content="content1",
+            is_published=True,
+        )
+        self.comments = [
+            ArticleComment.objects.create(
+                article=self.article, author=self.user, text=f"c{i}"
+            )
+            for i in range(2)
+        ]
+        self.article.users_that_liked.add(self.user2)
+        self.comments[1].users_that_liked.add(self.user2)
+        self.url = reverse("article-page-state")
+        self.params = {
+            "articles": [self.article.id],
+            "comments": [c.id for c in self.comments],
+        }
+
+    def test_anonymous_user(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "success",
+                "data": {
+                    "user": None,
+                    "articles": {
+                        str(self.article.id): {
+                            "liked": False,
+                            "likes": 1,
+                            "views": 0,
+                            "isAuthor": False,
+                        }
+                    },
+                    "comments": {
+                        str(self.comments[0].id): {"liked": False, "likes": 0},
+                        str(self.comments[1].id): {"liked": False, "likes": 1},
+                    },
+                },
+            },
+        )
+
+    def test_authenticated_user(self):
+        Notification.objects.create(
+            type=Notification.Type.NEW_COMMENT,
+            title="n1",
+            recipient=self.user2,
+            status=Notification.Status.READ,
+        )
+        notification = Notification.objects.create(
+            type=Notification.Type.NEW_COMMENT, title="n2", recipient=self.user2
+        )
+        self.client.force_login(self.user2)
+
+        data = self.client.get(self.url, self.params).json()["data"]
+        self.assertEqual(
+            data["user"], {"id": self.user2.id, "username": "user2", "isStaff": False}
+        )
+        self.assertTrue(data["articles"][str(self.article.id)]["liked"])
+        self.assertFalse(data["articles"][str(self.article.id)]["isAuthor"])
+        self.assertFalse(data["comments"][str(self.comments[0].id)]["liked"])
+        self.assertTrue(data["comments"][str(self.comments[1].id)]["liked"])
+        self.assertTrue(data["csrfToken"])
+        self.assertEqual(data["notificationsCount"], 1)
+        self.assertEqual([n["title"] for n in data["notifications"]], ["n2", "n1"])
+        self.assertEqual(data["notifications"][0]["id"], notification.id)
+        self.assertFalse(data["notifications"][0]["isRead"])
+
+        self.client.force_login(self.user)
+        data = self.client.get(self.url, self.params).json()["data"]
+        self.assertTrue(data["articles"][str(self.article.id)]["isAuthor"])
+        self.assertFalse(data["articles"][str(self.article.id)]["liked"])
+
+    @patch("articles.views.articles.register_article_view")
+    def test_view_counted(self, mock_register_view):
+        self.client.get(self.url, {"viewed": "a1"})
+        mock_register_view.assert_called_once()
+        self.assertEqual(mock_register_view.call_args.args[0], self.article.id)
+
+        mock_register_view.reset_mock()
+        self.client.get(self.url, {"viewed": "unknown"})
+        mock_register_view.assert_not_called()
+
+    @patch("articles.views.articles.ARTICLE_PAGE_STATE_MAX_IDS", 2)
+    def test_invalid_ids(self):
+        response = self.client.get(self.url, {"articles": ["a"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Invalid ID")
+
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Too many IDs")
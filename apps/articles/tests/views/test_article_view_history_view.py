@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from articles.models import Article, ArticleViewBucket
+from users.models import User
+
+
+class TestArticleViewHistoryView(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", email="a@test.com")
+        self.article = Article.objects.create(
+            title="a1", author=self.author, preview_text="text", content="content"
+        )
+        self.url = reverse("article-view-history", args=[self.article.slug])
+
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.recent = now - timedelta(days=1)
+        ArticleViewBucket.objects.bulk_create(
+            [
+                ArticleViewBucket(
+                    article=self.article,
+                    granularity="day",
+                    period_start=now - timedelta(days=40),
+                    views=7,
+                ),
+                ArticleViewBucket(
+                    article=self.article,
+                    granularity="day",
+                    period_start=self.recent,
+                    views=5,
+                ),
+                ArticleViewBucket(
+                    article=self.article,
+                    granularity="hour",
+                    period_start=self.recent,
+                    views=2,
+                ),
+            ]
+        )
+
+    def test_author_gets_history(self):
+        self.client.force_login(self.author)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "success",
+                "data": {
+                    "granularity": "day",
+                    "views": [{"periodStart": self.recent.isoformat(), "views": 5}],
+                },
+            },
+        )
+
+        response = self.client.get(self.url, {"granularity": "hour", "days": "2"})
+        self.assertEqual(response.json()["data"]["views"][0]["views"], 2)
+
+        response = self.client.get(self.url, {"days": "60"})
+        self.assertEqual(len(response.json()["data"]["views"]), 2)
+
+    def test_invalid_params(self):
+        self.client.force_login(self.author)
+
+        response = self.client.get(self.url, {"granularity": "week"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
+
+        response = self.client.get(self.url, {"days": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_author_allowed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+        other_user = User.objects.create_user(username="other", email="o@test.com")
+        self.client.force_login(other_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse("article-view-history", args=["unknown"]))
+        self.assertEqual(response.status_code, 404)
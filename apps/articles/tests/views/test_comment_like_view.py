@@ -1,4 +1,3 @@
-from django.db.models import Count
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -45,13 +44,8 @@ class TestCommentLikeView(TestCase):
             {"status": "success", "data": {"likes": 1}},
         )
         self.assertCountEqual(list(self.comment.users_that_liked.all()), [self.user])
-        likes_count = (
-            ArticleComment.objects.filter(id=self.comment.id)
-            .annotate(likes_count=Count("users_that_liked", distinct=True))
-            .first()
-            .likes_count
-        )
-        self.assertEqual(likes_count, 1)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, 1)
 
         response = self.client.post(self.url)
         self.assertEqual(response.status_code, 200)
@@ -60,10 +54,5 @@ class TestCommentLikeView(TestCase):
             {"status": "success", "data": {"likes": 0}},
         )
         self.assertCountEqual(list(self.comment.users_that_liked.all()), [])
-        likes_count = (
-            ArticleComment.objects.filter(id=self.comment.id)
-            .annotate(likes_count=Count("users_that_liked", distinct=True))
-            .first()
-            .likes_count
-        )
-        self.assertEqual(likes_count, 0)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, 0)
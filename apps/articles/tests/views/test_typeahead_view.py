@@ -0,0 +1,71 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from articles.models import Article
+from users.models import User
+
+
+class TestTypeaheadView(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="author", email="a@test.com")
+        self.article = Article.objects.create(
+            title="Python basics",
+            author=self.user,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+        self.article.tags.add("python")
+
+    def test_article_suggestions(self):
+        response = self.client.get(reverse("typeahead", args=["articles"]), {"q": "py"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "status": "success",
+                "data": {
+                    "results": [{"id": self.article.slug, "text": "Python basics"}]
+                },
+            },
+        )
+
+    def test_tag_and_author_suggestions(self):
+        response = self.client.get(reverse("typeahead", args=["tags"]), {"q": "pyt"})
+        self.assertEqual(
+            response.json()["data"]["results"], [{"id": "python", "text": "python"}]
+        )
+
+        response = self.client.get(reverse("typeahead", args=["authors"]), {"q": "au"})
+        self.assertEqual(
+            response.json()["data"]["results"], [{"id": "author", "text": "author"}]
+        )
+
+    def test_short_prefix(self):
+        mock_find = Mock()
+        with patch.dict(
+            "articles.cache.typeahead.TYPEAHEAD_SOURCES", {"tags": mock_find}
+        ):
+            response = self.client.get(reverse("typeahead", args=["tags"]), {"q": "p"})
+            mock_find.assert_not_called()
+        self.assertEqual(response.json()["data"]["results"], [])
+
+    def test_unknown_source(self):
+        response = self.client.get(reverse("typeahead", args=["comments"]), {"q": "py"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_suggestions_are_cached(self):
+        url = reverse("typeahead", args=["tags"])
+        mock_find = Mock(return_value=[("python", "python")])
+        with patch.dict(
+            "articles.cache.typeahead.TYPEAHEAD_SOURCES", {"tags": mock_find}
+        ):
+            response1 = self.client.get(url, {"q": "PY "})
+            response2 = self.client.get(url, {"q": "py"})
+            mock_find.assert_called_once_with("py", 10)
+        self.assertEqual(response1.json(), response2.json())
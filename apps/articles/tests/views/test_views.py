@@ -1,10 +1,16 @@
 from unittest.mock import patch
 
+from cachalot.api import cachalot_disabled
+from django.core.cache import cache
+from django.db import connection
 from django.http import Http404
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from articles.models import Article, ArticleCategory, ArticleComment
+from articles.views import ArticleListFilterView
+from core.cache import invalidate_scopes
 from users.models import User
 
 
@@ -32,7 +38,7 @@ class TestViews(TestCase):
         )
 
     def test_homepage_view(self):
-        with patch("articles.cache.get_redis_connection"):
+        with patch("articles.cache.view_counts.get_redis_connection"):
             response = self.client.get(reverse("home"))
 
             self.assertRedirects(
@@ -43,12 +49,209 @@ class TestViews(TestCase):
             )
 
     def test_article_list_filter_view(self):
-        with patch("articles.cache.get_redis_connection"):
+        with patch("articles.cache.view_counts.get_redis_connection"):
             response = self.client.get(reverse("articles"))
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "articles/home_page.html")
 
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_gets_views_in_bulk(self, mock_get_redis):
+        mock_redis = mock_get_redis.return_value
+        mock_redis.mget.return_value = [b"5"]
+
+        response = self.client.get(reverse("articles"))
+        self.assertContains(response, "test_article")
+        self.assertEqual(response.context["articles"][0].views, 5)
+        mock_redis.mget.assert_called_once()
+        mock_redis.get.assert_not_called()
+
+    @patch("articles.views.articles.ARTICLE_LIST_PAGINATION", "cursor")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_cursor_pagination(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        for i in range(3):
+            Article.objects.create(
+                title=f"a{i}",
+                author=self.test_user,
+                preview_text="text",
+                content="content",
+                is_published=True,
+            )
+        url = reverse("articles")
+
+        with patch.object(ArticleListFilterView, "paginate_by", 2):
+            response = self.client.get(url)
+            self.assertEqual(
+                [a.title for a in response.context["articles"]], ["a2", "a1"]
+            )
+            page_obj = response.context["page_obj"]
+            self.assertContains(response, f"cursor={page_obj.next_cursor}")
+
+            response = self.client.get(url, {"cursor": page_obj.next_cursor})
+            self.assertEqual(
+                [a.title for a in response.context["articles"]],
+                ["a0", "test_article"],
+            )
+            self.assertFalse(response.context["page_obj"].has_next())
+            self.assertEqual(response.context["paginator"].count, 4)
+
+            response = self.client.get(url, {"cursor": "invalid"})
+            self.assertEqual(response.status_code, 404)
+
+            with patch("articles.filters.get_trending_article_ids", return_value=[1]):
+                response = self.client.get(url, {"ordering": "trending"})
+            self.assertFalse(hasattr(response.context["paginator"], "is_keyset"))
+
+    @patch("articles.views.articles.ARTICLE_LIST_PAGINATION", "cursor")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_cursor_pagination_of_search(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        for i in range(6):
+            Article.objects.create(
+                title=f"searched {'searched ' * (i % 3)}{i}",
+                author=self.test_user,
+                preview_text="text",
+                content="content",
+                is_published=True,
+            )
+        self.test_article.title = "searched"
+        self.test_article.save()
+        url = reverse("articles")
+
+        # Search results are ordered by rank, which cannot be a keyset
+        titles = []
+        with patch.object(ArticleListFilterView, "paginate_by", 2):
+            for page in range(1, 5):
+                response = self.client.get(url, {"q": "searched", "page": page})
+                self.assertFalse(hasattr(response.context["paginator"], "is_keyset"))
+                titles += [a.title for a in response.context["articles"]]
+        self.assertEqual(len(titles), 7)
+        self.assertEqual(len(set(titles)), 7)
+
+    @patch("articles.views.articles.ARTICLE_LIST_COUNT", "cached")
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_cached_count(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        cache.clear()
+        self.client.get(reverse("articles"))
+        Article.objects.create(
+            title="a1",
+            author=self.test_user,
+            preview_text="text",
+            content="content",
+            is_published=True,
+        )
+
+        response = self.client.get(reverse("articles"))
+        self.assertEqual(response.context["paginator"].count, 1)
+        self.assertContains(response, "Articles matching your query (1)")
+
+    @patch("articles.views.articles.ARTICLE_FILTER_RESULT_CACHE_TIMEOUT", 60)
+    @patch("articles.cache.article_lists.ARTICLE_FILTER_RESULT_CACHE_TIMEOUT", 60)
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_cached_results(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        self.enterContext(cachalot_disabled())
+        cache.clear()
+        for i in range(3):
+            Article.objects.create(
+                title=f"a{i}",
+                author=self.test_user,
+                category=self.test_category,
+                preview_text="text",
+                content="content",
+                is_published=True,
+            )
+        url = reverse("articles")
+        data = {"category": self.test_category.slug}
+
+        with patch.object(ArticleListFilterView, "paginate_by", 2):
+            response = self.client.get(url, data)
+            self.assertEqual(
+                [a.title for a in response.context["articles"]], ["a2", "a1"]
+            )
+            self.assertEqual(response.context["paginator"].count, 4)
+
+            # Pages are hydrated by the cached IDs, without filtering again
+            Article.objects.filter(title="a2").update(category=None)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {**data, "page": 2})
+            self.assertEqual(
+                [a.title for a in response.context["articles"]],
+                ["a0", "test_article"],
+            )
+            self.assertEqual(response.context["paginator"].count, 4)
+            self.assertFalse(any(q["sql"].startswith("SELECT COUNT(") for q in queries))
+
+            invalidate_scopes([f"articles:category:{self.test_category.id}"])
+            response = self.client.get(url, data)
+            self.assertEqual(
+                [a.title for a in response.context["articles"]], ["a1", "a0"]
+            )
+            self.assertEqual(response.context["paginator"].count, 3)
+
+            # Text search results are not cached
+            with patch(
+                "articles.views.articles.get_cached_article_filter_results"
+            ) as mock_get_results:
+                self.client.get(url, {**data, "q": "text"})
+            mock_get_results.assert_not_called()
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_cached_cards(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        url = reverse("articles")
+        self.client.get(url)
+
+        # Cards are rendered from the cache until the article changes
+        Article.objects.filter(id=self.test_article.id).update(title="new_title")
+        response = self.client.get(url)
+        self.assertContains(response, "test_article")
+        self.assertNotContains(response, "new_title")
+
+        Article.objects.filter(id=self.test_article.id).update(likes_count=7)
+        response = self.client.get(url)
+        self.assertContains(response, "new_title")
+
+        self.test_category.title = "new_category"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_category.save()
+        response = self.client.get(url)
+        self.assertContains(response, "new_category")
+
+    @patch("articles.cache.view_counts.get_redis_connection")
+    def test_article_list_filter_view_conditional_get(self, mock_get_redis):
+        mock_get_redis.return_value.mget.side_effect = lambda keys: [None] * len(keys)
+        cache.clear()
+        url = reverse("articles")
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        with self.assertTemplateNotUsed("articles/home_page.html"):
+            response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        # Pages of other filters have ETags of their own
+        response = self.client.get(
+            url, {"category": "cat1"}, headers={"if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        # Search results get no ETag
+        self.assertFalse(self.client.get(url, {"q": "text"}).has_header("ETag"))
+
+        self.test_article.title = "new_title"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_article.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertContains(response, "new_title")
+        self.assertNotEqual(response["ETag"], etag)
+
+        self.client.force_login(self.test_user)
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
     def test_article_delete_view_unauthorized(self):
         url = reverse("article-delete", args=[self.test_article.slug])
         self.client.get(url)
@@ -65,7 +268,7 @@ class TestViews(TestCase):
         )
 
         self.client.force_login(self.test_user)
-        with patch("articles.cache.get_redis_connection"):
+        with patch("articles.cache.view_counts.get_redis_connection"):
             response = self.client.post(reverse("article-delete", args=[a.slug]))
 
             self.assertRedirects(
@@ -11,7 +11,13 @@ urlpatterns = [
         name="attached-file-upload",
     ),
     path("articles/", views.ArticleListFilterView.as_view(), name="articles"),
+    path("typeahead/<str:source>", views.TypeaheadView.as_view(), name="typeahead"),
     path("articles/create", views.ArticleCreateView.as_view(), name="article-create"),
+    path(
+        "articles/page-state",
+        views.ArticlePageStateView.as_view(),
+        name="article-page-state",
+    ),
     path(
         "articles/<slug:article_slug>/edit",
         views.ArticleUpdateView.as_view(),
@@ -37,6 +43,11 @@ urlpatterns = [
         views.ArticleLikeView.as_view(),
         name="article-like",
     ),
+    path(
+        "articles/<slug:article_slug>/views",
+        views.ArticleViewHistoryView.as_view(),
+        name="article-view-history",
+    ),
     path(
         "comments/<int:comment_id>/like",
         views.CommentLikeView.as_view(),
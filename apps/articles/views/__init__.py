@@ -1,3 +1,4 @@
 from .articles import *
 from .base import *
 from .comments import *
+from .typeahead import *
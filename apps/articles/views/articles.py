@@ -1,60 +1,244 @@
+import hashlib
 import logging
-from typing import Any
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Optional
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import QuerySet
 from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.views import View
+from django.views.decorators.cache import never_cache
 from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
 from django_filters.views import FilterView
 
 from core.decorators import cache_page_for_anonymous
+from core.pagination import (
+    CachedIdList,
+    CountingPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+    RowCount,
+    count_rows,
+    count_rows_cached,
+    get_keyset_ordering,
+)
+from core.visitor_identifiers import get_visitor_id
+from notifications.cache import get_cached_unread_notifications_count
+from notifications.services import get_notifications_page, serialize_notification
 
+from ..cache import (
+    apply_buffered_likes,
+    attach_article_fragment_versions,
+    attach_cached_article_views,
+    attach_comment_fragment_versions,
+    cache_article_list_etag,
+    get_article_id_by_slug,
+    get_article_list_versions,
+    get_article_page_version,
+    get_cached_article_by_slug,
+    get_cached_article_filter_results,
+    get_cached_article_list_etag,
+    get_cached_articles,
+    register_article_view,
+)
 from ..filters import ArticleFilter
 from ..forms import ArticleCommentForm, ArticleModelForm
-from ..models import Article
+from ..models import Article, ArticleComment, ArticleViewBucket
 from ..selectors import (
     find_article_comments_liked_by_user,
+    find_article_view_history,
+    find_comments_by_ids,
     find_comments_to_article,
+    find_ids_liked_by_user,
     find_published_articles,
     get_article_by_slug,
 )
 from ..services import toggle_article_like
-from ..settings import ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT, ARTICLES_PER_PAGE_COUNT
+from ..settings import (
+    ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT,
+    ARTICLE_EDGE_CACHE_TIMEOUT,
+    ARTICLE_FILTER_RESULT_CACHE_TIMEOUT,
+    ARTICLE_FRAGMENT_CACHE_TIMEOUT,
+    ARTICLE_LIKES_BUFFER_ENABLED,
+    ARTICLE_LIST_COUNT,
+    ARTICLE_LIST_COUNT_CACHE_TIMEOUT,
+    ARTICLE_LIST_ETAG_TIMEOUT,
+    ARTICLE_LIST_EXACT_COUNT_LIMIT,
+    ARTICLE_LIST_PAGINATION,
+    ARTICLE_PAGE_STATE_MAX_IDS,
+    ARTICLE_VIEW_HISTORY_MAX_DAYS,
+    ARTICLES_PER_PAGE_COUNT,
+)
 from .decorators import increment_article_view_counter
-from .mixins import AllowOnlyAuthorMixin
+from .mixins import AllowOnlyAuthorMixin, ConditionalPageMixin, EdgeCachedPageMixin
 
 
 logger = logging.getLogger(__name__)
 
 
-class ArticleListFilterView(FilterView):
+class ArticleListFilterView(EdgeCachedPageMixin, ConditionalPageMixin, FilterView):
     filterset_class = ArticleFilter
     context_object_name = "articles"
     paginate_by = ARTICLES_PER_PAGE_COUNT
     template_name = "articles/home_page.html"
+    etag_key: Optional[str] = None
+    etag_versions: Optional[dict[str, str]] = None
 
     def get_queryset(self) -> QuerySet[Article]:
         return find_published_articles()
 
+    def get_paginator(self, queryset, per_page, **kwargs) -> CountingPaginator:
+        counter = (
+            count_rows
+            if isinstance(queryset, CachedIdList)
+            else self._get_counter(estimate=False)
+        )
+        return CountingPaginator(queryset, per_page, counter=counter, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = get_keyset_ordering(queryset)
+        if ARTICLE_LIST_PAGINATION != "cursor" or ordering is None:
+            if ARTICLE_FILTER_RESULT_CACHE_TIMEOUT:
+                queryset = self._get_cached_results(queryset)
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering, counter=self._get_counter(estimate=True)
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise Http404("Invalid cursor") from e
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def _get_cached_results(
+        self, queryset: QuerySet[Article]
+    ) -> QuerySet[Article] | CachedIdList:
+        cache_params = self.filterset.get_result_cache_params()
+        if cache_params is None:
+            return queryset
+        article_ids, count = get_cached_article_filter_results(queryset, *cache_params)
+        return CachedIdList(
+            queryset, article_ids, count, get_objects=self._get_cached_articles
+        )
+
+    @staticmethod
+    def _get_cached_articles(article_ids: list[int]) -> dict[int, Article]:
+        return {
+            article_id: article
+            for article_id, article in get_cached_articles(article_ids).items()
+            if article.is_published
+        }
+
+    def _get_counter(self, estimate: bool) -> Callable[[QuerySet], RowCount]:
+        if ARTICLE_LIST_COUNT == "exact":
+            return count_rows
+        estimate_above = (
+            ARTICLE_LIST_EXACT_COUNT_LIMIT
+            if estimate and ARTICLE_LIST_COUNT == "estimated"
+            else None
+        )
+        return partial(
+            count_rows_cached,
+            timeout=ARTICLE_LIST_COUNT_CACHE_TIMEOUT,
+            estimate_above=estimate_above,
+        )
+
+    def get_context_data(self, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        attach_cached_article_views(context["articles"])
+        if ARTICLE_LIKES_BUFFER_ENABLED:
+            apply_buffered_likes(context["articles"])
+        attach_article_fragment_versions(context["articles"])
+        context["fragment_cache_timeout"] = ARTICLE_FRAGMENT_CACHE_TIMEOUT
 
-class ArticleDetailView(DetailView):
+        cache_params = self.filterset.get_result_cache_params()
+        if self.etag_key and cache_params is not None:
+            self.etag_versions = get_article_list_versions(
+                context["articles"], cache_params[1]
+            )
+        return context
+
+    def render_to_response(self, context, **response_kwargs) -> HttpResponse:
+        response = super().render_to_response(context, **response_kwargs)
+        if self.etag_key is not None and self.etag_versions is not None:
+            response.add_post_render_callback(
+                partial(self._set_etag, self.etag_key, self.etag_versions)
+            )
+        return response
+
+    def get_validators(self, variant: str) -> tuple[Optional[str], None]:
+        """The ETag of a list page is the digest of its content, cached
+        until the articles on the page change. Pages of results that are
+        not cached (see `ArticleFilter.get_result_cache_params`) get no
+        ETag."""
+        if not ARTICLE_LIST_ETAG_TIMEOUT:
+            return None, None
+        self.etag_key = hashlib.md5(
+            f"{self.request.get_full_path()}:{variant}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return get_cached_article_list_etag(self.etag_key), None
+
+    def _set_etag(
+        self, etag_key: str, versions: dict[str, str], response: HttpResponse
+    ) -> None:
+        etag = hashlib.md5(response.content, usedforsecurity=False).hexdigest()
+        cache_article_list_etag(etag_key, etag, versions)
+        response["ETag"] = f"W/{quote_etag(etag)}"
+
+    def get_surrogate_keys(self) -> list[str]:
+        return ["articles"]
+
+
+class ArticleDetailView(EdgeCachedPageMixin, ConditionalPageMixin, DetailView):
     model = Article
     slug_url_kwarg = "article_slug"
     context_object_name = "article"
     template_name = "articles/article.html"
 
-    @method_decorator(increment_article_view_counter)
-    @method_decorator(cache_page_for_anonymous(ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT))
     def dispatch(self, request, *args, **kwargs) -> HttpResponse:
+        if ARTICLE_EDGE_CACHE_TIMEOUT:
+            # Views are counted when the page fetches its personal state
+            return super().dispatch(request, *args, **kwargs)
+        return self._dispatch_per_user(request, *args, **kwargs)
+
+    @method_decorator(increment_article_view_counter)
+    def _dispatch_per_user(self, request, *args, **kwargs) -> HttpResponse:
         return super().dispatch(request, *args, **kwargs)
 
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        if ARTICLE_EDGE_CACHE_TIMEOUT:
+            return super().get(request, *args, **kwargs)
+        # Pages are cached by their ETag, so that a changed article is not
+        # served from the cache and cached pages match their ETag
+        get = cache_page_for_anonymous(
+            ARTICLE_DETAILS_PAGE_CACHE_TIMEOUT, key_prefix=self.etag or ""
+        )(super().get)
+        return get(request, *args, **kwargs)
+
+    def get_validators(self, variant: str) -> tuple[str, datetime]:
+        """The ETag changes with the article, its counters, comments and
+        likes. Clients that send it are answered by it alone; the
+        modification time of the article is only used by ones that
+        ignore ETags."""
+        article = self.get_object()
+        version = get_article_page_version(article)
+        etag = hashlib.md5(
+            f"{version}:{variant}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return etag, article.modified_at
+
     def get_object(self) -> Article:
         article_slug = self.kwargs.get(self.slug_url_kwarg)
         try:
-            article = get_article_by_slug(article_slug)
+            article = get_cached_article_by_slug(article_slug)
         except Article.DoesNotExist as e:
             logger.warning("Article with '%s' slug not found.", article_slug)
             raise Http404("Article not found") from e
@@ -74,8 +258,40 @@ class ArticleDetailView(DetailView):
             context["liked_comments"] = find_article_comments_liked_by_user(
                 article, self.request.user
             )
+        elif ARTICLE_EDGE_CACHE_TIMEOUT:
+            # The page shows the form once it knows the user is logged in
+            context["form"] = ArticleCommentForm()
+        if ARTICLE_LIKES_BUFFER_ENABLED:
+            self._apply_buffered_likes(context)
+
+        # Comments are rendered from fragments shared by all users that
+        # vary on the like state of the user
+        liked_comments = set(context.get("liked_comments", []))
+        for comment in context["comments"]:
+            comment.is_liked = comment.id in liked_comments
+        attach_comment_fragment_versions(context["comments"])
+        context["fragment_cache_timeout"] = ARTICLE_FRAGMENT_CACHE_TIMEOUT
         return context
 
+    def get_surrogate_keys(self) -> list[str]:
+        return [f"article-{self.object.id}"]
+
+    def _apply_buffered_likes(self, context: dict[str, Any]) -> None:
+        user_id = self.request.user.id
+        user_liked = apply_buffered_likes([self.object], user_id)
+        context["user_liked"] = user_liked.get(self.object.id, context["user_liked"])
+
+        comments = context["comments"]
+        liked_comments = apply_buffered_likes(comments, user_id)
+        if user_id:
+            context["liked_comments"] = [
+                comment.id
+                for comment in comments
+                if liked_comments.get(
+                    comment.id, comment.id in context["liked_comments"]
+                )
+            ]
+
 
 class ArticleCreateView(LoginRequiredMixin, CreateView):
     model = Article
@@ -133,3 +349,136 @@ class ArticleLikeView(LoginRequiredMixin, View):
     def post(self, request, article_slug) -> JsonResponse:
         data = {"likes": toggle_article_like(article_slug, request.user.id)}
         return JsonResponse({"status": "success", "data": data}, status=200)
+
+
+class ArticleViewHistoryView(AllowOnlyAuthorMixin, View):
+    """Returns hourly or daily view counts of the article for the last
+    `days` days to its author."""
+
+    def get_object(self) -> Article:
+        try:
+            return get_article_by_slug(self.kwargs["article_slug"])
+        except Article.DoesNotExist as e:
+            raise Http404("Article not found") from e
+
+    def get(self, request, **_kwargs) -> JsonResponse:
+        granularity = request.GET.get("granularity", ArticleViewBucket.Granularity.DAY)
+        if granularity not in ArticleViewBucket.Granularity.values:
+            return JsonResponse(
+                {"status": "error", "message": "Unknown granularity"}, status=400
+            )
+        try:
+            days = int(request.GET.get("days", "30"))
+        except ValueError:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid number of days"}, status=400
+            )
+        days = max(1, min(days, ARTICLE_VIEW_HISTORY_MAX_DAYS))
+
+        since = timezone.now() - timedelta(days=days)
+        history = find_article_view_history(self.get_object().id, granularity, since)
+        data = {
+            "granularity": granularity,
+            "views": [
+                {"periodStart": period_start.isoformat(), "views": views}
+                for period_start, views in history
+            ],
+        }
+        return JsonResponse({"status": "success", "data": data})
+
+
+@method_decorator(never_cache, name="dispatch")
+class ArticlePageStateView(View):
+    """Returns the state of edge-cached pages that is personal to the
+    user, for the articles and comments on the page: whether the user
+    liked them, and current numbers of likes and views. For logged-in
+    users, also returns the user, the first page of their notifications
+    and a CSRF token.
+
+    If the `viewed` slug is given, the view of the article is counted.
+    """
+
+    def get(self, request) -> JsonResponse:
+        try:
+            article_ids = [int(i) for i in request.GET.getlist("articles")]
+            comment_ids = [int(i) for i in request.GET.getlist("comments")]
+        except ValueError:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid ID"}, status=400
+            )
+        if len(article_ids) + len(comment_ids) > ARTICLE_PAGE_STATE_MAX_IDS:
+            return JsonResponse(
+                {"status": "error", "message": "Too many IDs"}, status=400
+            )
+
+        viewed_slug = request.GET.get("viewed")
+        if viewed_slug:
+            viewed_article_id = get_article_id_by_slug(viewed_slug)
+            if viewed_article_id is not None:
+                register_article_view(viewed_article_id, get_visitor_id(request))
+
+        articles = list(get_cached_articles(article_ids).values())
+        attach_cached_article_views(articles)
+        comments = list(find_comments_by_ids(comment_ids))
+        liked_articles, liked_comments = self._get_liked_ids(articles, comments)
+
+        user = request.user
+        data = {
+            "user": None,
+            "articles": {
+                article.id: {
+                    "liked": article.id in liked_articles,
+                    "likes": article.likes_count,
+                    "views": article.views,
+                    "isAuthor": article.author_id == user.id,
+                }
+                for article in articles
+            },
+            "comments": {
+                comment.id: {
+                    "liked": comment.id in liked_comments,
+                    "likes": comment.likes_count,
+                }
+                for comment in comments
+            },
+        }
+        if user.is_authenticated:
+            data.update(self._get_user_state(user))
+        return JsonResponse({"status": "success", "data": data})
+
+    def _get_liked_ids(
+        self, articles: list[Article], comments: list[ArticleComment]
+    ) -> tuple[set[int], set[int]]:
+        user = self.request.user
+        if not user.is_authenticated:
+            if ARTICLE_LIKES_BUFFER_ENABLED:
+                apply_buffered_likes([*articles, *comments])
+            return set(), set()
+
+        liked_ids = []
+        for model, objects in ((Article, articles), (ArticleComment, comments)):
+            liked = set(find_ids_liked_by_user(model, [o.id for o in objects], user))
+            if ARTICLE_LIKES_BUFFER_ENABLED:
+                for object_id, is_liked in apply_buffered_likes(
+                    objects, user.id
+                ).items():
+                    if is_liked:
+                        liked.add(object_id)
+                    else:
+                        liked.discard(object_id)
+            liked_ids.append(liked)
+        return liked_ids[0], liked_ids[1]
+
+    def _get_user_state(self, user) -> dict[str, Any]:
+        notifications_page = get_notifications_page(user)
+        return {
+            "user": {
+                "id": user.id,
+                "username": user.username,
+                "isStaff": user.is_staff,
+            },
+            "csrfToken": get_token(self.request),
+            "notificationsCount": get_cached_unread_notifications_count(user),
+            "notifications": [serialize_notification(n) for n in notifications_page],
+            "notificationsNextCursor": notifications_page.next_cursor,
+        }
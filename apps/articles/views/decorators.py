@@ -2,13 +2,9 @@ import logging
 from functools import wraps
 from typing import Any, Callable
 
-from django_redis import get_redis_connection
-
 from core.visitor_identifiers import get_visitor_id
 
-from ..cache import ARTICLE_VIEWED_BY_KEY, increment_cached_article_views
-from ..models import Article
-from ..settings import ARTICLE_UNIQUE_VIEW_TIMEOUT
+from ..cache import get_article_id_by_slug, register_article_view
 
 
 logger = logging.getLogger(__name__)
@@ -23,23 +19,15 @@ def increment_article_view_counter(view_func: Callable[..., Any]) -> Callable[..
     def _wrapped_view(request, *args, **kwargs) -> Any:
         article_slug = kwargs.get("article_slug")
         if article_slug:
-            try:
-                article_id = Article.objects.values_list("id", flat=True).get(
-                    slug=article_slug
-                )
-            except Article.DoesNotExist:
+            article_id = get_article_id_by_slug(article_slug)
+            if article_id is None:
                 logger.warning(
                     "Article not found for slug '%s'.",
                     article_slug,
                 )
                 return view_func(request, *args, **kwargs)
 
-            cache_key = ARTICLE_VIEWED_BY_KEY.format(
-                article_id=article_id, viewer_id=get_visitor_id(request)
-            )
-            redis_conn = get_redis_connection("default")
-            if redis_conn.set(cache_key, "1", ex=ARTICLE_UNIQUE_VIEW_TIMEOUT, nx=True):
-                increment_cached_article_views(article_id)
+            register_article_view(article_id, get_visitor_id(request))
         return view_func(request, *args, **kwargs)
 
     return _wrapped_view
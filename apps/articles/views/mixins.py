@@ -1,4 +1,16 @@
-from django.http import Http404
+from datetime import datetime
+from typing import Any, Optional
+
+from django.contrib.messages import get_messages
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+from django.views.generic.base import ContextMixin, TemplateResponseMixin, View
+
+from core.decorators import edge_cache_page
+
+from ..settings import ARTICLE_EDGE_CACHE_TIMEOUT
 
 
 class AllowOnlyAuthorMixin:
@@ -6,3 +18,75 @@ class AllowOnlyAuthorMixin:
         if self.get_object().author != self.request.user:
             raise Http404
         return super().dispatch(*args, **kwargs)
+
+
+class EdgeCachedPageMixin(TemplateResponseMixin, ContextMixin, View):
+    """Renders the page the same for all users and lets shared caches
+    serve it if ARTICLE_EDGE_CACHE_TIMEOUT is set. The page is marked
+    with surrogate keys, by which CDNs can purge it."""
+
+    def dispatch(self, request, *args, **kwargs) -> HttpResponse:
+        if not ARTICLE_EDGE_CACHE_TIMEOUT:
+            return super().dispatch(request, *args, **kwargs)
+        dispatch = edge_cache_page(ARTICLE_EDGE_CACHE_TIMEOUT)(super().dispatch)
+        return dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        if ARTICLE_EDGE_CACHE_TIMEOUT:
+            context["edge_cached"] = True
+            # Messages are personal; they are shown on the next page instead
+            context["messages"] = ()
+        return context
+
+    def render_to_response(self, context, **response_kwargs) -> HttpResponse:
+        response = super().render_to_response(context, **response_kwargs)
+        if ARTICLE_EDGE_CACHE_TIMEOUT:
+            response["Surrogate-Key"] = " ".join(self.get_surrogate_keys())
+        return response
+
+    def get_surrogate_keys(self) -> list[str]:
+        return []
+
+
+class ConditionalPageMixin(View):
+    """Answers conditional GET requests with 304 Not Modified if the page
+    has not changed, without rendering it. Only pages that are the same
+    for every anonymous visitor, or for every user if the page is
+    edge-cached, get the validators returned by `get_validators`.
+
+    ETags are weak, since they identify the page regardless of how it is
+    compressed.
+    """
+
+    request: HttpRequest
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+    def dispatch(self, request, *args, **kwargs) -> HttpResponse:
+        if request.method in ("GET", "HEAD"):
+            variant = self.get_page_variant()
+            if variant is not None:
+                self.etag, self.last_modified = self.get_validators(variant)
+        etag = f"W/{quote_etag(self.etag)}" if self.etag else None
+        dispatch = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: self.last_modified,
+        )(super().dispatch)
+        return dispatch(request, *args, **kwargs)
+
+    def get_page_variant(self) -> Optional[str]:
+        """Returns what the page depends on besides its URL and the data
+        it shows, or None if the page is personal to the user."""
+        if not ARTICLE_EDGE_CACHE_TIMEOUT and (
+            self.request.user.is_authenticated or len(get_messages(self.request))
+        ):
+            return None
+        return timezone.get_current_timezone_name()
+
+    def get_validators(  # pylint: disable=unused-argument
+        self, variant: str
+    ) -> tuple[Optional[str], Optional[datetime]]:
+        """Returns the ETag and the last modification time of the page
+        for the variant, either of which may be None."""
+        return None, None
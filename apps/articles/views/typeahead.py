@@ -0,0 +1,14 @@
+from django.http import JsonResponse
+from django.views import View
+
+from ..cache import TYPEAHEAD_SOURCES, get_cached_typeahead_suggestions
+
+
+class TypeaheadView(View):
+    def get(self, request, source: str) -> JsonResponse:
+        if source not in TYPEAHEAD_SOURCES:
+            return JsonResponse(
+                {"status": "error", "message": "Unknown typeahead source"}, status=404
+            )
+        results = get_cached_typeahead_suggestions(source, request.GET.get("q", ""))
+        return JsonResponse({"status": "success", "data": {"results": results}})
@@ -0,0 +1,38 @@
+from django import forms
+
+
+class TypeaheadSelectMixin:
+    """Renders only the selected options instead of iterating over the
+    whole choices queryset. The remaining options are loaded by the
+    client from the typeahead endpoint at `typeahead_url`.
+
+    Works for choice fields whose submitted values are also their
+    display labels (e.g. usernames or tag names).
+    """
+
+    def __init__(self, typeahead_url, attrs=None, **kwargs):
+        attrs = {**(attrs or {}), "data-typeahead-url": typeahead_url}
+        super().__init__(attrs=attrs, **kwargs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected_values = [v for v in value if v]
+        options = [
+            self.create_option(name, v, v, True, index, attrs=attrs)
+            for index, v in enumerate(selected_values)
+        ]
+        if not self.allow_multiple_selected:
+            options.insert(
+                0,
+                self.create_option(
+                    name, "", "---------", not selected_values, 0, attrs=attrs
+                ),
+            )
+        return [(None, options, 0)]
+
+
+class TypeaheadSelect(TypeaheadSelectMixin, forms.Select):
+    pass
+
+
+class TypeaheadSelectMultiple(TypeaheadSelectMixin, forms.SelectMultiple):
+    pass
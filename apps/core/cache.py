@@ -0,0 +1,288 @@
+import hashlib
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Model
+
+from .settings import CACHE_METRICS_FLUSH_INTERVAL
+
+
+SCOPE_VERSION_KEY = "cache:scope:{scope}:version"
+CACHED_VALUE_KEY = "cache:{name}:{key}"
+CACHE_METRICS_KEY = "cache:metrics:{name}:{outcome}"
+CACHE_METRICS_NAMES_KEY = "cache:metrics:names"
+
+CACHE_HIT = "hits"
+CACHE_MISS = "misses"
+
+
+def get_object_scope(name: str, object_id: Hashable) -> str:
+    return f"{name}:{object_id}"
+
+
+def get_scope_versions(scopes: Iterable[str]) -> dict[str, str]:
+    """Returns the versions of the scopes. Scopes without a version, e.g.
+    evicted ones, get a new random one, so that values cached under an
+    earlier version can never be reached again.
+    """
+    version_keys = {
+        SCOPE_VERSION_KEY.format(scope=scope): scope for scope in set(scopes)
+    }
+    versions = cache.get_many(version_keys)
+    for version_key in version_keys:
+        if version_key not in versions:
+            cache.add(version_key, uuid.uuid4().hex, timeout=None)
+            versions[version_key] = cache.get(version_key)
+    return {scope: versions[version_key] for version_key, scope in version_keys.items()}
+
+
+def invalidate_scopes(scopes: Iterable[str]) -> None:
+    """Makes values cached under any of the scopes unreachable by giving
+    the scopes new versions."""
+    cache.set_many(
+        {
+            SCOPE_VERSION_KEY.format(scope=scope): uuid.uuid4().hex
+            for scope in set(scopes)
+        },
+        timeout=None,
+    )
+
+
+def get_scope_version_digests(
+    scopes_by_key: dict[Hashable, Iterable[str]],
+) -> dict[Hashable, str]:
+    """Returns a digest of the current versions of the scopes of each
+    key, which changes whenever any of the scopes is invalidated, e.g.
+    to vary cached template fragments on. The versions of all the scopes
+    are read at once.
+    """
+    scopes_by_key = {key: sorted(set(scopes)) for key, scopes in scopes_by_key.items()}
+    versions = get_scope_versions(
+        scope for scopes in scopes_by_key.values() for scope in scopes
+    )
+    return {
+        key: hashlib.md5(
+            ":".join(versions[scope] for scope in scopes).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        for key, scopes in scopes_by_key.items()
+    }
+
+
+def get_or_set_versioned(
+    name: str,
+    key: str,
+    scopes: Iterable[str],
+    default: Callable[[], Any],
+    timeout: int,
+) -> Any:
+    """Returns the value cached under the key, computing and caching it
+    with `default` on a miss. The value is cached under the current
+    versions of the scopes it depends on, so that invalidating any of
+    them makes it unreachable. Hits and misses are counted under the
+    name.
+    """
+    versions = get_scope_versions(scopes)
+    cache_key = CACHED_VALUE_KEY.format(name=name, key=key)
+    entry = cache.get(cache_key)
+    if entry is not None and entry[1] == versions:
+        record_cache_access(name, hits=1)
+        return entry[0]
+
+    record_cache_access(name, misses=1)
+    value = default()
+    cache.set(cache_key, (value, versions), timeout=timeout)
+    return value
+
+
+def get_versioned(name: str, key: str) -> Any:
+    """Returns the value cached under the key with `set_versioned`, or
+    None if it is not cached or any of the scopes it depends on has been
+    invalidated since. Hits and misses are counted under the name.
+    """
+    entry = cache.get(CACHED_VALUE_KEY.format(name=name, key=key))
+    if entry is None or get_scope_versions(entry[1]) != entry[1]:
+        record_cache_access(name, misses=1)
+        return None
+    record_cache_access(name, hits=1)
+    return entry[0]
+
+
+def set_versioned(
+    name: str, key: str, value: Any, versions: dict[str, str], timeout: int
+) -> None:
+    """Caches the value under the versions of the scopes it depends on,
+    as returned by `get_scope_versions` before the value was computed."""
+    cache.set(CACHED_VALUE_KEY.format(name=name, key=key), (value, versions), timeout)
+
+
+class VersionedObjectCache:
+    """Caches model objects by ID together with the versions of the
+    scopes they depend on: the object's own scope and the scopes
+    returned by `get_dependencies`, e.g. of related objects it is
+    fetched with. A cached object is used only while none of these
+    scopes has been invalidated since it was cached.
+
+    The version of the own scope is read before the object is fetched,
+    so a change committed in between is never cached as current.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[list[Hashable]], Iterable[Model]],
+        get_dependencies: Callable[[Model], Iterable[str]],
+        timeout: int,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.get_dependencies = get_dependencies
+        self.timeout = timeout
+
+    def get(self, object_id: Hashable) -> Optional[Model]:
+        return self.get_many([object_id]).get(object_id)
+
+    def get_many(self, object_ids: Iterable[Hashable]) -> dict[Hashable, Model]:
+        """Returns the objects with the IDs that exist, fetching the ones
+        that are not cached or outdated."""
+        cache_keys = {
+            object_id: CACHED_VALUE_KEY.format(name=self.name, key=object_id)
+            for object_id in object_ids
+        }
+        entries = cache.get_many(list(cache_keys.values()))
+
+        scopes = {get_object_scope(self.name, object_id) for object_id in cache_keys}
+        for _, entry_versions in entries.values():
+            scopes.update(entry_versions)
+        versions = get_scope_versions(scopes)
+
+        objects = {}
+        for object_id, cache_key in cache_keys.items():
+            entry = entries.get(cache_key)
+            if entry is not None and all(
+                versions[scope] == version for scope, version in entry[1].items()
+            ):
+                objects[object_id] = entry[0]
+
+        missing_ids = [
+            object_id for object_id in cache_keys if object_id not in objects
+        ]
+        record_cache_access(self.name, hits=len(objects), misses=len(missing_ids))
+        if missing_ids:
+            fetched = {obj.pk: obj for obj in self.fetch(missing_ids)}
+            objects.update(fetched)
+            self._set_many(fetched, cache_keys, versions)
+        return objects
+
+    def invalidate(self, object_ids: Iterable[Hashable]) -> None:
+        invalidate_scopes(
+            get_object_scope(self.name, object_id) for object_id in object_ids
+        )
+
+    def _set_many(
+        self,
+        objects: dict[Hashable, Model],
+        cache_keys: dict[Hashable, str],
+        versions: dict[str, str],
+    ) -> None:
+        dependencies = {
+            object_id: list(self.get_dependencies(obj))
+            for object_id, obj in objects.items()
+        }
+        versions = {
+            **get_scope_versions(
+                scope for scopes in dependencies.values() for scope in scopes
+            ),
+            **versions,
+        }
+        cache.set_many(
+            {
+                cache_keys[object_id]: (
+                    obj,
+                    {
+                        scope: versions[scope]
+                        for scope in [
+                            get_object_scope(self.name, object_id),
+                            *dependencies[object_id],
+                        ]
+                    },
+                )
+                for object_id, obj in objects.items()
+            },
+            timeout=self.timeout,
+        )
+
+
+class _CacheMetricsBuffer:
+    """Cache hits and misses counted in the process since they were last
+    added to the shared counters."""
+
+    def __init__(self) -> None:
+        self.pending: Counter[tuple[str, str]] = Counter()
+        self.last_flush = time.monotonic()
+
+
+_metrics_buffer = _CacheMetricsBuffer()
+
+
+def record_cache_access(name: str, hits: int = 0, misses: int = 0) -> None:
+    """Counts cache hits and misses in the process and adds them to the
+    shared counters at most every CACHE_METRICS_FLUSH_INTERVAL seconds,
+    so that reading from the cache does not write to it every time.
+    """
+    _metrics_buffer.pending[(name, CACHE_HIT)] += hits
+    _metrics_buffer.pending[(name, CACHE_MISS)] += misses
+    now = time.monotonic()
+    if now - _metrics_buffer.last_flush >= CACHE_METRICS_FLUSH_INTERVAL:
+        _metrics_buffer.last_flush = now
+        flush_cache_metrics()
+
+
+def flush_cache_metrics() -> None:
+    metrics = dict(_metrics_buffer.pending)
+    _metrics_buffer.pending.clear()
+
+    names = set(cache.get(CACHE_METRICS_NAMES_KEY) or ())
+    if not {name for name, _ in metrics} <= names:
+        names.update(name for name, _ in metrics)
+        cache.set(CACHE_METRICS_NAMES_KEY, sorted(names), timeout=None)
+
+    for (name, outcome), count in metrics.items():
+        if not count:
+            continue
+        metrics_key = CACHE_METRICS_KEY.format(name=name, outcome=outcome)
+        cache.add(metrics_key, 0, timeout=None)
+        try:
+            cache.incr(metrics_key, count)
+        except ValueError:
+            # The counter has been evicted since it was added
+            cache.set(metrics_key, count, timeout=None)
+
+
+def get_cache_metrics() -> dict[str, dict[str, int | float]]:
+    """Returns numbers of hits and misses and the hit rate of each
+    cache, including the accesses of this process not yet flushed."""
+    flush_cache_metrics()
+    names = cache.get(CACHE_METRICS_NAMES_KEY) or []
+    counts = cache.get_many(
+        [
+            CACHE_METRICS_KEY.format(name=name, outcome=outcome)
+            for name in names
+            for outcome in (CACHE_HIT, CACHE_MISS)
+        ]
+    )
+
+    metrics = {}
+    for name in names:
+        hits = counts.get(CACHE_METRICS_KEY.format(name=name, outcome=CACHE_HIT), 0)
+        misses = counts.get(CACHE_METRICS_KEY.format(name=name, outcome=CACHE_MISS), 0)
+        total = hits + misses
+        metrics[name] = {
+            CACHE_HIT: hits,
+            CACHE_MISS: misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+    return metrics
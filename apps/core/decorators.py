@@ -1,20 +1,77 @@
 from functools import wraps
 from typing import Any, Callable
 
-from django.views.decorators.cache import cache_page
+from django.contrib.auth.models import AnonymousUser
+from django.template.response import SimpleTemplateResponse
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+
+from .middleware import get_default_timezone
+from .page_cache import cache_page_variants, get_cached_page
 
 
 def cache_page_for_anonymous(
-    timeout: int,
+    timeout: int, key_prefix: str = ""
 ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-    def decorator(view_func: Callable[..., Any]) -> Callable[..., Any]:
-        cached_view = cache_page(timeout)(view_func)
+    """Caches pages for anonymous users for `timeout` seconds. Pages are
+    cached minified and compressed with each supported content coding, so
+    that pages served from the cache are neither minified nor compressed
+    again (see `core.page_cache`).
+    """
 
+    def decorator(view_func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            if request.user.is_authenticated:
+            if request.user.is_authenticated or request.method not in ("GET", "HEAD"):
                 return view_func(request, *args, **kwargs)
-            return cached_view(request, *args, **kwargs)
+
+            response = get_cached_page(request, key_prefix)
+            if response is not None:
+                return response
+            response = view_func(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and "private" not in response.get("Cache-Control", "")
+            ):
+                response = cache_page_variants(request, response, timeout, key_prefix)
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+def edge_cache_page(timeout: int) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Renders the page as for an anonymous visitor, so that it is the
+    same for every user, and allows shared caches in front of the app to
+    serve it for `timeout` seconds. Browsers revalidate it every time, and
+    so do shared caches once it expires, if the page has validators.
+    Personal state has to be fetched by the page itself.
+
+    Neither the session nor the time zone of the user is used while the
+    page is rendered, so that the response neither sets cookies nor
+    varies on them.
+    """
+
+    def decorator(view_func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            request.user = AnonymousUser()
+            with timezone.override(get_default_timezone()):
+                response = view_func(request, *args, **kwargs)
+                if isinstance(response, SimpleTemplateResponse):
+                    response.render()
+            if response.status_code in (200, 304) and not response.cookies:
+                patch_cache_control(response, public=True, max_age=0, s_maxage=timeout)
+                # nginx ignores s-maxage
+                response["X-Accel-Expires"] = timeout
+            else:
+                add_never_cache_headers(response)
+            return response
 
         return _wrapped_view
 
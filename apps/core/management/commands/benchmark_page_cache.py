@@ -0,0 +1,96 @@
+import functools
+import time
+import uuid
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.test import Client, RequestFactory, override_settings
+from django.views.decorators.cache import cache_page
+
+from core.decorators import cache_page_for_anonymous
+from core.middleware import MinifyHtmlMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the CPU time per request of serving a page from the cache "
+        "of rendered pages, which is minified and compressed by the middleware "
+        "on every request, and from the cache of minified and compressed "
+        "pages. The page at the URL is rendered once by the app."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="/articles/", help="URL of the page to serve."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of requests to serve with each cache.",
+        )
+        parser.add_argument(
+            "--accept-encoding",
+            default="gzip, deflate, br",
+            help="Accept-Encoding header of the requests.",
+        )
+
+    def handle(self, *args, **options):
+        url, requests = options["url"], options["requests"]
+        html = self._render_page(url)
+        self.stdout.write(f"Page size: {len(html)} bytes")
+
+        def view(request):
+            return HttpResponse(html)
+
+        key_prefix = f"benchmark:{uuid.uuid4().hex}"
+        factory = RequestFactory(
+            headers={"accept-encoding": options["accept_encoding"]}
+        )
+        for name, cached_view in (
+            ("cache_page + middleware", cache_page(60, key_prefix=key_prefix)(view)),
+            (
+                "Precompressed page cache",
+                cache_page_for_anonymous(60, key_prefix=key_prefix)(view),
+            ),
+        ):
+            handler = GZipMiddleware(MinifyHtmlMiddleware(cached_view))
+            serve = functools.partial(self._serve, handler, factory, url)
+            self._benchmark(name, serve, requests)
+
+    def _benchmark(
+        self, name: str, serve: Callable[[], HttpResponse], requests: int
+    ) -> None:
+        # Caches the page
+        response = serve()
+        started_at = time.process_time()
+        for _ in range(requests):
+            serve()
+        elapsed = time.process_time() - started_at
+        self.stdout.write(
+            f"{name}: {elapsed / requests * 1e6:.1f} us CPU per request "
+            f"({requests} requests in {elapsed:.2f} s, "
+            f"{len(response.content)} bytes sent)"
+        )
+
+    @staticmethod
+    def _serve(handler, factory: RequestFactory, url: str) -> HttpResponse:
+        request = factory.get(url)
+        request.user = AnonymousUser()
+        return handler(request)
+
+    def _render_page(self, url: str) -> bytes:
+        middleware = [
+            m
+            for m in settings.MIDDLEWARE
+            if not m.endswith(("GZipMiddleware", "MinifyHtmlMiddleware"))
+        ]
+        with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=["testserver"]):
+            response = Client().get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} responded with {response.status_code}.")
+        return response.content
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import get_cache_metrics
+
+
+class Command(BaseCommand):
+    help = "Shows numbers of hits and misses and hit rates of the project caches."
+
+    def handle(self, *args, **options):
+        metrics = get_cache_metrics()
+        if not metrics:
+            self.stdout.write("No cache accesses recorded yet.")
+            return
+        for name, counts in sorted(metrics.items()):
+            self.stdout.write(
+                f"{name}: {counts['hits']} hits, {counts['misses']} misses, "
+                f"hit rate {counts['hit_rate']:.2%}"
+            )
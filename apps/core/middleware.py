@@ -3,6 +3,9 @@ from urllib.parse import unquote
 import pytz
 from django.conf import settings
 from django.utils import timezone
+from django_minify_html.middleware import (
+    MinifyHtmlMiddleware as BaseMinifyHtmlMiddleware,
+)
 
 
 class TimezoneMiddleware:
@@ -28,6 +31,16 @@ class TimezoneMiddleware:
         return self.get_response(request)
 
 
+class MinifyHtmlMiddleware(BaseMinifyHtmlMiddleware):
+    """Skips responses that are minified already, e.g. pages served
+    from the page cache."""
+
+    def should_minify(self, request, response) -> bool:
+        return not getattr(response, "is_minified", False) and super().should_minify(
+            request, response
+        )
+
+
 def get_default_timezone():
     if hasattr(settings, "DEFAULT_USER_TZ"):
         tz = settings.DEFAULT_USER_TZ
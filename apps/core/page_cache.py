@@ -0,0 +1,112 @@
+import hashlib
+import re
+from typing import Optional
+
+import minify_html
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_response_headers, patch_vary_headers
+from django.utils.text import compress_string
+
+from .middleware import MinifyHtmlMiddleware
+
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PAGE_CACHE_KEY = "page_cache:{key_prefix}:{url_hash}:{encoding}"
+
+IDENTITY = "identity"
+# Content codings of cached pages in the order of preference
+PAGE_CACHE_ENCODINGS = (*(["br"] if brotli else []), "gzip", IDENTITY)
+
+_accepts_encoding = {
+    encoding: re.compile(rf"\b{encoding}\b")
+    for encoding in PAGE_CACHE_ENCODINGS
+    if encoding != IDENTITY
+}
+
+
+def get_page_encoding(request) -> str:
+    """Returns the most preferred content coding of cached pages that the
+    client accepts."""
+    accept_encoding = request.headers.get("Accept-Encoding", "")
+    for encoding, accepts_encoding in _accepts_encoding.items():
+        if accepts_encoding.search(accept_encoding):
+            return encoding
+    return IDENTITY
+
+
+def get_cached_page(request, key_prefix: str = "") -> Optional[HttpResponse]:
+    """Returns the cached page for the URL of the request, compressed
+    with the content coding the client prefers, or None if the page is
+    not cached."""
+    entry = cache.get(
+        _get_page_cache_key(request, key_prefix, get_page_encoding(request))
+    )
+    return _build_response(entry) if entry is not None else None
+
+
+def cache_page_variants(
+    request, response: HttpResponse, timeout: int, key_prefix: str = ""
+) -> HttpResponse:
+    """Minifies the rendered page once, caches it compressed with each of
+    PAGE_CACHE_ENCODINGS for `timeout` seconds and returns the copy for
+    the request. The minification and compression middleware skip these
+    copies, so they are not minified or compressed again on cache hits.
+    """
+    content = response.content
+    if response.get("Content-Type", "").split(";", 1)[0] == "text/html":
+        content = minify_html.minify(  # pylint: disable=no-member
+            content.decode(response.charset), **MinifyHtmlMiddleware.minify_args
+        ).encode(response.charset)
+    patch_response_headers(response, timeout)
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    entries = {}
+    for encoding in PAGE_CACHE_ENCODINGS:
+        headers = dict(response.items())
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+        encoded_content = _compress(content, encoding)
+        headers["Content-Length"] = str(len(encoded_content))
+        entries[_get_page_cache_key(request, key_prefix, encoding)] = (
+            response.status_code,
+            headers,
+            encoded_content,
+        )
+    cache.set_many(entries, timeout)
+
+    return _build_response(
+        entries[_get_page_cache_key(request, key_prefix, get_page_encoding(request))]
+    )
+
+
+def _build_response(entry: tuple[int, dict[str, str], bytes]) -> HttpResponse:
+    status, headers, content = entry
+    response = HttpResponse(content, status=status, headers=headers)
+    response.is_minified = True
+    return response
+
+
+def _compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content)
+    if encoding == "gzip":
+        return compress_string(
+            content, max_random_bytes=GZipMiddleware.max_random_bytes
+        )
+    return content
+
+
+def _get_page_cache_key(request, key_prefix: str, encoding: str) -> str:
+    url_hash = hashlib.md5(
+        request.build_absolute_uri().encode(), usedforsecurity=False
+    ).hexdigest()
+    return PAGE_CACHE_KEY.format(
+        key_prefix=key_prefix, url_hash=url_hash, encoding=encoding
+    )
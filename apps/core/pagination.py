@@ -0,0 +1,331 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from functools import cached_property
+from typing import Any, Callable, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import FloatField, Model, Q, QuerySet
+
+
+class RowCount(NamedTuple):
+    value: int
+    is_estimate: bool = False
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def count_rows(object_list: QuerySet | Sequence) -> RowCount:
+    if isinstance(object_list, QuerySet):
+        return RowCount(object_list.count())
+    return RowCount(len(object_list))
+
+
+def count_rows_cached(
+    queryset: QuerySet, timeout: int, estimate_above: Optional[int] = None
+) -> RowCount:
+    """Counts rows of the queryset and caches the count for `timeout`
+    seconds. If `estimate_above` is given, querysets that the Postgres
+    planner estimates to have more rows are not counted; the planner
+    estimate, derived from pg_class.reltuples and column statistics, is
+    used instead.
+    """
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql}:{params}".encode(), usedforsecurity=False)
+    cache_key = "row_count:" + digest.hexdigest()
+    cached_count = cache.get(cache_key)
+    if cached_count is not None:
+        return RowCount(*cached_count)
+
+    row_count = None
+    if estimate_above is not None:
+        estimated_rows = estimate_rows(queryset)
+        if estimated_rows > estimate_above:
+            row_count = RowCount(estimated_rows, is_estimate=True)
+    if row_count is None:
+        row_count = count_rows(queryset)
+    cache.set(cache_key, tuple(row_count), timeout)
+    return row_count
+
+
+def estimate_rows(queryset: QuerySet) -> int:
+    """Returns the number of rows of the queryset estimated by the
+    Postgres planner, without running the query."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountingPaginator(Paginator):
+    """Paginator that counts objects with the given function, e.g.
+    `count_rows_cached`, instead of running COUNT(*) on every page."""
+
+    def __init__(
+        self,
+        object_list: QuerySet,
+        per_page: int,
+        counter: Callable[[QuerySet], RowCount] = count_rows,
+        **kwargs,
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def row_count(self) -> RowCount:
+        return self.counter(self.object_list)
+
+    # Paginator.count is a cached_property as well, not a method
+    @cached_property
+    def count(self) -> int:  # pylint: disable=invalid-overridden-method
+        return self.row_count.value
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self.row_count.is_estimate
+
+
+class CachedIdList(Sequence):
+    """Objects of the queryset whose leading IDs and total count are
+    known in advance, e.g. from a cache. Slices within the known IDs are
+    fetched by primary key, with `get_objects` if given, and returned in
+    the order of the IDs; slices beyond them are fetched from the
+    queryset.
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        ids: Sequence[Any],
+        count: int,
+        get_objects: Optional[Callable[[list[Any]], dict[Any, Model]]] = None,
+    ):
+        self.queryset = queryset
+        self.ids = list(ids)
+        self._count = count
+        self.get_objects = get_objects or self._get_objects_from_queryset
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            index = range(self._count)[index]
+            return self[index : index + 1][0]
+
+        start, stop, step = index.indices(self._count)
+        if stop > len(self.ids):
+            return list(self.queryset[start:stop])[::step]
+
+        ids = self.ids[start:stop]
+        objects_by_id = self.get_objects(ids)
+        return [objects_by_id[pk] for pk in ids if pk in objects_by_id][::step]
+
+    def _get_objects_from_queryset(self, ids: list[Any]) -> dict[Any, Model]:
+        return {obj.pk: obj for obj in self.queryset.filter(pk__in=ids)}
+
+
+def get_keyset_ordering(queryset: QuerySet) -> Optional[tuple[str, ...]]:
+    """Returns the ordering of the queryset completed with the primary
+    key as the tie-breaker, if the queryset can be paginated by keyset:
+    every ordering term must be a concrete, exactly comparable field of
+    the model (not an annotation, e.g. a search rank, nor a float, whose
+    value does not survive the round trip through the cursor) and all
+    terms must have the same direction, so that a single composite index
+    can serve both directions. Returns None otherwise.
+    """
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    if not ordering or not all(isinstance(term, str) for term in ordering):
+        return None
+
+    names = [term.lstrip("-") for term in ordering]
+    if not all(_is_keyset_field(queryset.model, name) for name in names):
+        return None
+    directions = {term.startswith("-") for term in ordering}
+    if len(directions) != 1:
+        return None
+
+    prefix = "-" if directions.pop() else ""
+    pk_name = queryset.model._meta.pk.name
+    ordering = [
+        f"{prefix}{pk_name}" if name == "pk" else term
+        for name, term in zip(names, ordering)
+    ]
+    if f"{prefix}{pk_name}" not in ordering:
+        ordering.append(f"{prefix}{pk_name}")
+    return tuple(ordering)
+
+
+def _is_keyset_field(model: type[Model], name: str) -> bool:
+    if name == "pk":
+        return True
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return (
+        field.concrete and not field.is_relation and not isinstance(field, FloatField)
+    )
+
+
+class KeysetPage(Sequence):
+    def __init__(
+        self,
+        object_list: list[Model],
+        paginator: "KeysetPaginator",
+        has_next: bool,
+        has_previous: bool,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<Keyset page of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], backwards=False)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], backwards=True)
+
+
+class KeysetPaginator:
+    """Paginates the queryset by the values of its ordering keys rather
+    than by offsets. A page is fetched as the `per_page` rows following
+    (or preceding) the row the cursor points at, so it costs the same
+    at any depth when the ordering is backed by an index. Pages are not
+    numbered; they link to each other with opaque cursors.
+    """
+
+    is_keyset = True
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        ordering: Sequence[str],
+        counter: Callable[[QuerySet], RowCount] = count_rows,
+    ):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.counter = counter
+
+    @cached_property
+    def row_count(self) -> RowCount:
+        return self.counter(self.queryset)
+
+    # Paginator.count is a cached_property as well, not a method
+    @cached_property
+    def count(self) -> int:  # pylint: disable=invalid-overridden-method
+        return self.row_count.value
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self.row_count.is_estimate
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        backwards, values = self.decode_cursor(cursor) if cursor else (False, None)
+        ordering = self._reverse(self.ordering) if backwards else self.ordering
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._build_keyset_filter(ordering, values))
+
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+        if backwards:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_next=True, has_previous=has_more)
+        return KeysetPage(
+            object_list, self, has_next=has_more, has_previous=values is not None
+        )
+
+    def encode_cursor(self, obj: Model, backwards: bool) -> str:
+        values = [getattr(obj, term.lstrip("-")) for term in self.ordering]
+        payload = json.dumps(
+            [self.ordering, backwards, values], default=_serialize_cursor_value
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[bool, list[Any]]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            ordering, backwards, values = json.loads(payload)
+            if tuple(ordering) != self.ordering or len(values) != len(ordering):
+                raise InvalidCursor("The cursor belongs to another ordering")
+            values = [
+                self._to_python(term.lstrip("-"), value)
+                for term, value in zip(ordering, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+        return bool(backwards), values
+
+    def _to_python(self, name: str, value: Any) -> Any:
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    @staticmethod
+    def _reverse(ordering: Sequence[str]) -> tuple[str, ...]:
+        return tuple(
+            term[1:] if term.startswith("-") else f"-{term}" for term in ordering
+        )
+
+    @staticmethod
+    def _build_keyset_filter(ordering: Sequence[str], values: Sequence[Any]) -> Q:
+        """Builds the condition for rows that follow the values in the
+        ordering: (k1, k2, ...) > (v1, v2, ...) lexicographically. The
+        leading k1 >= v1 term lets Postgres use it as an index bound.
+        """
+        names = [term.lstrip("-") for term in ordering]
+        lookup = "lt" if ordering[0].startswith("-") else "gt"
+        condition = Q(**{f"{names[-1]}__{lookup}": values[-1]})
+        for name, value in zip(reversed(names[:-1]), reversed(values[:-1])):
+            condition = Q(**{f"{name}__{lookup}": value}) | (
+                Q(**{name: value}) & condition
+            )
+        return Q(**{f"{names[0]}__{lookup}e": values[0]}) & condition
+
+
+def _serialize_cursor_value(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot use {type(value).__name__} in a cursor")
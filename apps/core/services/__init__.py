@@ -1 +1,2 @@
+from .edge_cache import *
 from .email import *
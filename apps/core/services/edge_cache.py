@@ -0,0 +1,43 @@
+import logging
+from typing import Iterable
+
+import requests
+
+from ..settings import EDGE_CACHE_REFRESH_TIMEOUT, EDGE_CACHE_URL
+
+
+logger = logging.getLogger(__name__)
+
+
+# The cache keeps compressed and uncompressed copies of pages apart
+EDGE_CACHE_ENCODINGS = ("gzip", "identity")
+
+
+def refresh_edge_cached_pages(paths: Iterable[str]) -> None:
+    """Requests the pages through the shared cache in front of the app,
+    in every encoding the cache keeps copies in, so that the cache
+    replaces its copies of them. Does nothing if the cache is not
+    configured.
+    """
+    if not EDGE_CACHE_URL:
+        return
+
+    for path in dict.fromkeys(paths):
+        for encoding in EDGE_CACHE_ENCODINGS:
+            try:
+                response = requests.get(
+                    f"{EDGE_CACHE_URL.rstrip('/')}{path}",
+                    headers={"Accept-Encoding": encoding},
+                    timeout=EDGE_CACHE_REFRESH_TIMEOUT,
+                    allow_redirects=False,
+                )
+            except requests.RequestException:
+                logger.exception("Failed to refresh the edge-cached page %s", path)
+                break
+            if response.status_code >= 500:
+                logger.error(
+                    "Failed to refresh the edge-cached page %s: status %s",
+                    path,
+                    response.status_code,
+                )
+                break
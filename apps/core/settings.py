@@ -21,3 +21,15 @@ EMAIL_TRANSIENT_ERRORS = (
     socket.gaierror,
     SMTPException,
 )
+
+# Max time (in seconds) during which cache hits and misses counted by a process
+# are not yet added to the shared cache metrics.
+CACHE_METRICS_FLUSH_INTERVAL = int(os.getenv("CACHE_METRICS_FLUSH_INTERVAL", "10"))
+
+# Base URL of the shared HTTP cache in front of the app through which
+# edge-cached pages are refreshed when their content changes (e.g. the internal
+# "http://nginx:8080" server of the nginx config, which always fetches pages
+# from the app and stores them in place of the cached ones). Pages are not
+# refreshed if it is empty.
+EDGE_CACHE_URL = os.getenv("EDGE_CACHE_URL", "")
+EDGE_CACHE_REFRESH_TIMEOUT = int(os.getenv("EDGE_CACHE_REFRESH_TIMEOUT", "10"))
@@ -4,6 +4,7 @@ from celery import Task
 
 from config.celery import app
 
+from .services.edge_cache import refresh_edge_cached_pages
 from .services.email import EmailConfig, EmailConfigDict, mask_email, send_email
 from .settings import (
     EMAIL_PERMANENT_ERRORS,
@@ -84,3 +85,8 @@ def _handle_transient_error(
             masked_recipients,
         )
         raise error
+
+
+@app.task
+def refresh_edge_cached_pages_task(paths: list[str]) -> None:
+    refresh_edge_cached_pages(paths)
@@ -0,0 +1,108 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.cache import (
+    SCOPE_VERSION_KEY,
+    VersionedObjectCache,
+    flush_cache_metrics,
+    get_cache_metrics,
+    get_or_set_versioned,
+    get_scope_version_digests,
+    get_scope_versions,
+    get_versioned,
+    invalidate_scopes,
+    record_cache_access,
+    set_versioned,
+)
+from users.models import User
+
+
+class TestVersionedCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        flush_cache_metrics()
+        cache.clear()
+
+    def test_scope_versions(self):
+        versions = get_scope_versions(["a", "b"])
+        self.assertEqual(get_scope_versions(["b", "a"]), versions)
+
+        invalidate_scopes(["a"])
+        new_versions = get_scope_versions(["a", "b"])
+        self.assertNotEqual(new_versions["a"], versions["a"])
+        self.assertEqual(new_versions["b"], versions["b"])
+
+        cache.delete(SCOPE_VERSION_KEY.format(scope="b"))
+        self.assertNotEqual(get_scope_versions(["b"])["b"], versions["b"])
+
+    def test_scope_version_digests(self):
+        digests = get_scope_version_digests({1: ["a", "b"], 2: ["b"]})
+        self.assertEqual(get_scope_version_digests({1: ["b", "a"]})[1], digests[1])
+
+        invalidate_scopes(["a"])
+        new_digests = get_scope_version_digests({1: ["a", "b"], 2: ["b"]})
+        self.assertNotEqual(new_digests[1], digests[1])
+        self.assertEqual(new_digests[2], digests[2])
+
+    def test_get_or_set_versioned(self):
+        default = Mock(side_effect=[1, 2])
+        self.assertEqual(get_or_set_versioned("test", "k", ["a"], default, 60), 1)
+        self.assertEqual(get_or_set_versioned("test", "k", ["a"], default, 60), 1)
+        self.assertEqual(default.call_count, 1)
+
+        invalidate_scopes(["a"])
+        self.assertEqual(get_or_set_versioned("test", "k", ["a"], default, 60), 2)
+        self.assertEqual(
+            get_cache_metrics()["test"], {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+        )
+
+    def test_get_and_set_versioned(self):
+        self.assertIsNone(get_versioned("test", "k"))
+        set_versioned("test", "k", 1, get_scope_versions(["a", "b"]), 60)
+        self.assertEqual(get_versioned("test", "k"), 1)
+
+        invalidate_scopes(["b"])
+        self.assertIsNone(get_versioned("test", "k"))
+        self.assertEqual(
+            get_cache_metrics()["test"], {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+        )
+
+    def test_versioned_object_cache(self):
+        users = [
+            User.objects.create_user(username=f"user{i}", email=f"{i}@test.com")
+            for i in range(3)
+        ]
+        fetch = Mock(side_effect=lambda ids: User.objects.filter(id__in=ids))
+        user_cache = VersionedObjectCache(
+            "user",
+            fetch=fetch,
+            get_dependencies=lambda user: [f"group:{user.id % 2}"],
+            timeout=60,
+        )
+        ids = [user.id for user in users]
+
+        self.assertEqual(set(user_cache.get_many([*ids, 0])), set(ids))
+        fetch.assert_called_once_with([*ids, 0])
+        fetch.reset_mock()
+        self.assertEqual(user_cache.get(ids[0]), users[0])
+        fetch.assert_not_called()
+
+        user_cache.invalidate([ids[0]])
+        invalidate_scopes([f"group:{ids[1] % 2}"])
+        user_cache.get_many(ids)
+        fetch.assert_called_once_with(
+            [i for i in ids if i == ids[0] or i % 2 == ids[1] % 2]
+        )
+
+    @patch("core.cache.CACHE_METRICS_FLUSH_INTERVAL", 3600)
+    def test_cache_metrics_flushed_periodically(self):
+        record_cache_access("test", hits=3, misses=1)
+        self.assertIsNone(cache.get("cache:metrics:test:hits"))
+
+        self.assertEqual(
+            get_cache_metrics(), {"test": {"hits": 3, "misses": 1, "hit_rate": 0.75}}
+        )
+        record_cache_access("test", hits=1)
+        self.assertEqual(get_cache_metrics()["test"]["hits"], 4)
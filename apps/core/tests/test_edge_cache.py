@@ -0,0 +1,82 @@
+from unittest.mock import call, patch
+
+import requests
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from core.decorators import edge_cache_page
+from core.middleware import get_default_timezone
+from core.services.edge_cache import refresh_edge_cached_pages
+from users.models import User
+
+
+class TestEdgeCachePage(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.create_user(username="user", email="u@t.com")
+
+    def test_page_rendered_for_anonymous_user(self):
+        @edge_cache_page(60)
+        def view(request):
+            return HttpResponse(
+                f"{request.user.is_authenticated} {timezone.get_current_timezone()}"
+            )
+
+        with timezone.override("Asia/Tokyo"):
+            response = view(self.request)
+        self.assertEqual(response.content.decode(), f"False {get_default_timezone()}")
+        self.assertEqual(response["Cache-Control"], "public, max-age=0, s-maxage=60")
+        self.assertEqual(response["X-Accel-Expires"], "60")
+
+    def test_response_with_cookies_not_cached(self):
+        @edge_cache_page(60)
+        def view(request):
+            response = HttpResponse()
+            response.set_cookie("key", "value")
+            return response
+
+        response = view(self.request)
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertNotIn("X-Accel-Expires", response)
+
+
+class TestRefreshEdgeCachedPages(TestCase):
+    @patch("core.services.edge_cache.EDGE_CACHE_URL", "http://nginx:8080/")
+    @patch("core.services.edge_cache.requests.get")
+    def test_refresh_edge_cached_pages(self, mock_get):
+        mock_get.return_value.status_code = 200
+        refresh_edge_cached_pages(["/a", "/b", "/a"])
+        self.assertEqual(
+            [(c.args[0], c.kwargs["headers"]) for c in mock_get.call_args_list],
+            [
+                ("http://nginx:8080/a", {"Accept-Encoding": "gzip"}),
+                ("http://nginx:8080/a", {"Accept-Encoding": "identity"}),
+                ("http://nginx:8080/b", {"Accept-Encoding": "gzip"}),
+                ("http://nginx:8080/b", {"Accept-Encoding": "identity"}),
+            ],
+        )
+
+    @patch("core.services.edge_cache.EDGE_CACHE_URL", "http://nginx:8080")
+    @patch("core.services.edge_cache.requests.get")
+    def test_failed_refresh(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.side_effect = [requests.ConnectionError] + [mock_get.return_value] * 2
+        with self.assertLogs("core.services.edge_cache", "ERROR"):
+            refresh_edge_cached_pages(["/a", "/b"])
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(
+            mock_get.call_args_list[1],
+            call(
+                "http://nginx:8080/b",
+                headers={"Accept-Encoding": "gzip"},
+                timeout=10,
+                allow_redirects=False,
+            ),
+        )
+
+    @patch("core.services.edge_cache.EDGE_CACHE_URL", "")
+    @patch("core.services.edge_cache.requests.get")
+    def test_not_configured(self, mock_get):
+        refresh_edge_cached_pages(["/a"])
+        mock_get.assert_not_called()
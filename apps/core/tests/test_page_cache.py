@@ -0,0 +1,74 @@
+import gzip
+from unittest.mock import Mock
+
+import minify_html
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from core.decorators import cache_page_for_anonymous
+from core.middleware import MinifyHtmlMiddleware
+from core.page_cache import get_page_encoding
+from users.models import User
+
+
+PAGE = "<div>  <b>page</b>  </div>"
+MINIFIED_PAGE = minify_html.minify(  # pylint: disable=no-member
+    PAGE, **MinifyHtmlMiddleware.minify_args
+).encode()
+
+
+class TestCachePageForAnonymous(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = Mock(
+            side_effect=lambda request: HttpResponse(PAGE, content_type="text/html")
+        )
+        self.cached_view = cache_page_for_anonymous(60)(self.view)
+
+    def get(self, accept_encoding: str = "", user=None) -> HttpResponse:
+        request = self.factory.get(
+            "/page", headers={"accept-encoding": accept_encoding}
+        )
+        request.user = user or AnonymousUser()
+        return MinifyHtmlMiddleware(self.cached_view)(request)
+
+    def test_page_cached_minified_and_compressed(self):
+        response = self.get("gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), MINIFIED_PAGE)
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        response = self.get()
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, MINIFIED_PAGE)
+        self.assertEqual(response["Content-Length"], str(len(MINIFIED_PAGE)))
+        self.assertNotEqual(MINIFIED_PAGE, PAGE.encode())
+        self.view.assert_called_once()
+
+    def test_page_not_cached_for_authenticated_user(self):
+        user = User.objects.create_user(username="user", email="user@test.com")
+        self.get(user=user)
+        self.get(user=user)
+        self.assertEqual(self.view.call_count, 2)
+
+    def test_pages_cached_by_key_prefix(self):
+        request = self.factory.get("/page")
+        request.user = AnonymousUser()
+        cache_page_for_anonymous(60, key_prefix="v1")(self.view)(request)
+        self.get()
+        self.assertEqual(self.view.call_count, 2)
+
+    def test_page_encoding(self):
+        for accept_encoding, encoding in (
+            ("gzip, deflate", "gzip"),
+            ("deflate", "identity"),
+            ("", "identity"),
+        ):
+            request = self.factory.get(
+                "/", headers={"accept-encoding": accept_encoding}
+            )
+            self.assertEqual(get_page_encoding(request), encoding)
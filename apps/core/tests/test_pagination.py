@@ -0,0 +1,150 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Value
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.pagination import (
+    CachedIdList,
+    CountingPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+    RowCount,
+    count_rows_cached,
+    estimate_rows,
+    get_keyset_ordering,
+)
+from users.models import User
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.users = []
+        # Users 2 and 3 joined at the same time, so their tie is broken by ID
+        for i, days in enumerate([0, 1, 2, 2, 4, 5, 6]):
+            user = User.objects.create_user(username=f"user{i}", email=f"{i}@test.com")
+            user.date_joined = now - timedelta(days=days)
+            user.save(update_fields=["date_joined"])
+            self.users.append(user)
+        self.queryset = User.objects.order_by("-date_joined")
+        self.ordering = get_keyset_ordering(self.queryset)
+        self.expected = list(User.objects.order_by("-date_joined", "-id"))
+
+    def test_get_keyset_ordering(self):
+        self.assertEqual(self.ordering, ("-date_joined", "-id"))
+        self.assertEqual(
+            get_keyset_ordering(User.objects.order_by("username", "pk")),
+            ("username", "id"),
+        )
+        self.assertIsNone(get_keyset_ordering(User.objects.order_by("username", "-id")))
+        self.assertIsNone(get_keyset_ordering(User.objects.order_by("profile__id")))
+        self.assertIsNone(get_keyset_ordering(User.objects.order_by(F("username"))))
+        self.assertIsNone(get_keyset_ordering(User.objects.order_by("?")))
+        self.assertIsNone(
+            get_keyset_ordering(
+                User.objects.annotate(rank=Value(0.5)).order_by("-rank", "-id")
+            )
+        )
+        self.assertIsNone(get_keyset_ordering(User.objects.order_by("groups")))
+
+    def test_pages_forward_and_backward(self):
+        paginator = KeysetPaginator(self.queryset, 3, self.ordering)
+
+        page1 = paginator.page()
+        self.assertEqual(list(page1), self.expected[:3])
+        self.assertTrue(page1.has_next())
+        self.assertFalse(page1.has_previous())
+        self.assertIsNone(page1.previous_cursor)
+
+        page2 = paginator.page(page1.next_cursor)
+        self.assertEqual(list(page2), self.expected[3:6])
+        self.assertTrue(page2.has_previous())
+
+        page3 = paginator.page(page2.next_cursor)
+        self.assertEqual(list(page3), self.expected[6:])
+        self.assertFalse(page3.has_next())
+        self.assertIsNone(page3.next_cursor)
+
+        back_page2 = paginator.page(page3.previous_cursor)
+        self.assertEqual(list(back_page2), self.expected[3:6])
+        self.assertTrue(back_page2.has_next())
+        self.assertTrue(back_page2.has_previous())
+
+        back_page1 = paginator.page(back_page2.previous_cursor)
+        self.assertEqual(list(back_page1), self.expected[:3])
+        self.assertFalse(back_page1.has_previous())
+
+    def test_page_query_does_not_depend_on_depth(self):
+        paginator = KeysetPaginator(self.queryset, 3, self.ordering)
+        cursor = paginator.page().next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("OFFSET", queries[0]["sql"])
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(self.queryset, 3, self.ordering)
+        for cursor in ("abc", "!!!", "W10", "WyJ4Il0"):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+        other_paginator = KeysetPaginator(
+            User.objects.order_by("username"), 3, ("username", "id")
+        )
+        with self.assertRaises(InvalidCursor):
+            paginator.page(other_paginator.page().next_cursor)
+
+    def test_count_rows_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(count_rows_cached(self.queryset, 60), RowCount(7))
+        with self.assertNumQueries(0):
+            self.assertEqual(count_rows_cached(self.queryset, 60), RowCount(7))
+
+    def test_count_rows_estimated(self):
+        self.assertIsInstance(estimate_rows(self.queryset), int)
+
+        with patch("core.pagination.estimate_rows", return_value=5000):
+            row_count = count_rows_cached(self.queryset, 60, estimate_above=1000)
+        self.assertEqual(row_count, RowCount(5000, is_estimate=True))
+
+        queryset = self.queryset.filter(username__startswith="user")
+        with patch("core.pagination.estimate_rows", return_value=10):
+            row_count = count_rows_cached(queryset, 60, estimate_above=1000)
+        self.assertEqual(row_count, RowCount(7))
+
+    def test_counting_paginator(self):
+        paginator = CountingPaginator(
+            self.queryset, 3, counter=lambda queryset: RowCount(100, True)
+        )
+        self.assertEqual(paginator.count, 100)
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(paginator.num_pages, 34)
+
+    def test_cached_id_list(self):
+        # The cached IDs are in reverse, to tell their order from the queryset's
+        ids = [user.id for user in reversed(self.expected[:4])]
+        queryset = User.objects.order_by("-date_joined", "-id")
+        results = CachedIdList(queryset, ids, count=7)
+        paginator = CountingPaginator(results, 3)
+        self.assertEqual(paginator.count, 7)
+        self.assertEqual(paginator.num_pages, 3)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(list(paginator.page(1)), self.expected[3:0:-1])
+        # Pages beyond the cached IDs are fetched from the queryset
+        self.assertEqual(list(paginator.page(2)), self.expected[3:6])
+        self.assertEqual(list(paginator.page(3)), self.expected[6:])
+        self.assertEqual(results[0], self.expected[3])
+        self.assertEqual(results[-1], self.expected[6])
+        with self.assertRaises(IndexError):
+            results[7]
+
+        # Objects that no longer match the queryset are skipped
+        self.expected[2].delete()
+        self.assertEqual(list(paginator.page(1)), [self.expected[3], self.expected[1]])
@@ -0,0 +1,22 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Model, Q, QuerySet
+from django.db.models.functions import Upper
+
+
+def filter_by_prefix_or_similarity(
+    queryset: QuerySet[Model], field_name: str, prefix: str
+) -> QuerySet[Model]:
+    """Filters the queryset to the rows whose `field_name` either starts
+    with the prefix (case-insensitively) or contains a word similar to
+    it, most similar rows first. Both predicates can be served by a GIN
+    trigram index on UPPER(`field_name`).
+    """
+    return (
+        queryset.alias(upper_value=Upper(field_name))
+        .filter(
+            Q(upper_value__startswith=prefix.upper())
+            | Q(upper_value__trigram_word_similar=prefix)
+        )
+        .annotate(similarity=TrigramWordSimilarity(prefix, "upper_value"))
+        .order_by("-similarity", "upper_value")
+    )
@@ -1,10 +1,15 @@
 from django.contrib import admin
 
-from .models import Notification
+from .models import AuthorEvent, Notification
 
 
 class NotificationAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at",)
 
 
+class AuthorEventAdmin(admin.ModelAdmin):
+    readonly_fields = ("created_at",)
+
+
 admin.site.register(Notification, NotificationAdmin)
+admin.site.register(AuthorEvent, AuthorEventAdmin)
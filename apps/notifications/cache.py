@@ -0,0 +1,200 @@
+from typing import Optional
+
+from django.core.cache import cache
+
+from users.models import User
+
+from .models import Notification
+from .settings import (
+    AUTHOR_EVENTS_SETTLE_TIME,
+    AUTHOR_EVENTS_WATERMARK_CACHE_TIMEOUT,
+    NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT,
+    UNREAD_NOTIFICATIONS_COUNT_CACHE_TIMEOUT,
+)
+
+
+NEW_ARTICLE_NOTIFICATIONS_PROGRESS_KEY = (
+    "notifications:new_article:{article_id}:{counter}"
+)
+NEW_ARTICLE_NOTIFICATIONS_CHUNK_KEY = (
+    "notifications:new_article:{article_id}:chunk:{after_id}"
+)
+NEW_ARTICLE_NOTIFICATIONS_COUNTERS = ("chunks", "done_chunks", "notified")
+
+LATEST_AUTHOR_EVENT_ID_KEY = "notifications:author_events:latest_id"
+# Bounds how long an ID read just before a later event was published may stay
+# cached
+LATEST_AUTHOR_EVENT_ID_TIMEOUT = 60
+AUTHOR_EVENTS_WATERMARK_KEY = "notifications:author_events:watermark:{user_id}"
+AUTHOR_EVENTS_CHECKED_KEY = "notifications:author_events:checked:{user_id}"
+
+
+def get_cached_unread_notifications_count(user: User) -> int:
+    """Returns the number of unread notifications of the user from the
+    cached counter, counting them in the database if the counter is not
+    cached yet.
+    """
+    cache_key = get_unread_notifications_count_cache_key(user.id)
+    count = cache.get(cache_key)
+    if count is None:
+        count = Notification.objects.filter(
+            recipient=user, status=Notification.Status.UNREAD
+        ).count()
+        # A counter cached meanwhile is already adjusted, so it is kept
+        cache.add(cache_key, count, timeout=UNREAD_NOTIFICATIONS_COUNT_CACHE_TIMEOUT)
+    return max(int(count), 0)
+
+
+def adjust_unread_notifications_count(user_id: int, delta: int) -> Optional[int]:
+    """Atomically adds the delta to the cached counter of unread
+    notifications of the user and returns the new count. Counters that
+    are not cached are left to be counted when next read, and None is
+    returned.
+    """
+    try:
+        return max(
+            cache.incr(get_unread_notifications_count_cache_key(user_id), delta), 0
+        )
+    except ValueError:
+        return None
+
+
+def get_cached_unread_notifications_counts(user_ids: list[int]) -> dict[int, int]:
+    """Returns the cached counters of unread notifications of the users
+    whose counters are cached."""
+    cached_counts = cache.get_many(
+        [get_unread_notifications_count_cache_key(user_id) for user_id in user_ids]
+    )
+    return {
+        user_id: int(cached_counts[key])
+        for user_id in user_ids
+        if (key := get_unread_notifications_count_cache_key(user_id)) in cached_counts
+    }
+
+
+def get_unread_notifications_count_cache_key(user_id: int) -> str:
+    return f"notifications:unread_count:{user_id}"
+
+
+def start_new_article_notifications_progress(
+    article_id: int, chunk_after_ids: list[int]
+) -> None:
+    """Starts tracking the progress of notifying the subscribers about
+    the article in the chunks following the given IDs. The progress of
+    a resumed fan-out is kept, and counters that have expired meanwhile
+    are restored from the chunks marked as done."""
+    cache.set(
+        _get_progress_key(article_id, "chunks"),
+        len(chunk_after_ids),
+        timeout=NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT,
+    )
+    done_chunks = cache.get_many(
+        [_get_chunk_key(article_id, after_id) for after_id in chunk_after_ids]
+    )
+    for counter, value in (
+        ("done_chunks", len(done_chunks)),
+        ("notified", sum(int(notified) for notified in done_chunks.values())),
+    ):
+        cache.add(
+            _get_progress_key(article_id, counter),
+            value,
+            timeout=NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT,
+        )
+
+
+def is_new_article_notifications_chunk_done(article_id: int, after_id: int) -> bool:
+    return cache.get(_get_chunk_key(article_id, after_id)) is not None
+
+
+def complete_new_article_notifications_chunk(
+    article_id: int, after_id: int, notified: int
+) -> None:
+    """Marks the chunk of subscribers following `after_id` as notified
+    about the article and adds it to the progress. A chunk completed by
+    a retried task is counted once. The chunk keeps the number of
+    subscribers it notified, so that the progress can be restored."""
+    chunk_key = _get_chunk_key(article_id, after_id)
+    if not cache.add(
+        chunk_key, notified, timeout=NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT
+    ):
+        return
+    for counter, delta in (("done_chunks", 1), ("notified", notified)):
+        try:
+            cache.incr(_get_progress_key(article_id, counter), delta)
+        except ValueError:
+            pass
+
+
+def get_new_article_notifications_progress(
+    article_id: int,
+) -> Optional[dict[str, int]]:
+    """Returns the number of chunks of subscribers to notify about the
+    article, the number of chunks done and the number of subscribers
+    notified, or None if the progress is not tracked."""
+    keys = {
+        _get_progress_key(article_id, counter): counter
+        for counter in NEW_ARTICLE_NOTIFICATIONS_COUNTERS
+    }
+    counters = cache.get_many(keys)
+    if len(counters) < len(keys):
+        return None
+    return {keys[key]: int(value) for key, value in counters.items()}
+
+
+def _get_progress_key(article_id: int, counter: str) -> str:
+    return NEW_ARTICLE_NOTIFICATIONS_PROGRESS_KEY.format(
+        article_id=article_id, counter=counter
+    )
+
+
+def _get_chunk_key(article_id: int, after_id: int) -> str:
+    return NEW_ARTICLE_NOTIFICATIONS_CHUNK_KEY.format(
+        article_id=article_id, after_id=after_id
+    )
+
+
+def get_cached_author_events_state(
+    user_id: int,
+) -> tuple[Optional[int], Optional[int], Optional[int]]:
+    """Returns the cached ID of the latest author event, the cached
+    watermark of the user and the cached ID of the latest event the user
+    was checked for, any of them None if not cached."""
+    watermark_key = AUTHOR_EVENTS_WATERMARK_KEY.format(user_id=user_id)
+    checked_key = AUTHOR_EVENTS_CHECKED_KEY.format(user_id=user_id)
+    cached = cache.get_many([LATEST_AUTHOR_EVENT_ID_KEY, watermark_key, checked_key])
+    return (
+        cached.get(LATEST_AUTHOR_EVENT_ID_KEY),
+        cached.get(watermark_key),
+        cached.get(checked_key),
+    )
+
+
+def cache_latest_author_event_id(event_id: int) -> None:
+    cache.set(
+        LATEST_AUTHOR_EVENT_ID_KEY, event_id, timeout=LATEST_AUTHOR_EVENT_ID_TIMEOUT
+    )
+
+
+def invalidate_latest_author_event_id() -> None:
+    """Drops the cached ID of the latest author event. Unlike setting it,
+    this cannot replace the ID of a later event published meanwhile."""
+    cache.delete(LATEST_AUTHOR_EVENT_ID_KEY)
+
+
+def cache_author_events_watermark(user_id: int, event_id: int) -> None:
+    cache.set(
+        AUTHOR_EVENTS_WATERMARK_KEY.format(user_id=user_id),
+        event_id,
+        timeout=AUTHOR_EVENTS_WATERMARK_CACHE_TIMEOUT,
+    )
+
+
+def cache_author_events_checked_id(user_id: int, event_id: int) -> None:
+    """Caches the ID of the latest event the user was checked for until
+    the events up to it settle, so that an event with a lower ID committed
+    later is still found then."""
+    cache.set(
+        AUTHOR_EVENTS_CHECKED_KEY.format(user_id=user_id),
+        event_id,
+        timeout=AUTHOR_EVENTS_SETTLE_TIME,
+    )
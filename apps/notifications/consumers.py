@@ -1,22 +1,35 @@
 import json
+from typing import Any
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
 
+# Group of the connections of the subscribers of an author who publishes
+# author events, to which the events are sent
+AUTHOR_EVENTS_GROUP = "author-events-{author_id}"
+
+
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self) -> None:
         self.user = self.scope["user"]
 
         if self.user.is_authenticated:
             self.group = self.user.username
-            await self.channel_layer.group_add(self.group, self.channel_name)
+            self.author_groups = [
+                AUTHOR_EVENTS_GROUP.format(author_id=author_id)
+                for author_id in await self._find_notified_authors()
+            ]
+            for group in (self.group, *self.author_groups):
+                await self.channel_layer.group_add(group, self.channel_name)
             await self.accept()
         else:
             await self.close()
 
     async def disconnect(self, code) -> None:
         if self.user.is_authenticated:
-            await self.channel_layer.group_discard(self.group, self.channel_name)
+            for group in (self.group, *self.author_groups):
+                await self.channel_layer.group_discard(group, self.channel_name)
 
     async def send_notification(self, event) -> None:
         await self.send(
@@ -30,3 +43,31 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 }
             )
         )
+
+    async def send_author_event(self, event) -> None:
+        """Sends the user's notifications about the author event, which
+        are created once the first connection of the user receives it."""
+        for notification in await self._get_author_event_notifications(event["id"]):
+            await self.send_notification(notification)
+
+    async def send_unread_notifications_count(self, event) -> None:
+        await self.send(
+            text_data=json.dumps(
+                {"type": "unreadNotificationsCount", "count": event["count"]}
+            )
+        )
+
+    @database_sync_to_async
+    def _find_notified_authors(self) -> list[int]:
+        from .services import find_notified_author_ids
+
+        return find_notified_author_ids(self.user)
+
+    @database_sync_to_async
+    def _get_author_event_notifications(self, event_id: int) -> list[dict[str, Any]]:
+        from .services import get_author_event_notifications, serialize_notification
+
+        return [
+            serialize_notification(n)
+            for n in get_author_event_notifications(self.user, event_id)
+        ]
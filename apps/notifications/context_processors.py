@@ -1,15 +1,14 @@
-from .services import (
-    find_notifications_by_user,
-    get_unread_notifications_count_by_user,
-)
+from .cache import get_cached_unread_notifications_count
+from .services import get_notifications_page
 
 
 def include_user_notifications(request):
     if request.user.is_authenticated:
-        notifications = find_notifications_by_user(request.user.id)
-        notifications_count = get_unread_notifications_count_by_user(request.user)
+        notifications_page = get_notifications_page(request.user)
+        notifications_count = get_cached_unread_notifications_count(request.user)
         return {
-            "notifications": notifications,
+            "notifications": notifications_page.object_list,
+            "notifications_next_cursor": notifications_page.next_cursor,
             "notifications_count": notifications_count,
         }
     return {}
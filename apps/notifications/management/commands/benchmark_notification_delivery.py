@@ -0,0 +1,65 @@
+import logging
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import User
+
+from ...models import Notification
+from ...services import _send_notification, _send_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of delivering notifications via the channel "
+        "layer with a group_send bridged to the event loop per notification "
+        "and with a batch sent from a single event loop. The notifications are "
+        "sent to groups without subscribers and are not stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--notifications",
+            type=int,
+            default=1000,
+            help="Number of notifications to deliver with each approach.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["notifications"]
+        prefix = f"benchmark-{uuid.uuid4().hex}"
+        notifications = [
+            Notification(
+                id=i,
+                type=Notification.Type.NEW_ARTICLE,
+                title="New Article",
+                message="New article",
+                link="/articles/benchmark",
+                recipient=User(username=f"{prefix}-{i}"),
+                created_at=timezone.now(),
+            )
+            for i in range(count)
+        ]
+
+        def send_one_by_one() -> None:
+            for notification in notifications:
+                _send_notification(notification, notification.recipient.username)
+
+        def send_batch() -> None:
+            _send_notifications(notifications)
+
+        # Per-notification logs would dominate the measurements
+        logging.getLogger("notifications.services").disabled = True
+        for name, send in (
+            ("group_send per notification", send_one_by_one),
+            ("Batched group_send", send_batch),
+        ):
+            started_at = time.perf_counter()
+            send()
+            elapsed = time.perf_counter() - started_at
+            self.stdout.write(
+                f"{name}: {count / elapsed:.0f} notifications/s "
+                f"({count} notifications in {elapsed:.2f} s)"
+            )
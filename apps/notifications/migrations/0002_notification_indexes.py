@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-17 00:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "status", "created_at"],
+                name="notification_recipient_status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "created_at", "id"],
+                name="notification_recipient_feed",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="recipient",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="received_notifications",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
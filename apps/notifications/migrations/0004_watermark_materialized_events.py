@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:04
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_author_events"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationwatermark",
+            name="materialized_author_event_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), blank=True, default=list, size=None
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.utils import timezone
 
 from users.models import User
 
@@ -28,14 +30,71 @@ class Notification(models.Model):
         blank=True,
         related_name="received_notifications",
         on_delete=models.CASCADE,
+        # Covered by the indexes below
+        db_index=False,
     )
     status = models.CharField(
         max_length=255, blank=True, choices=Status, default=Status.UNREAD
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    author_event = models.ForeignKey(
+        "AuthorEvent",
+        null=True,
+        blank=True,
+        related_name="notifications",
+        on_delete=models.SET_NULL,
+    )
+    # Notifications about author events are created at the time of the event
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Counts of unread notifications of a user
+            models.Index(
+                fields=["recipient", "status", "created_at"],
+                name="notification_recipient_status",
+            ),
+            # Keyset pagination of the notification list of a user
+            models.Index(
+                fields=["recipient", "created_at", "id"],
+                name="notification_recipient_feed",
+            ),
+        ]
 
     def __str__(self):
         created_at = self.created_at.strftime("%H:%M:%S %d-%m-%Y")
         sender = self.sender.username if self.sender else "System"
         recipient = self.recipient.username
         return f"{created_at} [{self.type}] from {sender} to {recipient}: {self.link}"
+
+
+class AuthorEvent(models.Model):
+    """An event of an author with many subscribers, such as a new article,
+    stored once rather than as a notification per subscriber. Subscribers
+    get their notifications about it when they next read them."""
+
+    type = models.CharField(max_length=255, choices=Notification.Type)
+    title = models.CharField(max_length=255, blank=True)
+    message = models.CharField(max_length=500, blank=True)
+    link = models.URLField(max_length=500, blank=True)
+    author = models.ForeignKey(
+        User, related_name="author_events", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        created_at = self.created_at.strftime("%H:%M:%S %d-%m-%Y")
+        return f"{created_at} [{self.type}] from {self.author.username}: {self.link}"
+
+
+class NotificationWatermark(models.Model):
+    """The author event up to which all events were turned into
+    notifications of the user, and the later events that already were."""
+
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE)
+    last_author_event_id = models.BigIntegerField(default=0)
+    materialized_author_event_ids = ArrayField(
+        models.BigIntegerField(), default=list, blank=True
+    )
+
+    def __str__(self):
+        return f"{self.user.username}: {self.last_author_event_id}"
@@ -1,18 +1,55 @@
+import asyncio
 import logging
-from typing import Any, Iterable
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Iterable, Optional
 
 from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from celery import group
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers, get_channel_layer
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import Count, F, Max
 from django.db.models.query import QuerySet
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
 
 from articles.models import Article, ArticleComment
 from config.settings import DOMAIN_NAME, SCHEME
-from users.models import User
+from core.pagination import KeysetPage, KeysetPaginator
+from users.cache import get_cached_subscribers_count, get_cached_subscribers_counts
+from users.models import AuthorSubscription, User
 
-from .models import Notification
+from .cache import (
+    adjust_unread_notifications_count,
+    cache_author_events_checked_id,
+    cache_author_events_watermark,
+    cache_latest_author_event_id,
+    complete_new_article_notifications_chunk,
+    get_cached_author_events_state,
+    get_cached_unread_notifications_count,
+    get_cached_unread_notifications_counts,
+    get_unread_notifications_count_cache_key,
+    invalidate_latest_author_event_id,
+    is_new_article_notifications_chunk_done,
+    start_new_article_notifications_progress,
+)
+from .consumers import AUTHOR_EVENTS_GROUP
+from .models import AuthorEvent, Notification, NotificationWatermark
+from .settings import (
+    AUTHOR_EVENTS_MIN_SUBSCRIBERS,
+    AUTHOR_EVENTS_SETTLE_TIME,
+    NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE,
+    NOTIFICATIONS_GROUP_SEND_CONCURRENCY,
+    NOTIFICATIONS_PAGE_SIZE,
+)
+from .tasks import send_author_event_email as send_author_event_email__task
+from .tasks import (
+    send_new_article_notification_chunk as send_new_article_notification_chunk__task,
+)
 from .tasks import send_notification_email as send_notification_email__task
 
 
@@ -28,26 +65,154 @@ def send_new_comment_notification(comment: ArticleComment, recipient: User) -> N
 
 
 def send_new_article_notification(article: Article) -> None:
-    subscribers = article.author.subscribers.all()
-    subscriber_count = subscribers.count()
+    """Notifies the subscribers of the article's author about the article.
+    Subscribers are split into chunks of NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE
+    consecutive IDs, found by a keyset scan of the subscription index, and
+    each chunk is notified by a Celery task of its own. Sending the
+    notifications about the same article again resumes the fan-out: done
+    chunks are skipped and subscribers already notified are not notified
+    twice.
+
+    Authors with AUTHOR_EVENTS_MIN_SUBSCRIBERS subscribers or more publish
+    the article as an author event instead.
+    """
+    if (
+        AUTHOR_EVENTS_MIN_SUBSCRIBERS
+        and get_cached_subscribers_count(article.author)
+        >= AUTHOR_EVENTS_MIN_SUBSCRIBERS
+    ):
+        publish_new_article_event(article)
+        return
+
+    chunks = _split_subscribers_into_chunks(
+        article.author_id, NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE
+    )
+    logger.info(
+        "Found %d chunks of subscribers for article with ID=%d",
+        len(chunks),
+        article.id,
+    )
+    if not chunks:
+        return
+    start_new_article_notifications_progress(
+        article.id, [after_id for after_id, _ in chunks]
+    )
+    group(
+        send_new_article_notification_chunk__task.si(article.slug, after_id, last_id)
+        for after_id, last_id in chunks
+    ).apply_async()
+
+
+def publish_new_article_event(article: Article) -> AuthorEvent:
+    """Publishes the article as a single author event. Connected
+    subscribers are sent their notifications about it right away, the
+    others get them when they next read their notifications. Emails are
+    still sent to every subscriber who allows them.
+    """
+    event = AuthorEvent.objects.create(
+        type=Notification.Type.NEW_ARTICLE,
+        title="New Article",
+        message=_render_new_article_message(article),
+        link=reverse("article-details", args=(article.slug,)),
+        author=article.author,
+    )
+    invalidate_latest_author_event_id()
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        AUTHOR_EVENTS_GROUP.format(author_id=article.author_id),
+        {"type": "send_author_event", "id": event.id},
+    )
+
+    email_recipient_ids = AuthorSubscription.objects.filter(
+        author_id=article.author_id,
+        notifications_enabled=True,
+        subscriber__profile__notification_emails_allowed=True,
+    ).values_list("subscriber_id", flat=True)
+    for recipient_id in email_recipient_ids.iterator(chunk_size=2000):
+        send_author_event_email__task.delay(event.id, recipient_id)
     logger.info(
-        "Found %d subscribers for article with ID=%d", subscriber_count, article.id
-    )
-    if subscribers.count() > 0:
-        notifications = bulk_create_new_article_notifications(article, subscribers)
-        for notification in notifications:
-            group_name = notification.recipient.username
-            _send_notification(notification, group_name)
-            if notification.recipient.profile.notification_emails_allowed:
-                send_notification_email__task.delay(notification.id)
+        "Published `New article` event with ID=%d about article with ID=%d",
+        event.id,
+        article.id,
+    )
+    return event
+
+
+def _split_subscribers_into_chunks(
+    author_id: int, chunk_size: int
+) -> list[tuple[int, Optional[int]]]:
+    """Returns the (after_id, last_id] ranges of subscriber IDs that
+    hold `chunk_size` subscribers of the author each. The last range is
+    open, so that it includes subscribers added meanwhile."""
+    subscriber_ids = (
+        AuthorSubscription.objects.filter(
+            author_id=author_id, notifications_enabled=True
+        )
+        .order_by("subscriber_id")
+        .values_list("subscriber_id", flat=True)
+    )
+    chunks: list[tuple[int, Optional[int]]] = []
+    after_id = 0
+    while True:
+        following_ids = subscriber_ids.filter(subscriber_id__gt=after_id)
+        boundary = list(following_ids[chunk_size - 1 : chunk_size])
+        if not boundary:
+            if following_ids.exists():
+                chunks.append((after_id, None))
+            return chunks
+        chunks.append((after_id, boundary[0]))
+        after_id = boundary[0]
+
+
+def send_new_article_notification_chunk(
+    article: Article, after_id: int, last_id: Optional[int]
+) -> int:
+    """Notifies the subscribers of the article's author with IDs in the
+    (after_id, last_id] range about the article. Returns the number of
+    notified subscribers."""
+    if is_new_article_notifications_chunk_done(article.id, after_id):
         logger.info(
-            (
-                "Initiated sending of %d `New article` notifications about article"
-                "with ID=%d"
-            ),
-            len(notifications),
+            "Chunk of subscribers after ID=%d was already notified about article "
+            "with ID=%d",
+            after_id,
             article.id,
         )
+        return 0
+
+    subscribers = User.objects.filter(
+        subscriptions_made__author_id=article.author_id,
+        subscriptions_made__notifications_enabled=True,
+        id__gt=after_id,
+    )
+    if last_id is not None:
+        subscribers = subscribers.filter(id__lte=last_id)
+    # Subscribers notified by an earlier attempt of the chunk
+    notified_ids = Notification.objects.filter(
+        type=Notification.Type.NEW_ARTICLE,
+        link=reverse("article-details", args=(article.slug,)),
+        recipient__in=subscribers,
+    ).values("recipient_id")
+    subscribers = (
+        subscribers.exclude(id__in=notified_ids)
+        .select_related("profile")
+        .only("id", "username", "profile__notification_emails_allowed")
+        .order_by("id")
+    )
+
+    notifications = bulk_create_new_article_notifications(article, subscribers)
+    _send_notifications(notifications)
+    for notification in notifications:
+        if notification.recipient.profile.notification_emails_allowed:
+            send_notification_email__task.delay(notification.id)
+    complete_new_article_notifications_chunk(article.id, after_id, len(notifications))
+    logger.info(
+        "Initiated sending of %d `New article` notifications about article "
+        "with ID=%d to subscribers after ID=%d",
+        len(notifications),
+        article.id,
+        after_id,
+    )
+    return len(notifications)
 
 
 def _send_notification(notification: Notification, group_name: str):
@@ -58,15 +223,7 @@ def _send_notification(notification: Notification, group_name: str):
     )
     channel_layer = get_channel_layer()
     async_to_sync(channel_layer.group_send)(
-        group_name,
-        {
-            "type": "send_notification",
-            "id": notification.id,
-            "title": notification.title,
-            "message": notification.message,
-            "link": notification.link,
-            "timestamp": notification.created_at.isoformat(),
-        },
+        group_name, _build_notification_event(notification)
     )
     logger.info(
         "Successfully sent notification with ID=%d to group %s via channels",
@@ -75,14 +232,73 @@ def _send_notification(notification: Notification, group_name: str):
     )
 
 
+def _send_notifications(notifications: list[Notification]) -> None:
+    """Sends the notifications to the groups of their recipients via
+    channels. Unlike a _send_notification call per notification, all of
+    them are sent concurrently from a single event loop, so the channel
+    layer keeps its Redis connections and the round trips overlap.
+    """
+    messages = [
+        (n.recipient.username, _build_notification_event(n)) for n in notifications
+    ]
+    failed = async_to_sync(_group_send_many)(messages)
+    logger.info(
+        "Sent %d of %d notifications via channels",
+        len(messages) - failed,
+        len(messages),
+    )
+
+
+async def _group_send_many(messages: list[tuple[str, dict[str, Any]]]) -> int:
+    """Sends the messages to their groups, at most
+    NOTIFICATIONS_GROUP_SEND_CONCURRENCY at a time. Returns the number of
+    messages that failed to be sent.
+
+    The messages are sent with a channel layer of their own, whose
+    connections are closed before the event loop of the batch is, so
+    that no connections or locks are shared with other event loops
+    through the global layer.
+    """
+    channel_layer = channel_layers.make_backend(DEFAULT_CHANNEL_LAYER)
+    semaphore = asyncio.Semaphore(NOTIFICATIONS_GROUP_SEND_CONCURRENCY)
+
+    async def group_send(group_name: str, message: dict[str, Any]) -> None:
+        async with semaphore:
+            await channel_layer.group_send(group_name, message)
+
+    try:
+        results = await asyncio.gather(
+            *(group_send(group_name, message) for group_name, message in messages),
+            return_exceptions=True,
+        )
+    finally:
+        await channel_layer.close_pools()
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        logger.error(
+            "Failed to send %d notifications via channels",
+            len(errors),
+            exc_info=errors[0],
+        )
+    return len(errors)
+
+
+def _build_notification_event(notification: Notification) -> dict[str, Any]:
+    return {
+        "type": "send_notification",
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "link": notification.link,
+        "timestamp": notification.created_at.isoformat(),
+    }
+
+
 def bulk_create_new_article_notifications(
     article: Article, recipients: Iterable[User]
 ) -> list[Notification]:
     notifications = []
-    message = _render_notification_message(
-        "notifications/new_article_notification.html",
-        {"article_author": article.author.username, "article_title": article.title},
-    )
+    message = _render_new_article_message(article)
     for user in recipients:
         notifications.append(
             Notification(
@@ -97,6 +313,10 @@ def bulk_create_new_article_notifications(
     created_notifications = Notification.objects.bulk_create(
         notifications, batch_size=500
     )
+    for recipient_id, count in Counter(
+        n.recipient_id for n in created_notifications
+    ).items():
+        adjust_unread_notifications_count(recipient_id, count)
     logger.info(
         "Created %d `New article` notifications about article with ID=%d",
         len(created_notifications),
@@ -105,6 +325,13 @@ def bulk_create_new_article_notifications(
     return created_notifications
 
 
+def _render_new_article_message(article: Article) -> str:
+    return _render_notification_message(
+        "notifications/new_article_notification.html",
+        {"article_author": article.author.username, "article_title": article.title},
+    )
+
+
 def _render_notification_message(template_name: str, context: dict[str, Any]) -> str:
     """Renders a notification message from a template."""
     return render_to_string(template_name, context).strip("\n").replace("\n", " ")
@@ -131,6 +358,7 @@ def create_new_comment_notification(
         sender=comment.author,
         recipient=recipient,
     )
+    adjust_unread_notifications_count(recipient.id, 1)
     return notification
 
 
@@ -153,21 +381,251 @@ def get_notification_by_id(notification_id: int) -> Notification:
     return Notification.objects.get(pk=notification_id)
 
 
+def send_author_event_email(event: AuthorEvent, recipient: User) -> None:
+    send_notification_email(
+        Notification(
+            type=event.type,
+            title=event.title,
+            message=event.message,
+            link=event.link,
+            recipient=recipient,
+        )
+    )
+
+
+def get_author_event_by_id(event_id: int) -> AuthorEvent:
+    return AuthorEvent.objects.get(pk=event_id)
+
+
 def find_notifications_by_user(user: User) -> QuerySet[Notification]:
     """Returns a queryset of notifications addressed to the specified
-    user.
+    user, including those about the events of the authors the user is
+    subscribed to.
     """
+    create_author_event_notifications(user)
     return Notification.objects.filter(recipient=user)
 
 
+def create_author_event_notifications(
+    user: User, published_event_id: int = 0
+) -> list[Notification]:
+    """Creates the notifications of the user about the events published
+    by the authors the user is subscribed to since the user's watermark.
+    Costs no queries once the watermark or the latest event the user was
+    checked for has passed the latest event, and a single query if none
+    of the authors the user is subscribed to published the new events.
+    `published_event_id` is an event known to be published, even if the
+    cached ID of the latest event is older.
+
+    The watermark is only moved up to the events older than
+    AUTHOR_EVENTS_SETTLE_TIME, so that an event with a lower ID committed
+    after a later one is not skipped. Newer events that were already
+    turned into notifications are recorded on the watermark instead.
+    """
+    latest_event_id, watermark, checked_id = get_cached_author_events_state(user.id)
+    if latest_event_id is None:
+        latest_event_id = AuthorEvent.objects.aggregate(Max("id"))["id__max"] or 0
+        cache_latest_author_event_id(latest_event_id)
+    # A published event may have been committed after a later one the user
+    # was checked for
+    if published_event_id:
+        checked_id = None
+    latest_event_id = max(latest_event_id, published_event_id)
+    if max(watermark or 0, checked_id or 0) >= latest_event_id:
+        return []
+
+    subscribed_events = AuthorEvent.objects.filter(
+        author__subscriptions_received__subscriber=user,
+        author__subscriptions_received__notifications_enabled=True,
+        created_at__gte=F("author__subscriptions_received__created_at"),
+    )
+    if not subscribed_events.filter(
+        id__gt=watermark or 0, id__lte=latest_event_id
+    ).exists():
+        cache_author_events_checked_id(user.id, latest_event_id)
+        return []
+
+    with transaction.atomic():
+        # Serializes concurrent requests of the user
+        state, _ = NotificationWatermark.objects.select_for_update().get_or_create(
+            user=user
+        )
+        new_events = AuthorEvent.objects.filter(
+            id__gt=state.last_author_event_id, id__lte=latest_event_id
+        )
+        events = (
+            subscribed_events.filter(
+                id__gt=state.last_author_event_id, id__lte=latest_event_id
+            )
+            .exclude(id__in=state.materialized_author_event_ids)
+            .order_by("id")
+        )
+        notifications = Notification.objects.bulk_create(
+            Notification(
+                type=event.type,
+                title=event.title,
+                message=event.message,
+                link=event.link,
+                sender_id=event.author_id,
+                recipient=user,
+                author_event=event,
+                created_at=event.created_at,
+            )
+            for event in events
+        )
+
+        settled_before = timezone.now() - timedelta(seconds=AUTHOR_EVENTS_SETTLE_TIME)
+        last_settled_id = new_events.filter(created_at__lt=settled_before).aggregate(
+            Max("id")
+        )["id__max"]
+        last_event_id = max(state.last_author_event_id, last_settled_id or 0)
+        materialized_ids = sorted(
+            event_id
+            for event_id in (
+                *state.materialized_author_event_ids,
+                *(n.author_event_id for n in notifications),
+            )
+            if event_id > last_event_id
+        )
+        if (last_event_id, materialized_ids) != (
+            state.last_author_event_id,
+            state.materialized_author_event_ids,
+        ):
+            state.last_author_event_id = last_event_id
+            state.materialized_author_event_ids = materialized_ids
+            state.save(
+                update_fields=["last_author_event_id", "materialized_author_event_ids"]
+            )
+
+    cache_author_events_watermark(user.id, state.last_author_event_id)
+    cache_author_events_checked_id(user.id, latest_event_id)
+    if notifications:
+        adjust_unread_notifications_count(user.id, len(notifications))
+    return notifications
+
+
+def get_author_event_notifications(user: User, event_id: int) -> list[Notification]:
+    """Returns the notifications of the user about the author event,
+    creating them first if needed."""
+    create_author_event_notifications(user, published_event_id=event_id)
+    return list(Notification.objects.filter(recipient=user, author_event_id=event_id))
+
+
+def find_notified_author_ids(user: User) -> list[int]:
+    """Returns the IDs of the authors the user is subscribed to with
+    notifications enabled who publish their articles as author events,
+    i.e. have AUTHOR_EVENTS_MIN_SUBSCRIBERS subscribers or more."""
+    if not AUTHOR_EVENTS_MIN_SUBSCRIBERS:
+        return []
+    author_ids = list(
+        AuthorSubscription.objects.filter(
+            subscriber=user, notifications_enabled=True
+        ).values_list("author_id", flat=True)
+    )
+    subscribers_counts = get_cached_subscribers_counts(author_ids)
+    return [
+        author_id
+        for author_id in author_ids
+        if subscribers_counts[author_id] >= AUTHOR_EVENTS_MIN_SUBSCRIBERS
+    ]
+
+
+def get_notifications_page(user: User, cursor: Optional[str] = None) -> KeysetPage:
+    """Returns a page of NOTIFICATIONS_PAGE_SIZE notifications addressed
+    to the user, newest first, following the cursor of the previous
+    page. Raises InvalidCursor if the cursor is invalid.
+    """
+    paginator = KeysetPaginator(
+        find_notifications_by_user(user),
+        NOTIFICATIONS_PAGE_SIZE,
+        ordering=("-created_at", "-id"),
+    )
+    return paginator.page(cursor)
+
+
+def serialize_notification(notification: Notification) -> dict[str, Any]:
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "link": notification.link,
+        "timestamp": notification.created_at.isoformat(),
+        "isRead": notification.status == Notification.Status.READ,
+    }
+
+
 def mark_notification_as_read(notification: Notification) -> None:
     """Changes the status of the notification to 'read'."""
+    # Only the request that changes the status updates the unread count
+    marked = Notification.objects.filter(
+        pk=notification.pk, status=Notification.Status.UNREAD
+    ).update(status=Notification.Status.READ)
     notification.status = Notification.Status.READ
-    notification.save()
+    if marked:
+        _update_unread_notifications_count(notification.recipient, -1)
 
 
 def delete_notification(notification: Notification) -> None:
-    notification.delete()
+    deleted, _ = notification.delete()
+    if deleted and notification.status == Notification.Status.UNREAD:
+        _update_unread_notifications_count(notification.recipient, -1)
+
+
+def _update_unread_notifications_count(user: User, delta: int) -> None:
+    """Adjusts the cached unread count of the user by the delta and
+    sends the new count to the user's open pages."""
+    count = adjust_unread_notifications_count(user.id, delta)
+    if count is None:
+        count = get_cached_unread_notifications_count(user)
+    _send_unread_notifications_count(count, user.username)
+
+
+def _send_unread_notifications_count(count: int, group_name: str) -> None:
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        group_name, {"type": "send_unread_notifications_count", "count": count}
+    )
+
+
+def reconcile_unread_notifications_counts(batch_size: int = 1000) -> int:
+    """Compares the cached unread counts with the numbers of unread
+    notifications in the database, drops the counts that drifted and
+    sends the actual ones to the users' open pages. Returns the number
+    of repaired counts.
+    """
+    repaired = 0
+    users = User.objects.order_by("id").values_list("id", "username")
+    last_id = 0
+    while batch := list(users.filter(id__gt=last_id)[:batch_size]):
+        last_id = batch[-1][0]
+        cached_counts = get_cached_unread_notifications_counts([u[0] for u in batch])
+        if not cached_counts:
+            continue
+        # The counts are read from the cache first: a notification created
+        # in between makes its counter look drifted, and the dropped counter
+        # is then counted anew on the next read.
+        actual_counts = dict(
+            Notification.objects.filter(
+                recipient_id__in=cached_counts, status=Notification.Status.UNREAD
+            )
+            .values_list("recipient_id")
+            .annotate(Count("id"))
+        )
+        drifted = {
+            user_id: actual_counts.get(user_id, 0)
+            for user_id, count in cached_counts.items()
+            if count != actual_counts.get(user_id, 0)
+        }
+        cache.delete_many(
+            [get_unread_notifications_count_cache_key(user_id) for user_id in drifted]
+        )
+        for user_id, username in batch:
+            if user_id in drifted:
+                _send_unread_notifications_count(drifted[user_id], username)
+        repaired += len(drifted)
+    if repaired:
+        logger.warning("Repaired %d drifted unread notification counts.", repaired)
+    return repaired
 
 
 def get_unread_notifications_count_by_user(user: User) -> int:
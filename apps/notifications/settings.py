@@ -0,0 +1,54 @@
+import os
+
+
+# Number of notifications loaded at once into the notification list: the
+# first ones are rendered with the page, the next ones are loaded as the
+# list is scrolled.
+NOTIFICATIONS_PAGE_SIZE = int(os.getenv("NOTIFICATIONS_PAGE_SIZE", "20"))
+
+# Timeout (in seconds) of the cached counter of unread notifications of a
+# user. The counter is counted in the database when it is first read and is
+# then adjusted as notifications of the user are created, read and deleted.
+# Counters that drifted are repaired by `reconcile_unread_notifications_counts`,
+# the timeout bounds how long they may stay wrong otherwise.
+UNREAD_NOTIFICATIONS_COUNT_CACHE_TIMEOUT = int(
+    os.getenv("UNREAD_NOTIFICATIONS_COUNT_CACHE_TIMEOUT", "86400")  # 1 day
+)
+
+# Number of subscribers notified about a new article by each Celery task.
+# Subscribers are split into chunks of consecutive IDs that are notified in
+# parallel.
+NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE = int(
+    os.getenv("NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE", "1000")
+)
+
+# Time (in seconds) for which the progress of notifying subscribers about a
+# new article is kept. Chunks that are done are skipped when the article's
+# notifications are sent again within this time.
+NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT = int(
+    os.getenv("NEW_ARTICLE_NOTIFICATIONS_PROGRESS_TIMEOUT", "86400")  # 1 day
+)
+
+# Max number of notifications sent to the channel layer concurrently when a
+# chunk of notifications is delivered.
+NOTIFICATIONS_GROUP_SEND_CONCURRENCY = int(
+    os.getenv("NOTIFICATIONS_GROUP_SEND_CONCURRENCY", "100")
+)
+
+# Authors with at least this many subscribers publish each new article as a
+# single author event instead of a notification per subscriber. Subscribers
+# get their notifications about the events when they next read their
+# notifications or, if connected, as soon as the event is published. 0
+# disables author events.
+AUTHOR_EVENTS_MIN_SUBSCRIBERS = int(os.getenv("AUTHOR_EVENTS_MIN_SUBSCRIBERS", "10000"))
+
+# Time (in seconds) after which author events are considered committed. Events
+# may be committed out of the order of their IDs, so the watermark of a user
+# is only moved past events older than this; newer ones are tracked one by one.
+AUTHOR_EVENTS_SETTLE_TIME = int(os.getenv("AUTHOR_EVENTS_SETTLE_TIME", "60"))
+
+# Timeout (in seconds) of the cached watermark of a user: the last author
+# event turned into notifications of the user.
+AUTHOR_EVENTS_WATERMARK_CACHE_TIMEOUT = int(
+    os.getenv("AUTHOR_EVENTS_WATERMARK_CACHE_TIMEOUT", "86400")  # 1 day
+)
@@ -1,8 +1,16 @@
+import logging
+from typing import Optional
+
+from django.db import OperationalError
+
 from articles.selectors import get_article_by_slug, get_comment_by_id
 from config.celery import app
 from users.selectors import get_user_by_id
 
 
+logger = logging.getLogger(__name__)
+
+
 @app.task
 def send_new_article_notification(article_slug: str) -> None:
     from .services import send_new_article_notification
@@ -11,6 +19,22 @@ def send_new_article_notification(article_slug: str) -> None:
     send_new_article_notification(article)
 
 
+@app.task(
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=3,
+    retry_backoff=60,
+    autoretry_for=(OperationalError,),
+)
+def send_new_article_notification_chunk(
+    article_slug: str, after_id: int, last_id: Optional[int]
+) -> int:
+    from .services import send_new_article_notification_chunk
+
+    article = get_article_by_slug(article_slug)
+    return send_new_article_notification_chunk(article, after_id, last_id)
+
+
 @app.task
 def send_new_comment_notification(comment_id: int, recipient_id: int) -> None:
     from .services import send_new_comment_notification
@@ -26,3 +50,20 @@ def send_notification_email(notification_id: int) -> None:
 
     notification = get_notification_by_id(notification_id)
     send_notification_email(notification)
+
+
+@app.task
+def reconcile_unread_notifications_counts_task() -> None:
+    from .services import reconcile_unread_notifications_counts
+
+    repaired = reconcile_unread_notifications_counts()
+    logger.info("Reconciled unread notification counts: %d repaired", repaired)
+
+
+@app.task
+def send_author_event_email(event_id: int, recipient_id: int) -> None:
+    from .services import get_author_event_by_id, send_author_event_email
+
+    event = get_author_event_by_id(event_id)
+    recipient = get_user_by_id(recipient_id)
+    send_author_event_email(event, recipient)
@@ -1,14 +1,14 @@
 from channels.layers import get_channel_layer
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth.models import AnonymousUser
-from django.test import TestCase
+from django.test import TransactionTestCase
 
 from users.models import User
 
 from ..consumers import NotificationConsumer
 
 
-class TestNotificationConsumer(TestCase):
+class TestNotificationConsumer(TransactionTestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="u1", email="u1@test.com")
 
@@ -168,3 +168,22 @@ class TestNotificationConsumer(TestCase):
 
         await communicator1.disconnect()
         await communicator2.disconnect()
+
+    async def test_client_receives_unread_notifications_count(self):
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), "GET", "notifications"
+        )
+        communicator.scope["user"] = self.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        channel_layer = get_channel_layer()
+        await channel_layer.group_send(
+            self.user.username,
+            {"type": "send_unread_notifications_count", "count": 3},
+        )
+
+        response = await communicator.receive_json_from()
+        self.assertEqual(response, {"type": "unreadNotificationsCount", "count": 3})
+
+        await communicator.disconnect()
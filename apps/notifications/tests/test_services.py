@@ -1,30 +1,43 @@
-from datetime import datetime
-from unittest.mock import ANY, call, patch
+from datetime import datetime, timedelta
+from unittest.mock import call, patch
 
 from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.testing import WebsocketCommunicator
 from django.core import mail
-from django.db.models import QuerySet
+from django.core.cache import cache
 from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from articles.models import Article, ArticleComment
 from config.settings import DOMAIN_NAME, SCHEME
-from users.models import User
+from users.models import AuthorSubscription, User
 
+from ..cache import (
+    get_cached_unread_notifications_count,
+    get_new_article_notifications_progress,
+    invalidate_latest_author_event_id,
+)
 from ..consumers import NotificationConsumer
-from ..models import Notification
+from ..models import AuthorEvent, Notification, NotificationWatermark
 from ..services import (
     _send_notification,
+    _send_notifications,
     bulk_create_new_article_notifications,
+    create_author_event_notifications,
     create_new_comment_notification,
     delete_notification,
     find_notifications_by_user,
+    find_notified_author_ids,
     get_notification_by_id,
+    get_notifications_page,
     get_unread_notifications_count_by_user,
     mark_notification_as_read,
+    publish_new_article_event,
+    reconcile_unread_notifications_counts,
     send_new_article_notification,
+    send_new_article_notification_chunk,
     send_new_comment_notification,
     send_notification_email,
 )
@@ -45,66 +58,108 @@ class TestServices(TransactionTestCase):
             is_published=True,
         )
 
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    @patch("notifications.services.NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE", 2)
     def test_send_new_article_notification(self):
-        user1 = User.objects.create_user(username="user1", email="user1@test.com")
-        user2 = User.objects.create_user(username="user2", email="user2@test.com")
-        user2.profile.notification_emails_allowed = False
-        user2.profile.save()
-        self.author.subscribers.add(user1)
-        self.author.subscribers.add(user2)
-        n1 = Notification.objects.create(
-            type=Notification.Type.NEW_ARTICLE,
-            title="New Article",
-            message=f"New article from {self.author.username}: '{self.a.title}'",
-            link=reverse("article-details", args=(self.a.slug,)),
-            sender=self.author,
-            recipient=user1,
-            created_at=datetime.now(),
+        cache.clear()
+        self.a.save()
+        users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@test.com")
+            for i in range(1, 4)
+        ]
+        users[1].profile.notification_emails_allowed = False
+        users[1].profile.save()
+        for user in [self.user, *users]:
+            self.author.subscribers.add(user)
+        AuthorSubscription.objects.filter(subscriber=self.user).update(
+            notifications_enabled=False
         )
-        n2 = Notification.objects.create(
-            type=Notification.Type.NEW_ARTICLE,
-            title="New Article",
-            message=f"New article from {self.author.username}: '{self.a.title}'",
-            link=reverse("article-details", args=(self.a.slug,)),
-            sender=self.author,
-            recipient=user2,
-            created_at=datetime.now(),
-        )
-
-        user1.refresh_from_db()
-        user2.refresh_from_db()
-        self.assertTrue(user1.profile.notification_emails_allowed)
-        self.assertFalse(user2.profile.notification_emails_allowed)
 
         with (
             patch(
-                "notifications.services.bulk_create_new_article_notifications",
-                side_effect=[[n1, n2]],
-            ) as bulk_create_new_article_notifications__mock,
-            patch(
-                "notifications.services._send_notification",
-            ) as _send_notification__mock,
+                "notifications.services._send_notifications",
+            ) as _send_notifications__mock,
             patch(
                 "notifications.tasks.send_notification_email.delay"
             ) as send_notification_email__mock,
         ):
-
             send_new_article_notification(self.a)
 
-            bulk_create_new_article_notifications__mock.assert_called_once_with(
-                self.a, ANY
+        notifications = Notification.objects.order_by("recipient_id")
+        self.assertEqual([n.recipient for n in notifications], users)
+        self.assertEqual(
+            _send_notifications__mock.call_args_list,
+            [call(list(notifications[:2])), call(list(notifications[2:]))],
+        )
+        self.assertCountEqual(
+            send_notification_email__mock.call_args_list,
+            [call(notifications[0].id), call(notifications[2].id)],
+        )
+        self.assertEqual(
+            get_new_article_notifications_progress(self.a.id),
+            {"chunks": 2, "done_chunks": 2, "notified": 3},
+        )
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    @patch("notifications.services.NEW_ARTICLE_NOTIFICATIONS_CHUNK_SIZE", 2)
+    def test_send_new_article_notification_resumes(self):
+        cache.clear()
+        self.a.save()
+        users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@test.com")
+            for i in range(1, 4)
+        ]
+        self.author.subscribers.add(*users)
+        progress = {"chunks": 2, "done_chunks": 2, "notified": 3}
+
+        with (
+            patch("notifications.services._send_notifications"),
+            patch("notifications.tasks.send_notification_email.delay"),
+        ):
+            send_new_article_notification(self.a)
+            # Done chunks are skipped and the progress is kept
+            send_new_article_notification(self.a)
+            self.assertEqual(
+                get_new_article_notifications_progress(self.a.id), progress
             )
-            argument2 = bulk_create_new_article_notifications__mock.call_args[0][1]
-            self.assertIsInstance(argument2, QuerySet)
-            self.assertListEqual(list(argument2), [user1, user2])
 
-            _send_notification__mock.assert_has_calls(
-                [call(n1, user1.username), call(n2, user2.username)], any_order=True
+            # Expired counters are restored from the done chunks
+            cache.delete_many(
+                [
+                    f"notifications:new_article:{self.a.id}:{counter}"
+                    for counter in ("done_chunks", "notified")
+                ]
             )
+            send_new_article_notification(self.a)
+
+        self.assertEqual(get_new_article_notifications_progress(self.a.id), progress)
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_send_new_article_notification_chunk_resumes(self):
+        cache.clear()
+        self.a.save()
+        user2 = User.objects.create_user(username="user2", email="user2@test.com")
+        self.author.subscribers.add(self.user, user2)
+        # Notified before the chunk was interrupted
+        bulk_create_new_article_notifications(self.a, [self.user])
+
+        with (
+            patch("notifications.services._send_notifications"),
+            patch("notifications.tasks.send_notification_email.delay"),
+        ):
+            self.assertEqual(send_new_article_notification_chunk(self.a, 0, None), 1)
+            # Done chunks are skipped
+            self.assertEqual(send_new_article_notification_chunk(self.a, 0, None), 0)
             self.assertEqual(
-                send_notification_email__mock.call_args_list, [call(n1.id)]
+                send_new_article_notification_chunk(self.a, 0, self.user.id), 0
             )
 
+        self.assertCountEqual(
+            Notification.objects.values_list("recipient", flat=True),
+            [self.user.id, user2.id],
+        )
+        self.assertEqual(send_new_article_notification_chunk(self.a, user2.id, None), 0)
+
     def test_send_new_comment_notification(self):
         author1 = User.objects.create_user(username="author1", email="author1@test.com")
         a = Article(title="a", slug="a", author=author1, preview_text="a", content="a")
@@ -175,6 +230,30 @@ class TestServices(TransactionTestCase):
         self.assertEqual(mail.outbox[0].body, expected_body)
         self.assertEqual(len(mail.outbox[0].alternatives), 1)
 
+    async def test__send_notifications(self):
+        user2 = await database_sync_to_async(User.objects.create_user)(
+            username="user2", email="user2@test.com"
+        )
+        notifications = await sync_to_async(bulk_create_new_article_notifications)(
+            self.a, [self.user, user2]
+        )
+        communicators = []
+        for user in (self.user, user2):
+            communicator = WebsocketCommunicator(
+                NotificationConsumer.as_asgi(), "GET", "notifications"
+            )
+            communicator.scope["user"] = user
+            await communicator.connect()
+            communicators.append(communicator)
+
+        await sync_to_async(_send_notifications)(notifications)
+
+        for communicator, n in zip(communicators, notifications):
+            response = await communicator.receive_json_from()
+            self.assertEqual(response["id"], n.id)
+            self.assertEqual(response["text"], n.message)
+            await communicator.disconnect()
+
     async def test__send_notification(self):
         n = await database_sync_to_async(Notification.objects.create)(
             type=Notification.Type.NEW_ARTICLE,
@@ -406,3 +485,208 @@ class TestServices(TransactionTestCase):
 
         res = get_unread_notifications_count_by_user(self.user)
         self.assertEqual(res, 2)
+
+    @patch("notifications.services.NOTIFICATIONS_PAGE_SIZE", 2)
+    def test_get_notifications_page(self):
+        notifications = [
+            Notification.objects.create(
+                type=Notification.Type.NEW_ARTICLE, title=str(i), recipient=self.user
+            )
+            for i in range(3)
+        ]
+        Notification.objects.create(
+            type=Notification.Type.NEW_ARTICLE, title="3", recipient=self.author
+        )
+
+        page = get_notifications_page(self.user)
+        self.assertEqual(list(page), notifications[:0:-1])
+        page = get_notifications_page(self.user, page.next_cursor)
+        self.assertEqual(list(page), notifications[:1])
+        self.assertFalse(page.has_next())
+
+    def test_cached_unread_notifications_count(self):
+        cache.clear()
+        c = ArticleComment(article=self.a, author=self.user, text="1")
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 0)
+
+        n = create_new_comment_notification(c, self.author)
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 1)
+        bulk_create_new_article_notifications(self.a, [self.author])
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 2)
+
+        mark_notification_as_read(n)
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 1)
+        delete_notification(Notification.objects.get(status=Notification.Status.UNREAD))
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 0)
+
+        # Changes outside of the services are repaired by reconciliation
+        Notification.objects.create(
+            type=Notification.Type.NEW_ARTICLE, recipient=self.author
+        )
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 0)
+        self.assertEqual(get_cached_unread_notifications_count(self.user), 0)
+        with patch(
+            "notifications.services._send_unread_notifications_count"
+        ) as send_count__mock:
+            self.assertEqual(reconcile_unread_notifications_counts(batch_size=1), 1)
+        send_count__mock.assert_called_once_with(1, self.author.username)
+        self.assertEqual(get_cached_unread_notifications_count(self.author), 1)
+
+    async def test_unread_notifications_count_is_sent_on_change(self):
+        await sync_to_async(cache.clear)()
+        n = await Notification.objects.acreate(
+            type=Notification.Type.NEW_ARTICLE, recipient=self.user
+        )
+        n = await sync_to_async(get_notification_by_id)(n.id)
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), "GET", "notifications"
+        )
+        communicator.scope["user"] = self.user
+        await communicator.connect()
+
+        await sync_to_async(mark_notification_as_read)(n)
+        response = await communicator.receive_json_from()
+        self.assertEqual(response, {"type": "unreadNotificationsCount", "count": 0})
+        # Reading it again changes nothing
+        await sync_to_async(mark_notification_as_read)(n)
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.disconnect()
+
+    @patch("notifications.services.AUTHOR_EVENTS_SETTLE_TIME", 0)
+    @patch("notifications.services.AUTHOR_EVENTS_MIN_SUBSCRIBERS", 2)
+    def test_send_new_article_notification_publishes_author_event(self):
+        cache.clear()
+        self.a.save()
+        user2 = User.objects.create_user(username="user2", email="user2@test.com")
+        user2.profile.notification_emails_allowed = False
+        user2.profile.save()
+        self.author.subscribers.add(self.user, user2)
+
+        with patch(
+            "notifications.tasks.send_author_event_email.delay"
+        ) as send_author_event_email__mock:
+            send_new_article_notification(self.a)
+
+        event = AuthorEvent.objects.get()
+        self.assertEqual(event.author, self.author)
+        self.assertEqual(event.link, reverse("article-details", args=(self.a.slug,)))
+        self.assertFalse(Notification.objects.exists())
+        send_author_event_email__mock.assert_called_once_with(event.id, self.user.id)
+
+        # Notifications are created when read
+        self.assertEqual(get_cached_unread_notifications_count(self.user), 0)
+        (n,) = find_notifications_by_user(self.user)
+        self.assertEqual(n.author_event, event)
+        self.assertEqual(n.sender, self.author)
+        self.assertEqual(n.created_at, event.created_at)
+        self.assertEqual(get_cached_unread_notifications_count(self.user), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(find_notifications_by_user(self.user)), 1)
+
+        # Subscribers get no notifications about earlier events
+        user3 = User.objects.create_user(username="user3", email="user3@test.com")
+        self.author.subscribers.add(user3)
+        self.assertFalse(find_notifications_by_user(user3).exists())
+
+    @patch("notifications.services.AUTHOR_EVENTS_SETTLE_TIME", 60)
+    def test_create_author_event_notifications_of_events_committed_late(self):
+        cache.clear()
+        self.author.subscribers.add(self.user)
+        event1, event2 = (
+            AuthorEvent.objects.create(
+                type=Notification.Type.NEW_ARTICLE,
+                title="New Article",
+                message=f"message{i}",
+                link=f"/link{i}/",
+                author=self.author,
+            )
+            for i in range(2)
+        )
+        # The event with the lower ID is not committed yet
+        event1_id = event1.id
+        event1.delete()
+        (n2,) = create_author_event_notifications(self.user)
+        self.assertEqual(n2.author_event, event2)
+
+        event1.id = event1_id
+        event1.save(force_insert=True)
+        invalidate_latest_author_event_id()
+        # Found once the events up to the checked one settle
+        self.assertEqual(create_author_event_notifications(self.user), [])
+        checked_key = f"notifications:author_events:checked:{self.user.id}"
+        cache.delete(checked_key)
+        (n1,) = create_author_event_notifications(self.user)
+        self.assertEqual(n1.author_event_id, event1.id)
+
+        # Deleted notifications are not created again
+        n1.delete()
+        cache.delete(checked_key)
+        self.assertEqual(create_author_event_notifications(self.user), [])
+        state = NotificationWatermark.objects.get(user=self.user)
+        self.assertEqual(state.last_author_event_id, 0)
+        self.assertEqual(state.materialized_author_event_ids, [event1.id, event2.id])
+
+        # The watermark is moved past the events once they settle
+        AuthorSubscription.objects.update(
+            created_at=timezone.now() - timedelta(minutes=3)
+        )
+        AuthorEvent.objects.update(created_at=timezone.now() - timedelta(minutes=2))
+        cache.delete(checked_key)
+        self.assertEqual(create_author_event_notifications(self.user), [])
+        state.refresh_from_db()
+        self.assertEqual(state.last_author_event_id, event2.id)
+        self.assertEqual(state.materialized_author_event_ids, [])
+        with self.assertNumQueries(0):
+            self.assertEqual(create_author_event_notifications(self.user), [])
+
+    def test_create_author_event_notifications_of_other_authors(self):
+        cache.clear()
+        AuthorEvent.objects.create(
+            type=Notification.Type.NEW_ARTICLE,
+            title="New Article",
+            author=self.author,
+        )
+
+        with self.assertNumQueries(2):
+            self.assertEqual(create_author_event_notifications(self.user), [])
+        with self.assertNumQueries(0):
+            self.assertEqual(create_author_event_notifications(self.user), [])
+        self.assertFalse(NotificationWatermark.objects.exists())
+
+    @patch("notifications.services.AUTHOR_EVENTS_MIN_SUBSCRIBERS", 2)
+    def test_find_notified_author_ids(self):
+        cache.clear()
+        author2 = User.objects.create_user(username="author2", email="a2@test.com")
+        user2 = User.objects.create_user(username="user2", email="user2@test.com")
+        self.author.subscribers.add(self.user, user2)
+        author2.subscribers.add(self.user)
+
+        # Only authors who publish author events are returned
+        self.assertEqual(find_notified_author_ids(self.user), [self.author.id])
+        AuthorSubscription.objects.filter(author=self.author).update(
+            notifications_enabled=False
+        )
+        self.assertEqual(find_notified_author_ids(self.user), [])
+
+    @patch("notifications.services.AUTHOR_EVENTS_MIN_SUBSCRIBERS", 1)
+    async def test_publish_new_article_event_to_connected_subscribers(self):
+        await sync_to_async(cache.clear)()
+        await self.a.asave()
+        await self.author.subscribers.aadd(self.user)
+        communicator = WebsocketCommunicator(
+            NotificationConsumer.as_asgi(), "GET", "notifications"
+        )
+        communicator.scope["user"] = self.user
+        await communicator.connect()
+
+        with patch("notifications.tasks.send_author_event_email.delay"):
+            event = await sync_to_async(publish_new_article_event)(self.a)
+
+        response = await communicator.receive_json_from()
+        n = await Notification.objects.aget(recipient=self.user, author_event=event)
+        self.assertEqual(response["id"], n.id)
+        self.assertEqual(response["title"], "New Article")
+        self.assertEqual(response["link"], event.link)
+
+        await communicator.disconnect()
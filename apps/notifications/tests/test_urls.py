@@ -1,7 +1,11 @@
 from django.test import SimpleTestCase
 from django.urls import resolve, reverse
 
-from notifications.views import DeleteNotificationView, ReadNotificationView
+from notifications.views import (
+    DeleteNotificationView,
+    NotificationListView,
+    ReadNotificationView,
+)
 
 
 class TestURLs(SimpleTestCase):
@@ -12,3 +16,7 @@ class TestURLs(SimpleTestCase):
     def test_delete_notification_url_is_resolved(self):
         url = reverse("notification-delete", args=[1])
         self.assertEqual(resolve(url).func.view_class, DeleteNotificationView)
+
+    def test_notification_list_url_is_resolved(self):
+        url = reverse("notification-list")
+        self.assertEqual(resolve(url).func.view_class, NotificationListView)
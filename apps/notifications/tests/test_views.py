@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -73,3 +76,48 @@ class TestViews(TestCase):
         )
         with self.assertRaises(Notification.DoesNotExist):
             Notification.objects.get(id=self.n.id)
+
+    @patch("notifications.services.NOTIFICATIONS_PAGE_SIZE", 2)
+    def test_notification_list_view(self):
+        url = reverse("notification-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        for i in range(2):
+            Notification.objects.create(
+                type=Notification.Type.NEW_COMMENT,
+                title=f"title{i}",
+                recipient=self.user,
+                status=Notification.Status.READ,
+            )
+        Notification.objects.create(
+            type=Notification.Type.NEW_COMMENT, title="other", recipient=self.author
+        )
+
+        self.client.force_login(self.user)
+        data = self.client.get(url).json()["data"]
+        self.assertEqual(
+            [n["title"] for n in data["notifications"]], ["title1", "title0"]
+        )
+        self.assertTrue(data["notifications"][0]["isRead"])
+
+        data = self.client.get(url, {"cursor": data["nextCursor"]}).json()["data"]
+        self.assertEqual(data["notifications"][0]["id"], self.n.id)
+        self.assertFalse(data["notifications"][0]["isRead"])
+        self.assertIsNone(data["nextCursor"])
+
+        response = self.client.get(url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 400)
+
+    @patch("notifications.services.NOTIFICATIONS_PAGE_SIZE", 1)
+    def test_notifications_in_context(self):
+        cache.clear()
+        n2 = Notification.objects.create(
+            type=Notification.Type.NEW_COMMENT, title="title2", recipient=self.user
+        )
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("articles"))
+        self.assertEqual(response.context["notifications"], [n2])
+        self.assertIsNotNone(response.context["notifications_next_cursor"])
+        self.assertEqual(response.context["notifications_count"], 2)
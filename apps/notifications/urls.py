@@ -4,6 +4,11 @@ from . import views
 
 
 urlpatterns = [
+    path(
+        "notifications/",
+        views.NotificationListView.as_view(),
+        name="notification-list",
+    ),
     path(
         "notification/<int:notification_id>/read/",
         views.ReadNotificationView.as_view(),
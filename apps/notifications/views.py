@@ -1,14 +1,37 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponseForbidden, JsonResponse
 from django.views import View
 
+from core.pagination import InvalidCursor
+
+from .cache import get_cached_unread_notifications_count
 from .services import (
     delete_notification,
     get_notification_by_id,
-    get_unread_notifications_count_by_user,
+    get_notifications_page,
     mark_notification_as_read,
+    serialize_notification,
 )
 
 
+class NotificationListView(LoginRequiredMixin, View):
+    """Returns the page of the user's notifications that follows the
+    `cursor`, for the notification list loaded as it is scrolled."""
+
+    def get(self, request):
+        try:
+            page = get_notifications_page(request.user, request.GET.get("cursor"))
+        except InvalidCursor:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid cursor"}, status=400
+            )
+        data = {
+            "notifications": [serialize_notification(n) for n in page],
+            "nextCursor": page.next_cursor,
+        }
+        return JsonResponse({"status": "success", "data": data})
+
+
 class ReadNotificationView(View):
     def post(self, request, notification_id):
         notification = get_notification_by_id(notification_id)
@@ -25,7 +48,7 @@ class DeleteNotificationView(View):
         notification = get_notification_by_id(notification_id)
         if notification.recipient == request.user:
             delete_notification(notification)
-            unread_notifications_count = get_unread_notifications_count_by_user(
+            unread_notifications_count = get_cached_unread_notifications_count(
                 request.user
             )
             return JsonResponse(
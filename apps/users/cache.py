@@ -1,6 +1,7 @@
 from django.core.cache import cache
+from django.db.models import Count
 
-from .models import User
+from .models import AuthorSubscription, User
 from .settings import SUBSCRIBERS_COUNT_CACHE_TIMEOUT
 
 
@@ -13,5 +14,35 @@ def get_cached_subscribers_count(author: User) -> int:
     return int(count)
 
 
+def get_cached_subscribers_counts(author_ids: list[int]) -> dict[int, int]:
+    """Returns the subscriber counts of the authors, counting the ones
+    that are not cached yet in a single query."""
+    cache_keys = {
+        get_subscribers_count_cache_key(author_id): author_id
+        for author_id in author_ids
+    }
+    counts = {
+        cache_keys[key]: int(count) for key, count in cache.get_many(cache_keys).items()
+    }
+    missing_ids = [author_id for author_id in author_ids if author_id not in counts]
+    if missing_ids:
+        missing_counts = dict.fromkeys(missing_ids, 0)
+        missing_counts.update(
+            AuthorSubscription.objects.filter(author_id__in=missing_ids)
+            .values("author_id")
+            .annotate(count=Count("id"))
+            .values_list("author_id", "count")
+        )
+        cache.set_many(
+            {
+                get_subscribers_count_cache_key(author_id): count
+                for author_id, count in missing_counts.items()
+            },
+            timeout=SUBSCRIBERS_COUNT_CACHE_TIMEOUT,
+        )
+        counts.update(missing_counts)
+    return counts
+
+
 def get_subscribers_count_cache_key(user_id: int) -> str:
     return f"users:subscribers_count:{user_id}"
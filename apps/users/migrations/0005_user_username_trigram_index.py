@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-16 22:47
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0003_title_and_tag_trigram_indexes"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0004_remove_profile_subscribers_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("username"),
+                    name="gin_trgm_ops",
+                ),
+                name="users_user_username_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-17 00:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_user_username_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="authorsubscription",
+            index=models.Index(
+                fields=["author", "subscriber"], name="users_subscription_author"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="authorsubscription",
+            name="users_autho_author__7de617_idx",
+        ),
+    ]
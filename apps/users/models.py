@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class User(AbstractUser):
@@ -11,6 +13,14 @@ class User(AbstractUser):
         related_name="subscribers",
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(
+                OpClass(Upper("username"), name="gin_trgm_ops"),
+                name="users_user_username_trgm",
+            ),
+        ]
+
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -37,7 +47,10 @@ class AuthorSubscription(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["subscriber"]),
-            models.Index(fields=["author"]),
+            # Keyset scans of the subscribers of an author
+            models.Index(
+                fields=["author", "subscriber"], name="users_subscription_author"
+            ),
         ]
         constraints = [
             models.CheckConstraint(
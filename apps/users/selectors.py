@@ -6,6 +6,7 @@ from django.db.models import BooleanField, Exists, OuterRef, Value
 from django.db.models.query import QuerySet
 from django.shortcuts import get_object_or_404
 
+from core.text_search import filter_by_prefix_or_similarity
 from users.models import AuthorSubscription, User
 
 
@@ -13,6 +14,17 @@ def get_all_users() -> QuerySet[User]:
     return User.objects.all()
 
 
+def find_username_suggestions(prefix: str, limit: int) -> list[tuple[str, str]]:
+    """Returns (username, username) pairs of users whose usernames match
+    the prefix, best matches first.
+    """
+    return list(
+        filter_by_prefix_or_similarity(
+            User.objects.all(), "username", prefix
+        ).values_list("username", "username")[:limit]
+    )
+
+
 def get_author_with_viewer_subscription_status(
     author_id: int, viewer: User | AnonymousUser
 ) -> User:
@@ -6,6 +6,7 @@ from django.test import TestCase
 
 from users.models import User
 from users.selectors import (
+    find_username_suggestions,
     get_all_subscriptions_of_user,
     get_all_users,
     get_author_with_viewer_subscription_status,
@@ -24,6 +25,17 @@ class TestSelectors(TestCase):
     def tearDown(self):
         signals.post_save.connect(create_profile, sender=User)
 
+    def test_find_username_suggestions(self):
+        User.objects.create_user(username="test_author", email="author@test.com")
+        User.objects.create_user(username="other", email="other@test.com")
+
+        self.assertEqual(
+            find_username_suggestions("TEST", 10),
+            [("test_author", "test_author"), ("test_user", "test_user")],
+        )
+        self.assertEqual(find_username_suggestions("oth", 10), [("other", "other")])
+        self.assertEqual(find_username_suggestions("xyz", 10), [])
+
     def test_get_user_by_id(self):
         u1 = get_user_by_id(self.test_user.id)
         self.assertEqual(u1, self.test_user)
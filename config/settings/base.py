@@ -62,6 +62,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "tinymce",
     "crispy_forms",
     "crispy_bootstrap4",
@@ -91,7 +92,7 @@ if DEBUG:
 
 MIDDLEWARE = [
     "django.middleware.gzip.GZipMiddleware",
-    "django_minify_html.middleware.MinifyHtmlMiddleware",
+    "core.middleware.MinifyHtmlMiddleware",
     "core.middleware.TimezoneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -388,6 +389,23 @@ CACHES = {
     },
 }
 
+# Tables written on nearly every request or beat tick (view syncs, likes,
+# comments, notifications). Caching their queries with cachalot is pointless,
+# since every write invalidates all of them; hot reads of articles are cached
+# by the versioned caches in articles.cache instead.
+CACHALOT_UNCACHABLE_TABLES = (
+    "django_migrations",
+    "articles_article",
+    "articles_article_users_that_liked",
+    "articles_articlecomment",
+    "articles_articlecomment_users_that_liked",
+    "articles_articleviewbucket",
+    "articles_articleviewsyncbatch",
+    "notifications_authorevent",
+    "notifications_notification",
+    "notifications_notificationwatermark",
+)
+
 
 # Django Channels
 
@@ -15,6 +15,26 @@ LOGGING = {
     "disable_existing_loggers": True,
 }
 
+# Each pytest-xdist worker uses a Redis database of its own, so that tests
+# flushing Redis or joining channel groups of the same users do not interfere
+# across workers
+REDIS_TEST_DB = int(os.getenv("PYTEST_XDIST_WORKER", "gw0")[2:]) % 16
+REDIS_TEST_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_TEST_DB}"
+
+# Redis caches for tests of the code that uses Redis directly
+REDIS_CACHES = {
+    alias: {**config, "LOCATION": REDIS_TEST_URL} for alias, config in CACHES.items()
+}
+
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "CONFIG": {
+            "hosts": [REDIS_TEST_URL],
+        },
+    },
+}
+
 CACHES = {
     "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
     "select2": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
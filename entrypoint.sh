@@ -14,6 +14,8 @@ fi
 ./manage.py migrate --noinput
 ./manage.py collect_fixture_media --noinput
 ./manage.py loaddata fixtures/initial_data.json
+./manage.py rebuild_article_search_vectors
+./manage.py reconcile_article_counters
 ./manage.py createsuperuser --noinput || true
 ./manage.py collectstatic --noinput
 
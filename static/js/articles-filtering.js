@@ -1,8 +1,21 @@
-$('#id_author, #id_category, #id_ordering').select2({
+$('#id_category, #id_ordering').select2({
   width: '100%',
   minimumResultsForSearch: 10,
 });
-$('#filterTagsInput').select2({ width: '100%' });
+$('#id_author, #filterTagsInput').each(function () {
+  $(this).select2({
+    width: '100%',
+    minimumInputLength: 2,
+    ajax: {
+      url: this.dataset.typeaheadUrl,
+      dataType: 'json',
+      delay: 250,
+      cache: true,
+      data: (params) => ({ q: params.term }),
+      processResults: (response) => response.data,
+    },
+  });
+});
 
 $('#filterSubmit').click((e) => {
   e.preventDefault();
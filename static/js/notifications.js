@@ -10,6 +10,67 @@ notificationDeleteButtons.forEach((button) => {
   addEventListenerToNotificaionDeleteButton(button);
 });
 
+// Older notifications are loaded page by page as the list is scrolled
+let notificationsLoading = false;
+document
+  .querySelector('#modal .modal-body')
+  .addEventListener('scroll', (event) => {
+    const modalBody = event.target;
+    if (
+      modalBody.scrollTop + modalBody.clientHeight >=
+      modalBody.scrollHeight - 100
+    ) {
+      loadMoreNotifications();
+    }
+  });
+
+function loadMoreNotifications() {
+  const notificationContainer = document.getElementById(
+    'notificationsContainer',
+  );
+  const cursor = notificationContainer.dataset.nextCursor;
+  if (!cursor || notificationsLoading) {
+    return;
+  }
+  notificationsLoading = true;
+
+  const params = new URLSearchParams({ cursor: cursor });
+  const xhr = new XMLHttpRequest();
+  xhr.open('GET', `${location.origin}/notifications/?${params}`, true);
+  xhr.setRequestHeader('X-Requested-With', 'XMLHttpRequest');
+  xhr.responseType = 'json';
+  xhr.send();
+
+  xhr.onload = function () {
+    notificationsLoading = false;
+    if (xhr.status !== 200 || xhr.response?.status !== 'success') {
+      console.error('Notifications request failed. Status:', xhr.status);
+      return;
+    }
+    const data = xhr.response.data;
+    data.notifications.forEach((n) => {
+      if (document.getElementById('notification-' + n.id)) {
+        return;
+      }
+      const notificationElement = createNotificationElement(
+        n.id,
+        n.title,
+        n.message,
+        n.link,
+        n.timestamp,
+      );
+      notificationElement.classList.toggle('read', n.isRead);
+      notificationContainer.appendChild(notificationElement);
+    });
+    notificationContainer.dataset.nextCursor = data.nextCursor || '';
+  };
+
+  xhr.onerror = function () {
+    notificationsLoading = false;
+    console.error('Network error occurred during notifications request.');
+  };
+}
+
 const wsScheme = window.location.protocol == 'https:' ? 'wss' : 'ws';
 const socket = new WebSocket(
   `${wsScheme}://${window.location.host}/ws/notifications/`,
@@ -21,8 +82,12 @@ function addEventListenersToWebSocket(socket) {
     console.log('WebSocket connection opened.');
   };
   socket.onmessage = (event) => {
-    console.log('New notification received.');
     const eventDataJson = JSON.parse(event.data);
+    if (eventDataJson.type === 'unreadNotificationsCount') {
+      setNotificationCounter(eventDataJson.count);
+      return;
+    }
+    console.log('New notification received.');
     const toastContainer = document.getElementById('toastContainer');
     const newToastElement = createToastElement(
       eventDataJson.id,
@@ -144,15 +209,7 @@ function addEventListenerToNotificaionDeleteButton(button) {
               modalFooter.classList.add('d-none');
             }
 
-            let notificationCounter = document.getElementById(
-              'notificationCounter',
-            );
-            let newNotificationCount = response.unread_notifications_count;
-            notificationCounter.innerText =
-              newNotificationCount > 999 ? '999+' : newNotificationCount;
-            if (newNotificationCount == 0) {
-              notificationCounter.classList.add('invisible');
-            }
+            setNotificationCounter(response.unread_notifications_count);
           },
         );
       }
@@ -167,6 +224,12 @@ function addEventListenerToNotificaionDeleteButton(button) {
   });
 }
 
+function setNotificationCounter(count) {
+  const notificationCounter = document.getElementById('notificationCounter');
+  notificationCounter.textContent = count > 999 ? '999+' : count;
+  notificationCounter.classList.toggle('invisible', count < 1);
+}
+
 function createNotificationElement(id, title, message, link, timestamp) {
   const notification = document.createElement('div');
   notification.setAttribute('id', 'notification-' + id);
@@ -0,0 +1,122 @@
+// Edge-cached pages are rendered the same for all users. The state that is
+// personal to the user is fetched once the page is loaded and applied to it.
+document.addEventListener('DOMContentLoaded', () => {
+  const url = document.body.dataset.pageStateUrl;
+  if (!url) {
+    return;
+  }
+
+  const params = new URLSearchParams();
+  document.querySelectorAll('.like-link').forEach((el) => {
+    params.append(`${el.dataset.type}s`, el.dataset.id);
+  });
+  if (document.body.dataset.viewedArticle) {
+    params.append('viewed', document.body.dataset.viewedArticle);
+  }
+
+  const xhr = new XMLHttpRequest();
+  xhr.open('GET', `${url}?${params}`, true);
+  xhr.setRequestHeader('X-Requested-With', 'XMLHttpRequest');
+  xhr.responseType = 'json';
+  xhr.send();
+
+  xhr.onload = function () {
+    if (xhr.status === 200 && xhr.response?.status === 'success') {
+      applyPageState(xhr.response.data);
+    } else {
+      console.error('Page state request failed. Status:', xhr.status);
+    }
+  };
+
+  xhr.onerror = function () {
+    console.error('Network error occurred during page state request.');
+  };
+
+  // Times are rendered in the default time zone
+  setDateTimeValuesToLocalTimezone();
+});
+
+function applyPageState(data) {
+  document.querySelectorAll('.like-link').forEach((linkEl) => {
+    const objects =
+      linkEl.dataset.type === 'article' ? data.articles : data.comments;
+    const state = objects[linkEl.dataset.id];
+    if (!state) {
+      return;
+    }
+    linkEl.querySelector('.like-icon')?.classList.toggle('active', state.liked);
+    const counterEl =
+      linkEl.querySelector('.like-counter') ||
+      linkEl.parentElement.querySelector('.like-counter');
+    counterEl.textContent = state.likes;
+  });
+
+  const viewsCounter = document.getElementById('articleViewsCounter');
+  Object.entries(data.articles).forEach(([id, state]) => {
+    if (viewsCounter) {
+      viewsCounter.textContent = state.views;
+    }
+    if (state.isAuthor) {
+      showElements(`[data-if-author="${id}"]`);
+    }
+  });
+
+  if (data.user) {
+    applyUserState(data);
+  }
+}
+
+function applyUserState(data) {
+  showElements('[data-if-authenticated]');
+  if (data.user.isStaff) {
+    showElements('[data-if-staff]');
+  }
+  document
+    .querySelectorAll('[data-if-anonymous]')
+    .forEach((el) => el.remove());
+
+  let username = data.user.username;
+  if (username.length > 30) {
+    username = username.slice(0, 29) + '…';
+  }
+  document.querySelectorAll('[data-username]').forEach((el) => {
+    el.textContent = username;
+  });
+  document
+    .querySelectorAll('input[name="csrfmiddlewaretoken"]')
+    .forEach((el) => {
+      el.value = data.csrfToken;
+    });
+  document.querySelectorAll('.like-link').forEach((el) => {
+    el.dataset.loggedIn = 'yes';
+  });
+
+  setNotificationCounter(data.notificationsCount);
+
+  const notificationContainer = document.getElementById(
+    'notificationsContainer',
+  );
+  data.notifications.forEach((n) => {
+    const notificationElement = createNotificationElement(
+      n.id,
+      n.title,
+      n.message,
+      n.link,
+      n.timestamp,
+    );
+    notificationElement.classList.toggle('read', n.isRead);
+    notificationContainer.appendChild(notificationElement);
+  });
+  notificationContainer.dataset.nextCursor = data.notificationsNextCursor || '';
+  if (data.notifications.length > 0) {
+    document.querySelector('.modal-title').textContent = 'Notifications';
+    document.querySelector('.modal-body').classList.remove('d-none');
+    document.querySelector('.modal-footer').classList.remove('d-none');
+  }
+}
+
+function showElements(selector) {
+  document.querySelectorAll(selector).forEach((el) => {
+    el.classList.remove('d-none');
+  });
+}